@@ -0,0 +1,58 @@
+"""
+Cálculo de calendarios para muchas secciones.
+
+- anterior: bucle por sesión con timedelta y búsqueda de feriados en lista
+  (generar_planificacion_calendario original), una sección por vez.
+- numpy: calendario.calcular_fechas_sesiones con todas las secciones en una
+  sola llamada (y generar_calendarios, que además agrupa por días de clase).
+
+Uso: python benchmarks/bench_calendario.py [secciones]
+"""
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np  # noqa: E402
+
+import calendario  # noqa: E402
+
+FERIADOS = [date(2025, 3, 24), date(2025, 4, 17), date(2025, 4, 18), date(2025, 5, 1),
+            date(2025, 5, 25), date(2025, 6, 16), date(2025, 6, 20)]
+
+
+def calendario_anterior(fecha_inicio, dia_clase_num, feriados):
+    plan = []
+    for sesion_num in range(1, 17):
+        fecha_base = fecha_inicio + timedelta(weeks=sesion_num - 1)
+        dia_evento = fecha_base + timedelta(days=(dia_clase_num - fecha_base.weekday()) % 7)
+        plan.append((dia_evento, dia_evento in feriados))
+    return plan
+
+
+def medir(funcion):
+    inicio = time.perf_counter()
+    funcion()
+    return (time.perf_counter() - inicio) * 1000
+
+
+def main(cantidad=5000):
+    inicios = [date(2025, 3, 3) + timedelta(days=i % 21) for i in range(cantidad)]
+    dias = [i % 5 for i in range(cantidad)]
+
+    anterior = medir(lambda: [calendario_anterior(f, d, FERIADOS) for f, d in zip(inicios, dias)])
+    inicios_np = np.asarray(inicios, dtype='datetime64[D]')
+    vectorizado = medir(lambda: calendario.calcular_fechas_sesiones(inicios_np, [0], 16, FERIADOS))
+    agrupado = medir(lambda: calendario.generar_calendarios(zip(inicios, dias), 16, FERIADOS))
+
+    print(f"{cantidad} secciones x 16 sesiones")
+    print(f"{'anterior (bucle)':<34}{anterior:>10.1f} ms")
+    print(f"{'numpy, un día de clase':<34}{vectorizado:>10.1f} ms  {anterior / vectorizado:>6.1f}x")
+    print(f"{'numpy, 5 grupos + fechas Python':<34}{agrupado:>10.1f} ms  {anterior / agrupado:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,94 @@
+"""
+Throughput de la extracción de conceptos.
+
+Sobre fragmentos sintéticos de sesión (varias frases por fragmento) mide,
+en fragmentos por segundo:
+
+- anterior: la implementación previa (primer trozo antes de una coma),
+  una llamada por fragmento, como referencia de costo mínimo;
+- uno a uno: el extractor nuevo llamado por fragmento, sin caché;
+- lote en frío: extraer_conceptos_lote con la caché vacía;
+- lote en caliente: la misma llamada repetida (todo acierta en la caché);
+- lote de cursos: muchos cursos que comparten el programa (el caso de
+  generar_lote.py con secciones del mismo curso), con la caché vacía al
+  empezar.
+
+Uso: python benchmarks/bench_conceptos.py [fragmentos]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from conceptos import analizar, extraer_conceptos_lote, obtener_cache_conceptos  # noqa: E402
+
+PALABRAS = ("análisis", "modelo", "proceso", "gestión", "sistema", "datos", "diseño",
+            "evaluación", "estrategia", "calidad", "red", "control", "riesgo", "costo",
+            "programación", "estructura", "algoritmo", "base", "servicio", "protocolo")
+ENLACES = ("de", "de la", "del", "y", "en", "para", "con", "a los")
+
+
+# Implementación anterior, copiada tal cual para comparar
+def extraer_anterior(texto):
+    try:
+        frases = [frase.strip() for frase in re.split(r'[,;\n]', texto) if frase.strip()]
+        if frases:
+            concepto_principal = frases[0].strip()
+            concepto_principal = re.sub(r'[\.!?]+$', '', concepto_principal)
+            return [concepto_principal]
+        concepto_limpio = re.sub(r'[\.!?]+$', '', texto.strip())
+        return [concepto_limpio] if concepto_limpio else [texto.strip()]
+    except Exception:
+        return [texto.strip()]
+
+
+def frase(azar):
+    palabras = [azar.choice(PALABRAS).capitalize()]
+    for _ in range(azar.randint(2, 6)):
+        palabras.append(azar.choice(ENLACES))
+        palabras.append(azar.choice(PALABRAS))
+    return " ".join(palabras)
+
+
+def fragmentos(cantidad, semilla=1):
+    azar = random.Random(semilla)
+    return ["\n".join(frase(azar) for _ in range(azar.randint(1, 4))) for _ in range(cantidad)]
+
+
+def por_segundo(funcion, cantidad):
+    inicio = time.perf_counter()
+    funcion()
+    segundos = time.perf_counter() - inicio
+    return cantidad / segundos, segundos * 1000
+
+
+def main(cantidad=5000):
+    textos = fragmentos(cantidad)
+    cache = obtener_cache_conceptos()
+    cache.maximo = max(cache.maximo, cantidad)
+    # Veinte secciones del mismo programa
+    cursos = textos[:cantidad // 20] * 20
+
+    casos = [
+        ("anterior", lambda: [extraer_anterior(t) for t in textos], None),
+        ("uno a uno", lambda: [analizar(t) for t in textos], None),
+        ("lote en frío", lambda: extraer_conceptos_lote(textos), cache.limpiar),
+        ("lote en caliente", lambda: extraer_conceptos_lote(textos), None),
+        ("lote de cursos", lambda: extraer_conceptos_lote(cursos), cache.limpiar),
+    ]
+    print(f"{cantidad} fragmentos")
+    print(f"{'caso':<18}{'frag/s':>12}{'ms':>10}")
+    for nombre, funcion, antes in casos:
+        if antes:
+            antes()
+        velocidad, ms = por_segundo(funcion, cantidad)
+        print(f"{nombre:<18}{velocidad:>12,.0f}{ms:>10.1f}")
+    print(f"caché: {cache.estadisticas()}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,136 @@
+"""
+Resumen del tablero de resultados: implementación anterior (filas armadas
+una a una, conteos con list comprehensions y un callback de estilo por
+fila) frente a la vectorizada (tabla_plan + operaciones de pandas).
+
+Para planes sintéticos de 20, 300 y 2 000 sesiones mide:
+- resumen: métricas, distribución de Bloom y tabla del calendario;
+- estilos: el cálculo de los estilos de cada celda (Styler, como lo hace
+  st.dataframe antes de enviar la tabla);
+y, para la vista de varios cursos, las métricas de 200 planes de 60
+sesiones: un bucle del resumen anterior por plan frente a metricas_por_curso
+sobre la concatenación de las tablas.
+
+Uso: python benchmarks/bench_dashboard.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from modelo_plan import Plan, Sesion, Clase, Momentos  # noqa: E402
+from planificacion import (  # noqa: E402
+    verbos_bloom, formatear_fecha_es, tabla_plan, metricas_por_curso, resumir_planificacion
+)
+
+EVENTOS = ["Clase normal"] * 8 + ["Prueba parcial", "Retroalimentación", "Revisión de prueba", "Examen final"]
+
+
+def plan_sintetico(sesiones, semilla=1):
+    azar = random.Random(semilla)
+    momentos = Momentos("", "", "", "", "")
+    inicio = date(2025, 3, 3)
+    lista = []
+    for numero in range(1, sesiones + 1):
+        fecha = inicio + timedelta(days=numero * 2)
+        evento = azar.choice(EVENTOS)
+        clase = None
+        if evento == "Clase normal":
+            clase = Clase(f"Unidad {numero // 10 + 1}", "", "", azar.choice(list(verbos_bloom)), momentos, "", "")
+        lista.append(Sesion(numero, fecha, formatear_fecha_es(fecha), evento, clase,
+                            azar.random() < 0.05, azar.random() < 0.02))
+    return Plan(tuple(lista), (), {}, datetime(2025, 1, 1))
+
+
+# Implementación anterior, copiada tal cual para comparar
+def resumir_anterior(plan):
+    metricas = {
+        "total_sesiones": len(plan.sesiones),
+        "sesiones_normales": sum(s.evento == "Clase normal" for s in plan.sesiones),
+        "pruebas": sum(s.evento == "Prueba parcial" for s in plan.sesiones),
+        "feriados": sum(s.en_feriado for s in plan.sesiones)
+    }
+    niveles_count = {}
+    for sesion in plan.clases():
+        nivel = sesion.clase.nivel
+        niveles_count[nivel] = niveles_count.get(nivel, 0) + 1
+    calendar_data = []
+    for sesion in plan.sesiones:
+        calendar_data.append({
+            "Sesión": sesion.numero,
+            "Fecha": sesion.fecha.strftime("%d/%m/%Y"),
+            "Día": sesion.fecha_es.split(",")[0],
+            "Evento": sesion.evento,
+            "Unidad": sesion.clase.unidad if sesion.clase else "-",
+            "Feriado": "⚠️" if sesion.en_feriado else ("📅 Reagendada" if sesion.reagendada else "")
+        })
+    return {"metricas": metricas, "niveles_count": niveles_count, "df_calendar": pd.DataFrame(calendar_data)}
+
+
+def highlight_rows(row):
+    if row["Evento"] == "Examen final":
+        return ['background-color: #ffebee'] * len(row)
+    elif row["Evento"] == "Prueba parcial":
+        return ['background-color: #fff3e0'] * len(row)
+    elif row["Evento"] == "Retroalimentación":
+        return ['background-color: #e8f5e8'] * len(row)
+    elif row["Evento"] == "Revisión de prueba":
+        return ['background-color: #e3f2fd'] * len(row)
+    elif row["Feriado"] == "⚠️":
+        return ['background-color: #f3e5f5'] * len(row)
+    else:
+        return [''] * len(row)
+
+
+def estilos_anterior(resumen):
+    return resumen["df_calendar"].style.apply(highlight_rows, axis=1)._compute()
+
+
+def estilos_nuevo(resumen):
+    estilos = ("background-color: " + resumen["colores_calendar"]).where(resumen["colores_calendar"] != "", "")
+    return resumen["df_calendar"].style.apply(
+        lambda tabla: pd.DataFrame({c: estilos.to_numpy() for c in tabla.columns}, index=tabla.index),
+        axis=None
+    )._compute()
+
+
+def mejor_ms(funcion, repeticiones=5):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, (time.perf_counter() - inicio) * 1000)
+    return mejor
+
+
+def main():
+    print(f"{'caso':<30}{'anterior ms':>13}{'nuevo ms':>11}")
+    for sesiones in (20, 300, 2000):
+        plan = plan_sintetico(sesiones)
+        anterior = resumir_anterior(plan)
+        nuevo = resumir_planificacion(plan)
+        assert anterior["metricas"] == nuevo["metricas"]
+        assert anterior["niveles_count"] == nuevo["distribucion_bloom"].to_dict()
+        assert np.array_equal(anterior["df_calendar"].to_numpy(), nuevo["df_calendar"].astype(object).to_numpy())
+        for nombre, viejo, actual in (
+            ("resumen", lambda: resumir_anterior(plan), lambda: resumir_planificacion(plan)),
+            ("estilos", lambda: estilos_anterior(anterior), lambda: estilos_nuevo(nuevo)),
+        ):
+            print(f"{f'{sesiones} sesiones / {nombre}':<30}{mejor_ms(viejo):>13.2f}{mejor_ms(actual):>11.2f}")
+
+    planes = {f"curso_{i}": plan_sintetico(60, semilla=i) for i in range(200)}
+    tablas = pd.concat([tabla_plan(plan, curso) for curso, plan in planes.items()], ignore_index=True)
+    multi_anterior = mejor_ms(lambda: {c: resumir_anterior(p)["metricas"] for c, p in planes.items()})
+    multi_nuevo = mejor_ms(lambda: metricas_por_curso(tablas))
+    print(f"{'200 cursos / métricas':<30}{multi_anterior:>13.2f}{multi_nuevo:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
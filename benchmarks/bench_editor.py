@@ -0,0 +1,64 @@
+"""
+Latencia de rerun del editor de unidades con 20 y 200 unidades.
+
+Con streamlit.testing (AppTest) mide el mejor tiempo de:
+- app completa: un rerun de todo streamlit_app.py (sesión iniciada, sin
+  resultados), que es lo que antes costaba cada edición de una unidad;
+- solo el editor: un rerun del fragmento editor_unidades, que es lo único
+  que se vuelve a ejecutar al editar la tabla.
+
+AppTest no puede ejecutar un fragmento solo dentro de la app, así que el
+fragmento se mide como una app propia con el mismo session_state.
+
+Uso: python benchmarks/bench_editor.py [repeticiones]
+"""
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+
+def unidades(cantidad):
+    return [
+        (f"Unidad {u}", "\n".join(f"Tema {u}.{t}: análisis y diseño de procesos" for t in range(1, 31)))
+        for u in range(1, cantidad + 1)
+    ]
+
+
+def solo_editor():
+    import streamlit_app
+    streamlit_app.editor_unidades()
+
+
+def mejor_rerun(app, cantidad, repeticiones):
+    app.session_state["authenticated"] = True
+    app.session_state["usuario"] = "bench"
+    app.session_state["privilegio"] = "Completo"
+    app.session_state["unidades_data"] = unidades(cantidad)
+    # El primer run carga plantillas e importa módulos
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        app.run()
+        mejor = min(mejor, (time.perf_counter() - inicio) * 1000)
+    return mejor
+
+
+def main(repeticiones=5):
+    os.chdir(RAIZ)
+    print(f"{'unidades':>9}{'app completa ms':>18}{'solo editor ms':>17}")
+    for cantidad in (20, 200):
+        completa = mejor_rerun(AppTest.from_file("streamlit_app.py", default_timeout=120), cantidad, repeticiones)
+        editor = mejor_rerun(AppTest.from_function(solo_editor, default_timeout=120), cantidad, repeticiones)
+        print(f"{cantidad:>9}{completa:>18.1f}{editor:>17.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
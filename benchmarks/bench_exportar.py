@@ -0,0 +1,142 @@
+"""
+Exportación del resumen de un plan de 200 sesiones.
+
+- anterior: texto del plan con += (generar_texto_planificacion original) y
+  luego el TXT completo, otra vez con +=, codificado para la descarga.
+- streaming: texto de pantalla y TXT en un solo recorrido
+  (generar_textos), y exportar.exportar del TXT directo a un archivo, sin
+  armar el documento completo en memoria.
+
+Se informa el tiempo (mejor lote de 20 llamadas) y el pico de memoria de
+cada variante.
+
+Uso: python benchmarks/bench_exportar.py [sesiones]
+"""
+import os
+import random
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from datetime import date, datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import exportar  # noqa: E402
+import planificacion  # noqa: E402
+
+
+def texto_anterior(plan_semanal):
+    out = "\n📋 Planificación semanal completa:\n"
+    out += "=" * 80 + "\n"
+    for sesion in plan_semanal:
+        fecha_formateada = planificacion.formatear_fecha_es(sesion['Fecha'])
+        out += f"Sesión {sesion['Sesion']:2d} | {fecha_formateada} | {sesion['Evento']}\n"
+        if sesion["Evento"] == "Clase normal" and "Planificacion" in sesion:
+            p = sesion["Planificacion"]
+            out += f" 🟢 Unidad: {p['Unidad']}\n"
+            out += f" 📄 Contenido: {p['Contenido']}\n"
+            out += f" 🎯 Objetivo: El estudiante será capaz de {p['Verbo']} {p['Concepto']}\n"
+            out += f" 🪜 Nivel Bloom: {p['Nivel']}\n"
+            out += " 📌 Momentos Didácticos:\n"
+            out += f" ▪ Retroalimentación: {random.choice(planificacion.retro)}\n"
+            out += f" ▪ Introducción: {random.choice(planificacion.intro)}\n"
+            out += f" ▪ Inicio: {random.choice(planificacion.inicio)}\n"
+            out += f" ▪ Desarrollo: {p['Actividad']}\n"
+            out += f" ▪ Cierre: {random.choice(planificacion.cierre)}\n"
+            out += f" 🧰 Recursos: {', '.join(planificacion.recursos_bloom[p['Nivel']])}\n"
+            out += f" 📝 Evaluación: {', '.join(planificacion.evaluacion_bloom[p['Nivel']])}\n"
+        elif sesion["Evento"] == "Prueba parcial":
+            out += " 📝 Evaluación parcial programada\n"
+        elif sesion["Evento"] == "Retroalimentación":
+            out += " 🔄 Sesión de retroalimentación pre-prueba\n"
+        elif sesion["Evento"] == "Revisión de prueba":
+            out += " 📊 Revisión y análisis de resultados de prueba\n"
+        elif sesion["Evento"] == "Examen final":
+            out += " 🎓 Evaluación final del curso\n"
+        if sesion["En_feriado"]:
+            out += " ⚠️ ¡Advertencia! Esta sesión coincide con un feriado. Reagendar si es necesario.\n"
+        out += "-" * 70 + "\n"
+    return out
+
+
+def txt_anterior(plan_semanal, unidades_originales, configuracion):
+    out_text = texto_anterior(plan_semanal)
+    txt_content = f"PLANIFICACIÓN DOCENTE - GENERADA EL {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n"
+    txt_content += "=" * 80 + "\n"
+    txt_content += f"PERÍODO: {configuracion['fecha_inicio']} al {configuracion['fecha_fin']}\n"
+    txt_content += f"DÍA DE CLASE: {configuracion['dia_clase'].capitalize()}\n"
+    if configuracion['pruebas']:
+        txt_content += f"PRUEBAS EN SESIONES: {', '.join(map(str, configuracion['pruebas']))}\n"
+    txt_content += f"EXAMEN FINAL: {configuracion['fecha_examen_final']}\n"
+    txt_content += "\n" + "=" * 80 + "\n"
+    txt_content += "UNIDADES PROGRAMADAS:\n"
+    txt_content += "-" * 40 + "\n"
+    for i, (titulo, contenidos) in enumerate(unidades_originales.items(), 1):
+        txt_content += f"{i}. {titulo}\n"
+        for contenido in contenidos:
+            txt_content += f"   - {contenido}\n"
+        txt_content += "\n"
+    txt_content += "=" * 80 + "\n"
+    txt_content += out_text
+    return out_text, txt_content.encode('utf-8')
+
+
+def plan_de_ejemplo(sesiones):
+    unidades = [
+        (f"Unidad {u}", "\n".join(f"Tema {u}.{t}: análisis de procesos y modelos de gestión" for t in range(60)))
+        for u in range(1, 6)
+    ]
+    resultado = planificacion.generar_resultado({
+        "unidades_data": unidades, "fecha_inicio": date(2025, 3, 3), "fecha_fin": date(2026, 12, 31),
+        "dia_clase": "lunes", "fecha_examen_final": date(2030, 1, 1), "feriados": [],
+        "nombres_feriados": {}, "prueba1": 5, "prueba2": 10,
+        "opciones_calendario": {"total_sesiones": sesiones, "dias_extra": ["miércoles", "viernes"]},
+        "semilla": None, "documentos": False, "plantilla_planeamiento": None, "plantilla_cronograma": None,
+    })
+    configuracion = dict(resultado["plan"].configuracion)
+    return resultado["plan_semanal"], resultado["unidades_originales"], configuracion
+
+
+def streaming_bytes(plan, unidades, configuracion):
+    modelo = planificacion.construir_modelo_plan(plan, unidades, configuracion, random.Random(0))
+    return planificacion.generar_textos(modelo)
+
+
+def streaming_archivo(plan, unidades, configuracion, ruta):
+    modelo = planificacion.construir_modelo_plan(plan, unidades, configuracion, random.Random(0))
+    with open(ruta, 'w', encoding='utf-8', newline='') as f:
+        exportar.exportar(modelo, [("txt", f)])
+
+
+def tiempo(funcion, lotes=15, por_lote=20):
+    """Mejor tiempo medio por llamada (ms) entre varios lotes"""
+    return min(timeit.repeat(funcion, number=por_lote, repeat=lotes)) / por_lote * 1000
+
+
+def pico(funcion):
+    tracemalloc.start()
+    funcion()
+    _, maximo = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return maximo / 1024
+
+
+def main(sesiones=200):
+    plan, unidades, configuracion = plan_de_ejemplo(sesiones)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "plan.txt")
+        variantes = [
+            ("anterior (+=)", lambda: txt_anterior(plan, unidades, configuracion)),
+            ("streaming pantalla+TXT", lambda: streaming_bytes(plan, unidades, configuracion)),
+            ("streaming a archivo", lambda: streaming_archivo(plan, unidades, configuracion, ruta)),
+        ]
+        print(f"Plan de {len(plan)} sesiones")
+        print(f"{'variante':<26}{'ms':>8}{'pico KiB':>11}")
+        for nombre, funcion in variantes:
+            print(f"{nombre:<26}{tiempo(funcion):>8.2f}{pico(funcion):>11.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
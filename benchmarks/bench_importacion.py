@@ -0,0 +1,70 @@
+"""
+Presupuesto de tiempo de importación del núcleo (planificacion).
+
+Importa el módulo en un intérprete nuevo con -X importtime (el mejor de
+varios intentos) y falla si:
+
+- tarda más que el presupuesto (por defecto 100 ms), o
+- carga alguna de las dependencias pesadas que deben importarse recién al
+  usarlas (streamlit, pandas, NumPy, NLTK, docxtpl).
+
+Como referencia se informa también lo que cuesta importar streamlit.
+
+Uso: python benchmarks/bench_importacion.py [presupuesto_ms] [intentos]
+"""
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRESUPUESTO_MS = 100
+PROHIBIDOS = ("streamlit", "pandas", "numpy", "nltk", "docxtpl", "docx", "lxml")
+
+
+def importar(modulo):
+    """(ms acumulados de importar el módulo, módulos prohibidos cargados)"""
+    codigo = (
+        f"import sys; import {modulo}; "
+        f"print(','.join(m for m in {PROHIBIDOS!r} if m in sys.modules))"
+    )
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ, capture_output=True, text=True, check=True
+    )
+    ms = None
+    for linea in proceso.stderr.splitlines():
+        # import time: propio | acumulado | módulo
+        partes = linea.split("|")
+        if len(partes) == 3 and partes[2].strip() == modulo:
+            ms = int(partes[1]) / 1000
+    cargados = [m for m in proceso.stdout.strip().split(",") if m]
+    return ms, cargados
+
+
+def main(presupuesto=PRESUPUESTO_MS, intentos=5):
+    mediciones = [importar("planificacion") for _ in range(intentos)]
+    mejor = min(ms for ms, _ in mediciones)
+    cargados = sorted({m for _, lista in mediciones for m in lista})
+    referencia, _ = importar("streamlit")
+
+    print(f"{'planificacion':<16}{mejor:>9.1f} ms  (presupuesto {presupuesto} ms)")
+    print(f"{'streamlit':<16}{referencia:>9.1f} ms  (referencia)")
+
+    errores = []
+    if mejor > presupuesto:
+        errores.append(f"importar planificacion tarda {mejor:.1f} ms (> {presupuesto} ms)")
+    if cargados:
+        errores.append(f"planificacion carga al importarse: {', '.join(cargados)}")
+    for error in errores:
+        print(f"✗ {error}", file=sys.stderr)
+    if not errores:
+        print("✓ dentro del presupuesto")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else PRESUPUESTO_MS,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    ))
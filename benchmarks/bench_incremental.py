@@ -0,0 +1,109 @@
+"""
+Regeneración incremental: cuánto cuesta "Generar" tras un cambio chico.
+
+Sobre un programa grande (60 unidades × 20 ítems) con las dos plantillas,
+se genera el curso una vez y luego se aplica cada cambio:
+- sin cambios;
+- otro feriado;
+- la segunda prueba una sesión más tarde;
+- un ítem más en una unidad (cambia el programa y con él la semilla).
+
+Para cada cambio se mide la generación completa (memoria de etapas y caché
+de conceptos vacías, como antes del grafo) y la incremental (memoria con el
+resultado anterior), y se listan las etapas recalculadas (plan, textos y
+paquete llevan la fecha de generación y se rehacen siempre). La caché de
+artefactos queda desactivada (PLANEAMIENTO_CACHE_MB=0) para que los render
+no se aprovechen de ella en ninguna de las dos.
+
+Uso: python benchmarks/bench_incremental.py [repeticiones]
+"""
+import os
+import sys
+import time
+from datetime import date, datetime
+
+os.environ.setdefault("PLANEAMIENTO_CACHE_MB", "0")
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from conceptos import obtener_cache_conceptos  # noqa: E402
+from grafo_etapas import RECALCULADA, obtener_memoria_etapas  # noqa: E402
+from planificacion import generar_resultado  # noqa: E402
+from registro_plantillas import obtener_registro  # noqa: E402
+
+
+def entradas(**cambios):
+    plantillas = obtener_registro(os.path.join(RAIZ, "templates"))
+    planeamiento = plantillas.obtener("planeamiento")
+    cronograma = plantillas.obtener("cronograma")
+    datos = {
+        "unidades_data": [
+            (f"Unidad {u}", "\n".join(
+                f"Concepto {u}.{i}: análisis del modelo de gestión de procesos y control de calidad"
+                for i in range(1, 21)
+            ))
+            for u in range(1, 61)
+        ],
+        "fecha_inicio": date(2026, 3, 2),
+        "fecha_fin": date(2026, 7, 3),
+        "dia_clase": "martes",
+        "fecha_examen_final": date(2026, 7, 10),
+        "feriados": [date(2026, 4, 7)],
+        "nombres_feriados": {},
+        "prueba1": 5,
+        "prueba2": 10,
+        "opciones_calendario": {"total_sesiones": 16, "dias_extra": [], "semanas_omitidas": [], "reagendar_feriados": True},
+        "semilla": None,
+        "documentos": True,
+        "plantilla_planeamiento": planeamiento["datos"] if planeamiento else None,
+        "plantilla_cronograma": cronograma["datos"] if cronograma else None,
+        # Fecha fija: la generación completa y la incremental dan el mismo texto
+        "generado": datetime(2026, 3, 1, 8, 0),
+    }
+    return {**datos, **cambios}
+
+
+CAMBIOS = [
+    ("sin cambios", {}, {}),
+    ("otro feriado", {}, {"feriados": [date(2026, 4, 14)]}),
+    ("prueba 2 una sesión después", {}, {"prueba2": 11}),
+    ("un ítem más en la unidad 1", {}, {"unidades_data": [
+        (titulo, contenidos + "\nConcepto nuevo: auditoría interna" if numero == 0 else contenidos)
+        for numero, (titulo, contenidos) in enumerate(entradas()["unidades_data"])
+    ]}),
+]
+
+
+def vaciar():
+    obtener_memoria_etapas().limpiar()
+    obtener_cache_conceptos().limpiar()
+
+
+def mejor_ms(antes, despues, incremental, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        vaciar()
+        if incremental:
+            generar_resultado(antes)
+        inicio = time.perf_counter()
+        resultado = generar_resultado(despues)
+        mejor = min(mejor, (time.perf_counter() - inicio) * 1000)
+    return mejor, resultado
+
+
+def main(repeticiones=3):
+    # Calentamiento: importaciones diferidas y pool de render
+    generar_resultado(entradas())
+    print(f"{'cambio':<30}{'completa ms':>13}{'incremental ms':>16}  recalculadas")
+    for nombre, base, cambios in CAMBIOS:
+        antes, despues = entradas(**base), entradas(**cambios)
+        completa, referencia = mejor_ms(antes, despues, False, repeticiones)
+        incremental, resultado = mejor_ms(antes, despues, True, repeticiones)
+        assert resultado["out"] == referencia["out"]
+        recalculadas = [etapa for etapa, estado in resultado["etapas"].items() if estado == RECALCULADA]
+        print(f"{nombre:<30}{completa:>13.1f}{incremental:>16.1f}  {', '.join(recalculadas) or '-'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
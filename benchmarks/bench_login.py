@@ -0,0 +1,105 @@
+"""
+Prueba de carga de inicio de sesión: N intentos concurrentes (por defecto 500).
+
+- anterior: cada intento relee (y verifica) usuarios.json y compara la
+  contraseña en texto plano, como hacía cargar_usuarios/verificar_credenciales.
+- sqlite: usuarios.AlmacenUsuarios (WAL + caché + PBKDF2), compartido por
+  todos los hilos como en el servidor de Streamlit, recién abierto.
+- recordados: la misma ráfaga otra vez; los logins correctos ya verificados
+  no vuelven a pagar PBKDF2 (usuarios.LOGIN_TTL).
+
+Todos los hilos arrancan a la vez (barrera); se informa la latencia p50/p95/p99
+por intento, el tiempo total y los errores. La mayoría de los intentos usan la
+contraseña correcta y una parte, una incorrecta.
+
+Con PBKDF2 a 600 000 iteraciones (el valor por defecto, ~180 ms por hash)
+los logins que pagan un hash están limitados por los núcleos: ~5,5 por
+segundo y núcleo, atendidos en orden de llegada gracias a
+PLANEAMIENTO_HASHES_SIMULTANEOS (subirlo por encima de los núcleos no mejora
+nada). Con un núcleo, 500 intentos y 200 usuarios: sqlite p50 45 s y p95
+86 s (todos pagan un hash); recordados p50 16 ms, y el p95 de 4,5 s lo
+ponen los 50 intentos con contraseña incorrecta, que siempre pagan el hash.
+Para ráfagas de usuarios nuevos el margen está en los núcleos, no en el
+costo del hash.
+
+Uso: python benchmarks/bench_login.py [intentos] [usuarios]
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import usuarios  # noqa: E402
+
+
+def verificar_anterior(archivo, usuario, password):
+    if not os.path.exists(archivo):
+        raise FileNotFoundError(archivo)
+    with open(archivo, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    if usuario in datos:
+        return datos[usuario]["password"] == password, datos[usuario].get("privilegio", "Estándar")
+    return False, None
+
+
+def carga(verificar, intentos, cantidad_usuarios):
+    barrera = threading.Barrier(intentos)
+
+    def intento(i):
+        usuario = f"docente{i % cantidad_usuarios}"
+        password = f"clave{i % cantidad_usuarios}" if i % 10 else "incorrecta"
+        barrera.wait()
+        inicio = time.perf_counter()
+        valido, _ = verificar(usuario, password)
+        return (time.perf_counter() - inicio) * 1000, valido == bool(i % 10)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=intentos) as pool:
+        resultados = list(pool.map(intento, range(intentos)))
+    total = time.perf_counter() - inicio
+
+    latencias = sorted(r[0] for r in resultados)
+    errores = sum(1 for r in resultados if not r[1])
+    percentil = lambda p: latencias[min(len(latencias) - 1, round(p / 100 * (len(latencias) - 1)))]  # noqa: E731
+    return {
+        "p50": statistics.median(latencias), "p95": percentil(95), "p99": percentil(99),
+        "total_s": total, "por_segundo": intentos / total, "errores": errores,
+    }
+
+
+def mostrar(nombre, r):
+    print(f"{nombre:<10}{r['p50']:>9.1f}{r['p95']:>9.1f}{r['p99']:>9.1f}"
+          f"{r['total_s']:>9.2f}{r['por_segundo']:>10.0f}{r['errores']:>8}")
+
+
+def main(intentos=500, cantidad_usuarios=200):
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "usuarios.json")
+        datos = {
+            f"docente{i}": {"password": f"clave{i}", "privilegio": "Estándar"}
+            for i in range(cantidad_usuarios)
+        }
+        with open(archivo, 'w', encoding='utf-8') as f:
+            json.dump(datos, f)
+
+        inicio = time.perf_counter()
+        almacen = usuarios.AlmacenUsuarios(os.path.join(directorio, "usuarios.db"), archivo)
+        migracion = time.perf_counter() - inicio
+
+        print(f"{intentos} intentos concurrentes, {cantidad_usuarios} usuarios, "
+              f"PBKDF2 {usuarios.ITERACIONES} iteraciones (migración: {migracion:.2f} s)")
+        print(f"{'almacén':<10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'total s':>9}{'login/s':>10}{'errores':>8}")
+        mostrar("anterior", carga(lambda u, p: verificar_anterior(archivo, u, p), intentos, cantidad_usuarios))
+        mostrar("sqlite", carga(almacen.verificar, intentos, cantidad_usuarios))
+        mostrar("recordados", carga(almacen.verificar, intentos, cantidad_usuarios))
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,144 @@
+"""
+Pico de memoria (tracemalloc) al armar paquetes ZIP de distintos tamaños.
+
+- anterior: ZIP en io.BytesIO, cada .docx copiado con getvalue() y
+  recomprimido con ZIP_DEFLATED (comportamiento de crear_archivo_zip).
+- streaming: paquete_zip.escribir_paquete_zip sobre crear_destino_temporal()
+  con el umbral de producción (PLANEAMIENTO_MAX_ZIP_MEMORIA, 8 MiB por
+  defecto): hasta ese tamaño el paquete queda en memoria y después pasa a
+  disco, con los .docx guardados sin recomprimir.
+
+Se mide el armado. El paquete terminado queda en su archivo temporal
+(PaqueteZip) y se lee completo recién al servir la descarga.
+
+Al final se comprueba la cota con un paquete varias veces mayor que el
+umbral: el pico del armado no pasa del umbral más MARGEN_KIB y el
+PaqueteZip terminado no retiene en memoria más que MARGEN_KIB. Si no se
+cumple, termina con código 1.
+
+Los .docx se generan por miembro (como haría un paquete de varios cursos),
+así que en ningún caso el paquete completo existe antes de escribirse.
+
+Uso: python benchmarks/bench_memoria_zip.py [--solo-cota]
+"""
+import io
+import os
+import sys
+import tracemalloc
+import zipfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import motor_render  # noqa: E402
+import paquete_zip  # noqa: E402
+from bench_render import contexto_ejemplo  # noqa: E402
+
+# Holgura sobre el umbral (estructuras del ZIP, documento en curso)
+MARGEN_KIB = 2048
+
+
+def documentos(plantilla, context, cantidad):
+    for i in range(cantidad):
+        yield f"Curso_{i:03d}/Planeamiento.docx", plantilla.renderizar_bytes(context)
+        yield f"Curso_{i:03d}/Planificacion.txt", "Sesión 1 | Lunes\n" * 2000
+
+
+def paquete_anterior(plantilla, context, cantidad):
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for nombre, contenido in documentos(plantilla, context, cantidad):
+            if isinstance(contenido, bytes):
+                docx_buffer = io.BytesIO()
+                docx_buffer.write(contenido)
+                zip_file.writestr(nombre, docx_buffer.getvalue())
+            else:
+                zip_file.writestr(nombre, contenido.encode('utf-8'))
+    zip_buffer.seek(0)
+    return len(zip_buffer.getvalue())
+
+
+def paquete_streaming(plantilla, context, cantidad):
+    with paquete_zip.crear_destino_temporal() as destino:
+        paquete_zip.escribir_paquete_zip(destino, documentos(plantilla, context, cantidad))
+        return destino.tell()
+
+
+def paquete_terminado(plantilla, context, cantidad):
+    """PaqueteZip como lo entrega la generación; se mide lo que queda retenido"""
+    destino = paquete_zip.crear_destino_temporal()
+    paquete_zip.escribir_paquete_zip(destino, documentos(plantilla, context, cantidad))
+    return paquete_zip.PaqueteZip(destino)
+
+
+def cota_memoria(plantilla, context, cantidad):
+    """(tamaño del ZIP, pico del armado KiB, KiB retenidos por el PaqueteZip)"""
+    tracemalloc.start()
+    paquete = paquete_terminado(plantilla, context, cantidad)
+    retenido, maximo = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tamano = paquete.tamano
+    paquete.cerrar()
+    return tamano, maximo / 1024, retenido / 1024
+
+
+def comprobar_cota(plantilla, context):
+    """Errores si el armado o el paquete terminado superan la cota"""
+    umbral_kib = paquete_zip.MAX_PAQUETE_EN_MEMORIA / 1024
+    # Cursos suficientes para un paquete de al menos el doble del umbral
+    tamano_curso, _, _ = cota_memoria(plantilla, context, 1)
+    cantidad = int(2 * paquete_zip.MAX_PAQUETE_EN_MEMORIA / tamano_curso) + 1
+    tamano, maximo, retenido = cota_memoria(plantilla, context, cantidad)
+    print(
+        f"Cota: ZIP de {tamano / 1024:.0f} KiB, pico {maximo:.0f} KiB "
+        f"(umbral {umbral_kib:.0f} + {MARGEN_KIB}), retenido {retenido:.0f} KiB"
+    )
+    errores = []
+    if maximo > umbral_kib + MARGEN_KIB:
+        errores.append(f"el armado usa {maximo:.0f} KiB (> {umbral_kib + MARGEN_KIB:.0f} KiB)")
+    if retenido > MARGEN_KIB:
+        errores.append(f"el paquete terminado retiene {retenido:.0f} KiB en memoria (> {MARGEN_KIB} KiB)")
+    return errores
+
+
+def pico(funcion, *args):
+    tracemalloc.start()
+    tamano = funcion(*args)
+    _, maximo = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tamano, maximo / 1024
+
+
+def cargar_plantilla():
+    with open(os.path.join(RAIZ, "templates", "plantilla_planeamiento.docx"), 'rb') as f:
+        plantilla = motor_render.obtener_plantilla_compilada(f.read())
+    context = contexto_ejemplo()
+    plantilla.renderizar_bytes(context)
+    return plantilla, context
+
+
+def main(solo_cota=False):
+    plantilla, context = cargar_plantilla()
+    if not solo_cota:
+        tabla(plantilla, context)
+    errores = comprobar_cota(plantilla, context)
+    for error in errores:
+        print(f"✗ {error}", file=sys.stderr)
+    if not errores:
+        print("✓ memoria acotada")
+    return 1 if errores else 0
+
+
+def tabla(plantilla, context):
+    print(f"{'cursos':>7}{'ZIP KiB':>10}{'anterior KiB':>15}{'streaming KiB':>16}{'reducción':>11}")
+    for cantidad in (1, 10, 50, 200, 400):
+        tamano_anterior, pico_anterior = pico(paquete_anterior, plantilla, context, cantidad)
+        tamano_nuevo, pico_nuevo = pico(paquete_streaming, plantilla, context, cantidad)
+        print(
+            f"{cantidad:>7}{tamano_nuevo / 1024:>10.0f}{pico_anterior:>15.0f}"
+            f"{pico_nuevo:>16.0f}{pico_anterior / pico_nuevo:>10.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main("--solo-cota" in sys.argv[1:]))
@@ -0,0 +1,101 @@
+"""
+Importación de un programa grande (por defecto 200 unidades × 30 ítems =
+6 000 ítems) desde .docx y .md.
+
+Se informa tiempo, ítems por segundo y pico de memoria (tracemalloc) de:
+- importar_programa sobre el .docx (iterparse en streaming);
+- la lectura del mismo .docx con python-docx (árbol completo en memoria,
+  recorrido de document.paragraphs), como referencia;
+- importar_programa sobre el .md;
+- genera_dict_unidades sobre las unidades importadas.
+
+tracemalloc no ve la memoria que reserva lxml por dentro, así que el pico
+de python-docx está subestimado.
+
+Uso: python benchmarks/bench_programa.py [unidades] [items_por_unidad]
+"""
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import docx  # noqa: E402
+
+from planificacion import genera_dict_unidades  # noqa: E402
+from programa import importar_programa  # noqa: E402
+
+
+def item(u, i):
+    return f"Concepto {u}.{i}: análisis del modelo de gestión de procesos y control de calidad"
+
+
+def programa_docx(unidades, items):
+    documento = docx.Document()
+    documento.add_heading("Programa de la asignatura", 0)
+    documento.add_paragraph("Docentes: equipo de cátedra")
+    for u in range(1, unidades + 1):
+        documento.add_heading(f"Unidad {u}: Tema {u}", 1)
+        for i in range(1, items + 1):
+            documento.add_paragraph(item(u, i), style="List Bullet")
+    destino = io.BytesIO()
+    documento.save(destino)
+    return destino.getvalue()
+
+
+def programa_md(unidades, items):
+    lineas = ["# Programa de la asignatura", "", "Docentes: equipo de cátedra"]
+    for u in range(1, unidades + 1):
+        lineas.append(f"## Unidad {u}: Tema {u}")
+        lineas.extend(f"- {item(u, i)}" for i in range(1, items + 1))
+    return "\n".join(lineas).encode("utf-8")
+
+
+def leer_python_docx(datos):
+    documento = docx.Document(io.BytesIO(datos))
+    return [(p.style.name, p.text) for p in documento.paragraphs]
+
+
+def medir(funcion, repeticiones=3):
+    """(resultado, mejor ms, pico MiB); el pico se mide aparte porque tracemalloc frena"""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, (time.perf_counter() - inicio) * 1000)
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, mejor, pico / 2**20
+
+
+def main(unidades=200, items=30):
+    total = unidades * items
+    datos_docx = programa_docx(unidades, items)
+    datos_md = programa_md(unidades, items)
+    print(f"{unidades} unidades × {items} ítems = {total} ítems "
+          f"(.docx {len(datos_docx) / 1024:.0f} KiB, .md {len(datos_md) / 1024:.0f} KiB)")
+
+    (unidades_data, resumen), *docx_streaming = medir(lambda: importar_programa(io.BytesIO(datos_docx), "p.docx"))
+    assert resumen["items"] == total, resumen
+    _, *docx_completo = medir(lambda: leer_python_docx(datos_docx))
+    (_, resumen_md), *md = medir(lambda: importar_programa(io.BytesIO(datos_md), "p.md"))
+    assert resumen_md["items"] == total, resumen_md
+    _, *unidades_dict = medir(lambda: genera_dict_unidades(unidades_data))
+
+    print(f"{'caso':<34}{'ms':>9}{'ítems/s':>12}{'pico MiB':>10}")
+    for nombre, (ms, pico) in (
+        ("importar_programa .docx", docx_streaming),
+        ("python-docx (árbol completo)", docx_completo),
+        ("importar_programa .md", md),
+        ("genera_dict_unidades", unidades_dict),
+    ):
+        print(f"{nombre:<34}{ms:>9.1f}{total / ms * 1000:>12,.0f}{pico:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(valor) for valor in sys.argv[1:3]))
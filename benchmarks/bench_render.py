@@ -0,0 +1,66 @@
+"""
+Latencia de render en frío y en caliente para las plantillas incluidas.
+
+- docxtpl: DocxTemplate nuevo por render (comportamiento anterior).
+- frío: primera llamada al motor (parseo + compilación + render).
+- caliente: renders siguientes con la plantilla ya compilada.
+
+Uso: python benchmarks/bench_render.py [repeticiones]
+"""
+import io
+import os
+import statistics
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from docxtpl import DocxTemplate  # noqa: E402
+
+import motor_render  # noqa: E402
+
+CAMPOS = ["FECHA", "EVENTO", "UNIDAD", "CONTENIDO", "OBJETIVO", "NIVEL_BLOOM",
+          "RETROALIMENTACION", "INTRODUCCION", "INICIO", "DESARROLLO", "CIERRE",
+          "RECURSOS", "EVALUACION", "ADVERTENCIA"]
+
+
+def contexto_ejemplo():
+    return {
+        f"SESION_{num}_{campo}": f"{campo.capitalize()} de la sesión {num}"
+        for num in range(1, 18) for campo in CAMPOS
+    }
+
+
+def render_docxtpl(datos, context):
+    doc = DocxTemplate(io.BytesIO(datos))
+    doc.render(context)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def main(repeticiones=20):
+    context = contexto_ejemplo()
+    print(f"{'plantilla':<28}{'docxtpl ms':>12}{'frío ms':>10}{'caliente ms':>13}{'mejora':>9}")
+    for nombre in ("plantilla_planeamiento.docx", "plantilla_cronograma.docx"):
+        with open(os.path.join(RAIZ, "templates", nombre), 'rb') as f:
+            datos = f.read()
+
+        base = statistics.median(medir(lambda: render_docxtpl(datos, context), repeticiones))
+        frio = medir(lambda: motor_render.renderizar_docx(datos, context), 1)[0]
+        caliente = statistics.median(medir(lambda: motor_render.renderizar_docx(datos, context), repeticiones))
+        print(f"{nombre:<28}{base:>12.1f}{frio:>10.1f}{caliente:>13.1f}{base / caliente:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
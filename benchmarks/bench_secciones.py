@@ -0,0 +1,108 @@
+"""
+Varias secciones de un mismo programa: una generación por sección (como
+hasta ahora, generar_resultado N veces) frente a generar_secciones, que
+procesa el programa una vez y renderiza los documentos de todas juntas.
+
+Programa grande (60 unidades × 20 ítems), 10 y 30 secciones con distinto
+día de clase y pruebas. Se mide sin documentos (privilegio Estándar) y con
+las dos plantillas de templates/. Antes de cada corrida se vacía la caché de
+conceptos y la de artefactos queda desactivada (PLANEAMIENTO_CACHE_MB=0),
+así ninguna de las dos variantes se aprovecha de la otra.
+
+Uso: python benchmarks/bench_secciones.py [secciones ...]
+"""
+import os
+import sys
+import time
+from datetime import date
+
+os.environ.setdefault("PLANEAMIENTO_CACHE_MB", "0")
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from conceptos import obtener_cache_conceptos  # noqa: E402
+from grafo_etapas import obtener_memoria_etapas  # noqa: E402
+from planificacion import dias_semana, generar_resultado, generar_secciones  # noqa: E402
+from registro_plantillas import obtener_registro  # noqa: E402
+
+DIAS = list(dias_semana)[:5]
+
+
+def programa(unidades=60, items=20):
+    return [
+        (f"Unidad {u}", "\n".join(
+            f"Concepto {u}.{i}: análisis del modelo de gestión de procesos y control de calidad"
+            for i in range(1, items + 1)
+        ))
+        for u in range(1, unidades + 1)
+    ]
+
+
+def entradas(cantidad, documentos):
+    plantillas = obtener_registro(os.path.join(RAIZ, "templates"))
+    planeamiento = plantillas.obtener("planeamiento")
+    cronograma = plantillas.obtener("cronograma")
+    return {
+        "unidades_data": programa(),
+        "fecha_inicio": date(2026, 3, 2),
+        "fecha_fin": date(2026, 7, 3),
+        "dia_clase": "martes",
+        "fecha_examen_final": date(2026, 7, 10),
+        "feriados": [date(2026, 4, 2), date(2026, 5, 1)],
+        "nombres_feriados": {},
+        "prueba1": 5,
+        "prueba2": 10,
+        "opciones_calendario": {"total_sesiones": 16, "dias_extra": [], "semanas_omitidas": [], "reagendar_feriados": True},
+        "semilla": None,
+        "documentos": documentos,
+        "plantilla_planeamiento": planeamiento["datos"] if planeamiento else None,
+        "plantilla_cronograma": cronograma["datos"] if cronograma else None,
+        "secciones": [
+            {
+                "nombre": f"Sección {numero + 1}",
+                "dia_clase": DIAS[numero % len(DIAS)],
+                "prueba1": 4 + numero % 3,
+                "prueba2": 9 + numero % 4,
+                "fecha_examen_final": date(2026, 7, 10),
+            }
+            for numero in range(cantidad)
+        ],
+    }
+
+
+def una_por_una(datos):
+    resultados = []
+    for seccion in datos["secciones"]:
+        # Cada sección como una generación independiente, sin las etapas de la anterior
+        obtener_memoria_etapas().limpiar()
+        resultados.append(
+            generar_resultado({**datos, **{clave: valor for clave, valor in seccion.items() if clave != "nombre"}})
+        )
+    return resultados
+
+
+def medir_ms(funcion, datos):
+    obtener_cache_conceptos().limpiar()
+    inicio = time.perf_counter()
+    resultado = funcion(datos)
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+def main(cantidades=(10, 30)):
+    print(f"{'caso':<28}{'una por una ms':>16}{'secciones ms':>14}{'aceleración':>13}")
+    # Calentamiento: importaciones diferidas y lectura de plantillas fuera de la medición
+    generar_secciones(entradas(1, True))
+    for documentos in (False, True):
+        for cantidad in cantidades:
+            datos = entradas(cantidad, documentos)
+            anteriores, antes = medir_ms(una_por_una, datos)
+            juntas, ahora = medir_ms(generar_secciones, datos)
+            # Mismos planes con las dos variantes
+            assert [r["out"] for r in anteriores] == [s["out"] for s in juntas["secciones"]]
+            caso = f"{cantidad} secciones{' + documentos' if documentos else ''}"
+            print(f"{caso:<28}{antes:>16.0f}{ahora:>14.0f}{antes / ahora:>12.1f}×")
+
+
+if __name__ == "__main__":
+    main(tuple(int(valor) for valor in sys.argv[1:]) or (10, 30))
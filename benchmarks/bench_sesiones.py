@@ -0,0 +1,145 @@
+"""
+Ajuste de unidades a sesiones: motor de partición lineal frente a la
+implementación anterior (fusión por barrido O(n²) y división por
+len(frases) // sesiones).
+
+Escenarios con 10, 1 000 y 50 000 frases:
+- dividir: pocas unidades largas (menos unidades que sesiones);
+- fusionar: muchas unidades cortas (más unidades que sesiones).
+
+Se informa tiempo, frases descartadas y desbalance (palabras de la sesión
+más cargada / promedio).
+
+Uso: python benchmarks/bench_sesiones.py
+"""
+import os
+import random
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from planificacion import ajustar_unidades_para_sesiones, peso_frase  # noqa: E402
+
+SESIONES = 10
+
+
+# Implementación anterior, copiada tal cual para comparar
+def ajustar_anterior(unidades_originales, total_sesiones_normales=10):
+    """
+    Ajusta las unidades para que se adapten al número de sesiones disponibles
+    """
+    n_original = len(unidades_originales)
+    
+    # Crear lista de bloques de sesión
+    lista_bloques_sesion = []
+    for i, (titulo, frases) in enumerate(unidades_originales.items()):
+        lista_bloques_sesion.append({
+            "titulo": titulo,
+            "frases": frases,
+            "longitud": len(frases)
+        })
+    
+    # Lógica de ajuste
+    if n_original < total_sesiones_normales:
+        # Fraccionar unidades
+        sesiones_por_unidad_calc = [total_sesiones_normales // n_original] * n_original
+        for i in range(total_sesiones_normales % n_original):
+            sesiones_por_unidad_calc[i] += 1
+        
+        expanded_bloques = []
+        for idx, bloque_original in enumerate(lista_bloques_sesion):
+            cantidad_sesiones_para_unidad = sesiones_por_unidad_calc[idx]
+            frases_unidad = bloque_original["frases"]
+            
+            por_sesion = max(1, len(frases_unidad) // cantidad_sesiones_para_unidad) if cantidad_sesiones_para_unidad > 0 else 1
+            
+            for s in range(cantidad_sesiones_para_unidad):
+                fragmento_frases = frases_unidad[s*por_sesion:(s+1)*por_sesion]
+                
+                if not fragmento_frases:
+                    fragmento_frases = [frases_unidad[-1]] if frases_unidad else [f"Contenido de {bloque_original['titulo']}"]
+                
+                expanded_bloques.append({
+                    "titulo": f"{bloque_original['titulo']} (Parte {s+1}/{cantidad_sesiones_para_unidad})" if cantidad_sesiones_para_unidad > 1 else bloque_original['titulo'],
+                    "frases": fragmento_frases,
+                    "longitud": len(fragmento_frases)
+                })
+        lista_bloques_sesion = expanded_bloques
+        
+    elif n_original > total_sesiones_normales:
+        # Fusionar unidades
+        num_fusiones_necesarias = n_original - total_sesiones_normales
+        
+        for _ in range(num_fusiones_necesarias):
+            if len(lista_bloques_sesion) <= total_sesiones_normales:
+                break
+            
+            min_len_combined = float('inf')
+            idx_to_merge = -1
+            
+            for i in range(len(lista_bloques_sesion) - 1):
+                len_combined = lista_bloques_sesion[i]["longitud"] + lista_bloques_sesion[i+1]["longitud"]
+                if len_combined < min_len_combined:
+                    min_len_combined = len_combined
+                    idx_to_merge = i
+            
+            if idx_to_merge != -1:
+                unidad1 = lista_bloques_sesion[idx_to_merge]
+                unidad2 = lista_bloques_sesion[idx_to_merge + 1]
+                
+                nuevo_titulo = f"{unidad1['titulo']} - {unidad2['titulo']}"
+                nuevo_contenido = unidad1['frases'] + unidad2['frases']
+                nueva_longitud = len(nuevo_contenido)
+                
+                lista_bloques_sesion[idx_to_merge] = {
+                    "titulo": nuevo_titulo,
+                    "frases": nuevo_contenido,
+                    "longitud": nueva_longitud
+                }
+                lista_bloques_sesion.pop(idx_to_merge + 1)
+            else:
+                break
+    
+    return lista_bloques_sesion
+
+
+def syllabus(frases, unidades, semilla=1):
+    azar = random.Random(semilla)
+    resultado = {}
+    por_unidad = max(1, frases // unidades)
+    for u in range(unidades):
+        cantidad = por_unidad if u < unidades - 1 else frases - por_unidad * (unidades - 1)
+        resultado[f"Unidad {u + 1}"] = [
+            " ".join(["palabra"] * azar.randint(2, 30)) + f" ({u + 1}.{i + 1})"
+            for i in range(cantidad)
+        ]
+    return resultado
+
+
+def medir(funcion, unidades):
+    inicio = time.perf_counter()
+    bloques = funcion(unidades, SESIONES)
+    ms = (time.perf_counter() - inicio) * 1000
+    originales = {f for frases in unidades.values() for f in frases}
+    usadas = {f for bloque in bloques for f in bloque["frases"]}
+    cargas = [sum(peso_frase(f) for f in bloque["frases"]) for bloque in bloques]
+    desbalance = max(cargas) / (sum(cargas) / len(cargas))
+    return ms, len(originales - usadas), desbalance
+
+
+def main():
+    print(f"{'escenario':<10}{'frases':>8}{'unid.':>7} | {'anterior ms':>12}{'desc.':>7}{'desb.':>7} | "
+          f"{'nuevo ms':>9}{'desc.':>7}{'desb.':>7}")
+    for frases in (10, 1000, 50000):
+        for escenario, unidades in (("dividir", 3), ("fusionar", max(SESIONES + 1, frases // 25))):
+            datos = syllabus(frases, min(unidades, frases))
+            anterior = medir(ajustar_anterior, datos)
+            nuevo = medir(ajustar_unidades_para_sesiones, datos)
+            print(f"{escenario:<10}{frases:>8}{len(datos):>7} | {anterior[0]:>12.2f}{anterior[1]:>7}{anterior[2]:>7.2f} | "
+                  f"{nuevo[0]:>9.2f}{nuevo[1]:>7}{nuevo[2]:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Suite de micro-benchmarks de todas las etapas del pipeline.
+
+Genera cursos sintéticos (programa chico, típico y enorme; de 0 a 100
+feriados) y mide, para cada uno:
+
+- genera_dict_unidades, extraer_conceptos_lote (sobre todos los contenidos,
+  con la caché de conceptos vacía) y ajustar_unidades_para_sesiones;
+- generar_planificacion_calendario;
+- construir_modelo_plan y construir_contextos (con la caché de contextos
+  por sesión vacía, como en una generación nueva);
+- el render DOCX de las dos plantillas incluidas (ya compiladas);
+- crear_archivo_zip (sin caché de artefactos, con render real).
+
+Cada medida es el mejor tiempo medio por llamada (ms) entre varias
+repeticiones. El resultado se escribe en JSON y se compara con la línea de
+base guardada (benchmarks/linea_base.json): si alguna etapa es más lenta
+que la base por encima de la tolerancia, el proceso termina con código 1.
+
+Uso:
+    python benchmarks/suite.py                       # medir y comparar
+    python benchmarks/suite.py --salida resultados.json
+    python benchmarks/suite.py --guardar-base        # actualizar la línea de base
+    python benchmarks/suite.py --escenarios tipico --tolerancia 0.5
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# Se mide el render real: sin caché de artefactos
+os.environ["PLANEAMIENTO_CACHE_MB"] = "0"
+
+import motor_render  # noqa: E402
+import planificacion  # noqa: E402
+from conceptos import extraer_conceptos_lote, obtener_cache_conceptos  # noqa: E402
+from registro_plantillas import obtener_registro  # noqa: E402
+
+LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "linea_base.json")
+
+# Tolerancia por defecto: +30 % sobre la base cuenta como regresión
+TOLERANCIA = 0.30
+
+# nombre: (unidades, temas por unidad, feriados, sesiones de clase)
+ESCENARIOS = {
+    "chico": (2, 5, 0, 16),
+    "tipico": (5, 12, 8, 16),
+    "enorme": (40, 150, 100, 60),
+}
+
+PALABRAS = ("análisis", "modelo", "proceso", "gestión", "sistema", "datos", "diseño",
+            "evaluación", "estrategia", "calidad", "red", "control", "riesgo", "costo")
+
+
+def curso_sintetico(unidades, temas, cantidad_feriados, total_sesiones, semilla=0):
+    """Entradas de un curso con contenidos y feriados generados"""
+    generador = random.Random(semilla)
+    unidades_data = [
+        (
+            f"Unidad {u}",
+            "\n".join(
+                f"Tema {u}.{t}: " + ", ".join(generador.choices(PALABRAS, k=6))
+                for t in range(1, temas + 1)
+            ),
+        )
+        for u in range(1, unidades + 1)
+    ]
+    fecha_inicio = date(2025, 3, 3)
+    # Días de semana dentro del período (hasta un año y medio)
+    dias_habiles = [
+        fecha for fecha in (fecha_inicio + timedelta(days=d) for d in range(540))
+        if fecha.weekday() < 5
+    ]
+    feriados = sorted(generador.sample(dias_habiles, cantidad_feriados))
+    return {
+        "unidades_data": unidades_data,
+        "fecha_inicio": fecha_inicio,
+        "fecha_fin": fecha_inicio + timedelta(weeks=total_sesiones),
+        "fecha_examen_final": fecha_inicio + timedelta(weeks=total_sesiones + 2),
+        "dia_clase": "lunes",
+        "feriados": feriados,
+        "opciones_calendario": {"total_sesiones": total_sesiones, "dias_extra": ["miércoles"]},
+    }
+
+
+def etapas(curso):
+    """Etapas a medir para un curso: nombre → función sin argumentos"""
+    total_sesiones = curso["opciones_calendario"]["total_sesiones"]
+    pruebas = [5, 10]
+    unidades_originales = planificacion.genera_dict_unidades(curso["unidades_data"])
+    contenidos = [frase for frases in unidades_originales.values() for frase in frases]
+
+    generado = datetime(2025, 1, 1)
+    resultado = planificacion.generar_resultado({
+        **curso, "nombres_feriados": {}, "prueba1": pruebas[0], "prueba2": pruebas[1], "semilla": 1,
+        "documentos": False, "plantilla_planeamiento": None, "plantilla_cronograma": None,
+        "generado": generado,
+    })
+    configuracion = dict(resultado["plan"].configuracion)
+
+    def modelo():
+        return planificacion.construir_modelo_plan(
+            resultado["plan_semanal"], resultado["unidades_originales"], configuracion,
+            random.Random(1), generado
+        )
+
+    plan = modelo()
+    context, context_cronograma = planificacion.construir_contextos(plan)
+
+    plantillas = obtener_registro(os.path.join(RAIZ, "templates"))
+    planeamiento = plantillas.obtener("planeamiento")["datos"]
+    cronograma = plantillas.obtener("cronograma")["datos"]
+
+    def conceptos_en_frio():
+        obtener_cache_conceptos().limpiar()
+        return extraer_conceptos_lote(contenidos)
+
+    def contextos_en_frio():
+        planificacion._contextos_sesion.cache_clear()
+        return planificacion.construir_contextos(plan)
+
+    def zip_completo():
+        paquete, errores = planificacion.crear_archivo_zip(
+            context, context_cronograma, planeamiento, cronograma, plan
+        )
+        if errores:
+            raise RuntimeError("; ".join(errores))
+        paquete.cerrar()
+
+    return {
+        "genera_dict_unidades": lambda: planificacion.genera_dict_unidades(curso["unidades_data"]),
+        "extraer_conceptos_lote": conceptos_en_frio,
+        "ajustar_unidades_para_sesiones": lambda: planificacion.ajustar_unidades_para_sesiones(
+            unidades_originales, total_sesiones - 6
+        ),
+        "generar_planificacion_calendario": lambda: planificacion.generar_planificacion_calendario(
+            curso["fecha_inicio"], [0, 2], curso["fecha_examen_final"], curso["feriados"],
+            pruebas, [4, 9], [6, 11], total_sesiones
+        ),
+        "construir_modelo_plan": modelo,
+        "construir_contextos": contextos_en_frio,
+        "render_planeamiento": lambda: motor_render.renderizar_docx(planeamiento, context),
+        "render_cronograma": lambda: motor_render.renderizar_docx(cronograma, context_cronograma),
+        "crear_archivo_zip": zip_completo,
+    }
+
+
+def medir(funcion, repeticiones=5):
+    """Mejor tiempo medio por llamada (ms), con lotes de al menos 0,2 s"""
+    temporizador = timeit.Timer(funcion)
+    numero, _ = temporizador.autorange()
+    return min(temporizador.repeat(repeat=repeticiones, number=numero)) / numero * 1000
+
+
+def ejecutar(escenarios):
+    resultados = {}
+    for nombre in escenarios:
+        curso = curso_sintetico(*ESCENARIOS[nombre])
+        for etapa, funcion in etapas(curso).items():
+            # La primera llamada compila plantillas y calienta cachés
+            funcion()
+            resultados[f"{nombre}/{etapa}"] = round(medir(funcion), 4)
+            print(f"  {nombre}/{etapa}: {resultados[f'{nombre}/{etapa}']:.3f} ms", file=sys.stderr)
+    return {
+        "generado": datetime.now().isoformat(timespec="seconds"),
+        "entorno": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "unidad": "ms",
+        "resultados": resultados,
+    }
+
+
+def comparar(actual, base, tolerancia):
+    """Tabla de comparación y lista de etapas que empeoraron más que la tolerancia"""
+    lineas = [f"{'etapa':<48}{'base':>10}{'actual':>10}{'cambio':>9}"]
+    regresiones = []
+    for clave, ms in actual["resultados"].items():
+        ms_base = base["resultados"].get(clave)
+        if ms_base is None:
+            lineas.append(f"{clave:<48}{'-':>10}{ms:>10.3f}{'nueva':>9}")
+            continue
+        cambio = ms / ms_base - 1
+        marca = ""
+        if cambio > tolerancia:
+            regresiones.append(clave)
+            marca = "  ← regresión"
+        lineas.append(f"{clave:<48}{ms_base:>10.3f}{ms:>10.3f}{cambio:>+9.0%}{marca}")
+    return lineas, regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de las etapas del pipeline de planificación")
+    parser.add_argument("--escenarios", nargs="+", choices=list(ESCENARIOS), default=list(ESCENARIOS))
+    parser.add_argument("--salida", help="archivo JSON donde escribir los resultados")
+    parser.add_argument("--base", default=LINEA_BASE, help="línea de base con la que comparar")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                        help="empeoramiento relativo admitido (0.3 = 30 %%)")
+    parser.add_argument("--guardar-base", action="store_true", help="guardar los resultados como línea de base")
+    args = parser.parse_args(argv)
+
+    actual = ejecutar(args.escenarios)
+    texto = json.dumps(actual, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write(texto + "\n")
+
+    if args.guardar_base:
+        with open(args.base, 'w', encoding='utf-8') as f:
+            f.write(texto + "\n")
+        print(f"Línea de base guardada en {args.base}")
+        return 0
+
+    if not os.path.exists(args.base):
+        print(texto)
+        print(f"No hay línea de base en {args.base}; use --guardar-base para crearla", file=sys.stderr)
+        return 0
+
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    lineas, regresiones = comparar(actual, base, args.tolerancia)
+    print("\n".join(lineas))
+    if regresiones:
+        print(f"\n{len(regresiones)} etapa(s) más lentas que la base (+{args.tolerancia:.0%}): "
+              + ", ".join(regresiones))
+        return 1
+    print("\nSin regresiones respecto de la línea de base")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
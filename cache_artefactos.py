@@ -0,0 +1,210 @@
+"""
+Caché en disco de documentos renderizados, direccionada por contenido.
+
+Cada artefacto se guarda con una clave derivada del hash de la plantilla, el
+hash del contexto renderizado, el tipo de salida y la versión del
+renderizador (docxtpl y motor_render), así que dos docentes que
+generan el mismo documento comparten el archivo y el segundo lo recibe sin
+volver a ejecutar docxtpl.
+
+- Las escrituras son atómicas (archivo temporal en el mismo directorio y
+  os.replace): varios procesos del servidor, o del modo por lotes, pueden
+  usar el mismo directorio y nunca leen un artefacto a medio escribir.
+- El tamaño total está acotado; al superarlo se borran los artefactos usados
+  hace más tiempo (LRU por mtime, que se actualiza en cada acierto).
+- Los aciertos, fallos y desalojos se cuentan por proceso. El tamaño y el
+  número de artefactos se llevan en memoria (se suman en cada escritura y
+  se recalculan al desalojar), así que las estadísticas no recorren el
+  directorio; con varios procesos son una estimación.
+
+Configuración: PLANEAMIENTO_CACHE_DIR (directorio; por defecto
+.cache_artefactos junto a este módulo, sin importar el directorio de
+trabajo) y PLANEAMIENTO_CACHE_MB (tamaño máximo; 0 desactiva la caché).
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from functools import lru_cache
+from importlib import metadata
+
+DIRECTORIO_CACHE = os.environ.get(
+    "PLANEAMIENTO_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_artefactos")
+)
+MAX_MB_CACHE = float(os.environ.get("PLANEAMIENTO_CACHE_MB", 256))
+
+# Al desalojar se baja hasta esta fracción del máximo, para no recorrer el
+# directorio en cada escritura cuando la caché está llena
+FRACCION_TRAS_DESALOJO = 0.9
+
+# Subir cuando cambie lo que produce motor_render para un mismo contexto:
+# invalida los artefactos guardados con la versión anterior
+VERSION_MOTOR = 1
+
+
+@lru_cache(maxsize=None)
+def version_renderizador():
+    """Versión de docxtpl y de motor_render, sin importar docxtpl"""
+    try:
+        docxtpl = metadata.version("docxtpl")
+    except metadata.PackageNotFoundError:
+        docxtpl = None
+    return f"docxtpl={docxtpl};motor={VERSION_MOTOR}"
+
+
+def hash_contexto(context):
+    """Hash estable del contexto de una plantilla"""
+    texto = json.dumps(context, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def clave_artefacto(hash_plantilla, hash_context, tipo):
+    """Clave del artefacto: (plantilla, contexto, tipo de salida, versión del renderizador)"""
+    return hashlib.sha256(
+        f"{hash_plantilla}:{hash_context}:{tipo}:{version_renderizador()}".encode('utf-8')
+    ).hexdigest()
+
+
+class CacheArtefactos:
+    """Artefactos en disco con tamaño máximo y desalojo LRU"""
+
+    def __init__(self, directorio=DIRECTORIO_CACHE, max_bytes=int(MAX_MB_CACHE * 1024 * 1024)):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._tamano = None  # estimado; None obliga a recorrer el directorio
+        self._cantidad = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    @property
+    def activa(self):
+        return self.max_bytes > 0
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave[:2], clave)
+
+    def obtener(self, clave):
+        """Contenido del artefacto o None si no está en la caché"""
+        if not self.activa:
+            return None
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'rb') as f:
+                datos = f.read()
+            # Marca de uso para el LRU (compartida entre procesos)
+            os.utime(ruta)
+        except OSError:
+            # No existe, o lo desalojó otro proceso entre open y utime
+            with self._lock:
+                self.fallos += 1
+            return None
+        with self._lock:
+            self.aciertos += 1
+        return datos
+
+    def guardar(self, clave, datos):
+        """Guarda el artefacto de forma atómica y desaloja si se supera el máximo"""
+        if not self.activa or len(datos) > self.max_bytes:
+            return
+        ruta = self._ruta(clave)
+        try:
+            anterior = os.stat(ruta).st_size
+        except OSError:
+            anterior = None
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), prefix=".tmp-")
+            try:
+                with os.fdopen(descriptor, 'wb') as f:
+                    f.write(datos)
+                os.replace(temporal, ruta)
+            except BaseException:
+                os.unlink(temporal)
+                raise
+        except OSError:
+            # Sin espacio o sin permisos: la caché es opcional
+            return
+
+        with self._lock:
+            if self._tamano is not None:
+                if anterior is None:
+                    self._cantidad += 1
+                    self._tamano += len(datos)
+                else:
+                    self._tamano += len(datos) - anterior
+            if self._tamano is None or self._tamano > self.max_bytes:
+                self._desalojar()
+
+    def _entradas(self):
+        """(mtime, tamaño, ruta) de todos los artefactos en disco"""
+        entradas = []
+        try:
+            subdirectorios = list(os.scandir(self.directorio))
+        except OSError:
+            return entradas
+        for subdirectorio in subdirectorios:
+            if not subdirectorio.is_dir():
+                continue
+            for entrada in os.scandir(subdirectorio.path):
+                if entrada.name.startswith(".tmp-"):
+                    continue
+                try:
+                    st = entrada.stat()
+                except OSError:
+                    continue
+                entradas.append((st.st_mtime, st.st_size, entrada.path))
+        return entradas
+
+    def _desalojar(self):
+        """Borra los artefactos menos usados hasta volver bajo el máximo (con el lock tomado)"""
+        entradas = self._entradas()
+        total = sum(tamano for _, tamano, _ in entradas)
+        cantidad = len(entradas)
+        if total > self.max_bytes:
+            objetivo = self.max_bytes * FRACCION_TRAS_DESALOJO
+            for _, tamano, ruta in sorted(entradas):
+                if total <= objetivo:
+                    break
+                try:
+                    os.remove(ruta)
+                    self.desalojos += 1
+                except OSError:
+                    # Ya lo borró otro proceso
+                    pass
+                total -= tamano
+                cantidad -= 1
+        self._tamano = total
+        self._cantidad = cantidad
+
+    def estadisticas(self):
+        """Contadores en memoria; solo recorre el directorio la primera vez"""
+        with self._lock:
+            if self._tamano is None:
+                entradas = self._entradas()
+                self._tamano = sum(tamano for _, tamano, _ in entradas)
+                self._cantidad = len(entradas)
+            return {
+                "entradas": self._cantidad,
+                "bytes": self._tamano,
+                "max_bytes": self.max_bytes,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def obtener_cache():
+    """Caché única por proceso, compartida por todas las sesiones"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CacheArtefactos()
+        return _cache
@@ -0,0 +1,131 @@
+"""
+Motor de calendario del período lectivo.
+
+Las fechas de las sesiones se calculan en bloque con la aritmética de días
+hábiles de NumPy: los días de clase forman la máscara semanal y los feriados
+y las semanas sin clases son días no hábiles, de modo que una sesión que cae
+en feriado pasa sola al siguiente día de clase libre.
+
+Las secciones que comparten días de clase, feriados y semanas sin clases se
+calculan en una única llamada vectorizada, cualquiera sea su fecha de inicio.
+
+NumPy se importa al primer cálculo, no al importar el módulo.
+"""
+
+SESIONES_POR_DEFECTO = 16
+
+
+def _mascara_semanal(dias_clase):
+    """Máscara lunes..domingo con los días de clase (números 0-6)"""
+    mascara = [0] * 7
+    for dia in dias_clase:
+        if not 0 <= int(dia) <= 6:
+            raise ValueError(f"Día de clase fuera de rango: {dia}")
+        mascara[int(dia)] = 1
+    if not any(mascara):
+        raise ValueError("Debe haber al menos un día de clase por semana")
+    return mascara
+
+
+def _como_fechas(valores):
+    import numpy as np
+    return np.asarray([np.datetime64(v, 'D') for v in valores], dtype='datetime64[D]')
+
+
+def dias_semanas_omitidas(fecha_inicio, semanas_omitidas):
+    """
+    Días que abarcan las semanas sin clases; la semana 1 empieza en fecha_inicio
+    y cada semana son los 7 días siguientes.
+    """
+    import numpy as np
+    if not semanas_omitidas:
+        return np.array([], dtype='datetime64[D]')
+    inicio = np.datetime64(fecha_inicio, 'D')
+    semanas = np.asarray(sorted({int(s) for s in semanas_omitidas if int(s) >= 1}), dtype='int64')
+    desplazamientos = ((semanas - 1) * 7)[:, None] + np.arange(7)[None, :]
+    return (inicio + desplazamientos).ravel()
+
+
+def calcular_fechas_sesiones(fechas_inicio, dias_clase, total_sesiones=SESIONES_POR_DEFECTO,
+                             feriados=(), semanas_omitidas=(), reagendar_feriados=True):
+    """
+    Fechas de las sesiones de una o varias secciones con los mismos días de clase.
+
+    fechas_inicio: fecha o secuencia de fechas (una por sección).
+    dias_clase: números de día (0 = lunes) en que se dicta clase.
+    semanas_omitidas: números de semana (desde 1, contadas desde el inicio) sin clases.
+    reagendar_feriados: si es True, una sesión que cae en feriado pasa al
+    siguiente día de clase libre; si no, se mantiene y queda marcada.
+
+    Devuelve (fechas, en_feriado, reagendada): arreglos de forma
+    (secciones, total_sesiones); fechas es datetime64[D] y reagendada marca
+    las sesiones que se movieron por caer en feriado.
+    """
+    import numpy as np
+    inicios = np.atleast_1d(np.asarray(fechas_inicio, dtype='datetime64[D]'))
+    mascara = _mascara_semanal(dias_clase)
+    feriados_np = np.unique(_como_fechas(feriados))
+    sesiones = np.arange(int(total_sesiones))
+
+    fechas = np.empty((len(inicios), len(sesiones)), dtype='datetime64[D]')
+    reagendada = np.zeros(fechas.shape, dtype=bool)
+
+    # Las semanas sin clases dependen de la fecha de inicio: un grupo por inicio
+    if semanas_omitidas:
+        unicos, grupo_de = np.unique(inicios, return_inverse=True)
+        grupos = [(unicos[g], grupo_de == g) for g in range(len(unicos))]
+    else:
+        grupos = [(None, slice(None))]
+
+    for inicio_grupo, filas in grupos:
+        omitidos = (dias_semanas_omitidas(inicio_grupo, semanas_omitidas)
+                    if inicio_grupo is not None else np.array([], dtype='datetime64[D]'))
+        cal_base = np.busdaycalendar(weekmask=mascara, holidays=omitidos)
+        primeras = np.busday_offset(inicios[filas], 0, roll='forward', busdaycal=cal_base)
+        base = np.busday_offset(primeras[:, None], sesiones[None, :], busdaycal=cal_base)
+
+        if reagendar_feriados and len(feriados_np):
+            cal = np.busdaycalendar(weekmask=mascara, holidays=np.concatenate([omitidos, feriados_np]))
+            primeras = np.busday_offset(inicios[filas], 0, roll='forward', busdaycal=cal)
+            fechas[filas] = np.busday_offset(primeras[:, None], sesiones[None, :], busdaycal=cal)
+            # Solo se marca la sesión que caía en el feriado; las siguientes se corren con ella
+            reagendada[filas] = np.isin(base, feriados_np)
+        else:
+            fechas[filas] = base
+
+    en_feriado = np.isin(fechas, feriados_np)
+    return fechas, en_feriado, reagendada
+
+
+def generar_calendarios(secciones, total_sesiones=SESIONES_POR_DEFECTO, feriados=(),
+                        semanas_omitidas=(), reagendar_feriados=True, con_marcas=False):
+    """
+    Calendarios de muchas secciones en bloque.
+    secciones: iterable de (fecha_inicio, dias_clase) con dias_clase como
+    número o secuencia de números de día.
+    Devuelve, en el mismo orden, una lista de listas de fechas (datetime.date);
+    con con_marcas, una lista de (fechas, en_feriado, reagendada) con las
+    marcas de cada sesión como listas de bool.
+    """
+    secciones = [
+        (inicio, (dias,) if isinstance(dias, int) else tuple(sorted(set(dias))))
+        for inicio, dias in secciones
+    ]
+    por_dias = {}
+    for posicion, (inicio, dias) in enumerate(secciones):
+        por_dias.setdefault(dias, []).append((posicion, inicio))
+
+    resultado = [None] * len(secciones)
+    for dias, miembros in por_dias.items():
+        posiciones = [p for p, _ in miembros]
+        fechas, en_feriado, reagendada = calcular_fechas_sesiones(
+            _como_fechas([inicio for _, inicio in miembros]), dias, total_sesiones,
+            feriados, semanas_omitidas, reagendar_feriados
+        )
+        filas = fechas.astype(object).tolist()
+        if con_marcas:
+            filas = list(zip(filas, en_feriado.tolist(), reagendada.tolist()))
+        for posicion, fila in zip(posiciones, filas):
+            resultado[posicion] = fila
+    return resultado
+
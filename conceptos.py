@@ -0,0 +1,230 @@
+"""
+Extracción de conceptos clave en español.
+
+Cada fragmento se tokeniza, las palabras vacías (artículos, preposiciones,
+pronombres, verbos auxiliares...) y la puntuación cortan el texto en
+candidatos, y los candidatos se unen en frases nominales cuando están
+enlazados por "de"/"del" (más artículo): "gestión de los procesos de
+calidad" queda como una sola frase. Las frases se puntúan como en RAKE
+(grado / frecuencia de cada palabra dentro del fragmento) y se devuelven de
+mayor a menor puntaje.
+
+Los etiquetadores morfosintácticos que trae NLTK son para inglés, así que el
+agrupamiento en frases nominales es por reglas. Si el corpus de stopwords de
+NLTK está instalado, su lista en español se suma a la propia.
+
+extraer_conceptos_lote procesa todos los fragmentos de un plan (o de muchos
+cursos) en una sola llamada: los textos repetidos se analizan una vez y los
+resultados se memorizan por texto normalizado en una caché LRU acotada,
+compartida por el proceso.
+"""
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+
+from recursos_nltk import cargar_nltk
+
+# Frases que se memorizan por proceso
+MAX_CONCEPTOS_CACHE = 8192
+
+# Largo máximo (en palabras) de un concepto
+MAX_PALABRAS_CONCEPTO = 6
+
+PALABRAS_VACIAS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes aquel aquella aquellas aquellos aqui asi
+aun bajo bien cada casi como con contra cual cuales cuando cuanto de del desde donde dos durante
+e el ella ellas ellos en entre era eran es esa esas ese eso esos esta estaba estado estan estar
+estas este esto estos etc fue fueron ha han hasta hay la las le les lo los mas me mediante mi mis
+mismo muy mucho muchos nada ni no nos nuestra nuestro o otra otras otro otros para pero poco por
+porque puede pueden que se sea sean segun ser si sido siempre sin sino sobre son su sus tal
+tambien tan tanto te tiene tienen toda todas todo todos tras tu tus u un una unas uno unos usted
+vez y ya
+capitulo clase modulo parte semana sesion tema temas unidad
+""".split())
+
+# Enlaces que mantienen unida una frase nominal ("gestión de los procesos")
+ENLACES = frozenset(("de", "del"))
+ARTICULOS = frozenset(("el", "la", "los", "las"))
+CONECTORES = ENLACES | ARTICULOS
+
+_RE_TOKEN = re.compile(r"\w+(?:[-'’/]\w+)*|[^\w\s]|\n")
+# Tras estos tokens empieza una oración (o un renglón)
+INICIOS_ORACION = frozenset(("\n", ".", ":", ";", "!", "?", "¡", "¿", "•", "-"))
+
+_palabras_vacias = None
+_palabras_vacias_lock = threading.Lock()
+
+
+def _sin_tildes(palabra):
+    return "".join(
+        c for c in unicodedata.normalize("NFD", palabra) if unicodedata.category(c) != "Mn"
+    )
+
+
+@lru_cache(maxsize=16384)
+def _clave(token):
+    """Forma de comparación del token: minúsculas y sin tildes"""
+    return _sin_tildes(token.lower())
+
+
+def palabras_vacias():
+    """Palabras vacías propias más las de NLTK en español (si el corpus está instalado)"""
+    global _palabras_vacias
+    with _palabras_vacias_lock:
+        if _palabras_vacias is None:
+            vacias = set(PALABRAS_VACIAS)
+            nltk = cargar_nltk()
+            if nltk is not None:
+                try:
+                    vacias.update(_sin_tildes(p) for p in nltk.corpus.stopwords.words("spanish"))
+                except (LookupError, OSError):
+                    pass
+            _palabras_vacias = frozenset(vacias)
+        return _palabras_vacias
+
+
+def normalizar(texto):
+    """Clave de la caché: Unicode NFC y espacios colapsados"""
+    if not unicodedata.is_normalized("NFC", texto):
+        texto = unicodedata.normalize("NFC", texto)
+    return "\n".join(" ".join(partes) for partes in map(str.split, texto.split("\n")) if partes)
+
+
+def _candidatos(texto, vacias):
+    """
+    Frases nominales candidatas: (empieza oración, [(token, clave sin tildes), ...])
+    """
+    frases = []
+    actual = []
+    pendiente = []  # enlace "de" (+ artículo) a la espera de una palabra de contenido
+    inicio_oracion = al_inicio = True
+    for token in _RE_TOKEN.findall(texto):
+        clave = _clave(token)
+        es_palabra = token[0].isalnum() or token[0] == "_"
+        if es_palabra and not clave.isdigit() and clave not in vacias and len(clave) > 1:
+            if not actual:
+                inicio_oracion = al_inicio
+            al_inicio = False
+            actual.extend(pendiente)
+            pendiente = []
+            actual.append((token, clave))
+            continue
+        if actual and clave in ENLACES and not pendiente:
+            pendiente = [(token, clave)]
+            continue
+        if pendiente and clave in ARTICULOS and len(pendiente) == 1:
+            pendiente.append((token, clave))
+            continue
+        if actual:
+            frases.append((inicio_oracion, actual))
+        actual, pendiente = [], []
+        al_inicio = token in INICIOS_ORACION or (al_inicio and not es_palabra)
+    if actual:
+        frases.append((inicio_oracion, actual))
+    return frases
+
+
+def analizar(texto):
+    """Conceptos del texto, de mayor a menor puntaje (sin caché)"""
+    vacias = palabras_vacias()
+    frases = []
+    for inicio_oracion, frase in _candidatos(texto, vacias):
+        # Las frases muy largas se cortan en tramos de contenido
+        for inicio in range(0, len(frase), MAX_PALABRAS_CONCEPTO):
+            tramo = frase[inicio:inicio + MAX_PALABRAS_CONCEPTO]
+            while tramo and tramo[-1][1] in CONECTORES:
+                tramo = tramo[:-1]
+            if tramo:
+                frases.append((inicio_oracion and inicio == 0, tramo))
+
+    # RAKE: grado (palabras con las que co-ocurre) sobre frecuencia
+    frecuencia = {}
+    grado = {}
+    for _, frase in frases:
+        contenido = [clave for _, clave in frase if clave not in CONECTORES]
+        for clave in contenido:
+            frecuencia[clave] = frecuencia.get(clave, 0) + 1
+            grado[clave] = grado.get(clave, 0) + len(contenido)
+
+    puntajes = {}
+    orden = []
+    for posicion, (inicio_oracion, frase) in enumerate(frases):
+        texto_frase = " ".join(token for token, _ in frase)
+        # "Gestión de riesgos" al comienzo de un renglón → "gestión de riesgos"
+        # (las siglas y los nombres propios en medio del texto se respetan)
+        primera = frase[0][0]
+        if inicio_oracion and primera[:1].isupper() and not primera.isupper():
+            texto_frase = texto_frase[0].lower() + texto_frase[1:]
+        clave_frase = " ".join(clave for _, clave in frase)
+        if clave_frase in puntajes:
+            continue
+        puntajes[clave_frase] = sum(
+            grado[clave] / frecuencia[clave] for _, clave in frase if clave in frecuencia
+        )
+        orden.append((-puntajes[clave_frase], posicion, texto_frase))
+    return [texto_frase for _, _, texto_frase in sorted(orden)]
+
+
+class CacheConceptos:
+    """LRU de conceptos por texto normalizado"""
+
+    def __init__(self, maximo=MAX_CONCEPTOS_CACHE):
+        self.maximo = maximo
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def extraer_lote(self, textos):
+        """Lista de conceptos de cada texto, en el mismo orden"""
+        claves = [normalizar(texto) for texto in textos]
+        resultados = {}
+        faltantes = []
+        with self._lock:
+            for clave in dict.fromkeys(claves):
+                conceptos = self._entradas.get(clave)
+                if conceptos is None:
+                    faltantes.append(clave)
+                else:
+                    self._entradas.move_to_end(clave)
+                    resultados[clave] = conceptos
+            self.aciertos += len(claves) - len(faltantes)
+            self.fallos += len(faltantes)
+
+        # El análisis corre fuera del lock; cada texto distinto, una sola vez
+        nuevos = {clave: tuple(analizar(clave)) for clave in faltantes}
+        resultados.update(nuevos)
+        with self._lock:
+            for clave, conceptos in nuevos.items():
+                self._entradas[clave] = conceptos
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+        return [list(resultados[clave]) for clave in claves]
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self):
+        with self._lock:
+            return {"entradas": len(self._entradas), "aciertos": self.aciertos, "fallos": self.fallos}
+
+
+_cache = CacheConceptos()
+
+
+def obtener_cache_conceptos():
+    """Caché única por proceso"""
+    return _cache
+
+
+def extraer_conceptos_lote(textos):
+    """Conceptos de muchos fragmentos en una sola llamada (con memorización)"""
+    return _cache.extraer_lote(textos)
+
+
+def extraer_conceptos(texto):
+    """Conceptos de un solo fragmento"""
+    return _cache.extraer_lote([texto])[0]
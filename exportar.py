@@ -0,0 +1,342 @@
+"""
+Exportación de la planificación en varios formatos.
+
+Cada formato es un escritor que produce el documento por partes (encabezado,
+una parte por sesión y cierre) a partir del modelo del plan (modelo_plan.Plan),
+de modo que se puede volcar en cualquier archivo o buffer, o pasar
+directamente como entrada de un ZIP, sin armar el texto completo.
+
+Formatos: txt, json, csv, ics. Para agregar uno basta con registrar una
+subclase de Escritor en FORMATOS.
+"""
+import csv
+import hashlib
+import io
+import json
+from dataclasses import asdict
+from datetime import date, datetime, timedelta
+
+SEPARADOR = "=" * 80
+LINEA_SESION = "-" * 70 + "\n"
+
+
+class Escritor:
+    """Formato de exportación: cada método devuelve la parte de texto correspondiente"""
+    extension = ""
+    mime = "text/plain"
+    etiqueta = ""
+
+    def __init__(self, plan, **opciones):
+        self.plan = plan
+        self.opciones = opciones
+
+    def encabezado(self):
+        return ""
+
+    def sesion(self, sesion):
+        return ""
+
+    def cierre(self):
+        return ""
+
+
+# === TXT ===
+class EscritorTXT(Escritor):
+    """
+    Resumen de texto. Opciones: solo_plan (sin encabezado ni unidades, para
+    mostrar en pantalla) y archivos (lista de (etiqueta, nombre) del paquete).
+    """
+    extension = "txt"
+    mime = "text/plain"
+    etiqueta = "Texto (TXT)"
+
+    def encabezado(self):
+        lineas = []
+        if not self.opciones.get("solo_plan"):
+            configuracion = self.plan.configuracion
+            lineas.append(f"PLANIFICACIÓN DOCENTE - GENERADA EL {self.plan.generado.strftime('%d/%m/%Y %H:%M:%S')}")
+            lineas.append(SEPARADOR)
+            lineas.append(f"PERÍODO: {configuracion['fecha_inicio']} al {configuracion['fecha_fin']}")
+            lineas.append(f"DÍA DE CLASE: {configuracion['dia_clase'].capitalize()}")
+            if configuracion['feriados']:
+                lineas.append(f"FERIADOS: {', '.join(_texto_fecha(f) for f in configuracion['feriados'])}")
+            if configuracion['pruebas']:
+                lineas.append(f"PRUEBAS EN SESIONES: {', '.join(map(str, configuracion['pruebas']))}")
+            lineas.append(f"EXAMEN FINAL: {configuracion['fecha_examen_final']}")
+            if configuracion.get('semilla') is not None:
+                lineas.append(f"SEMILLA: {configuracion['semilla']}")
+            lineas.append("\n" + SEPARADOR)
+            lineas.append("UNIDADES PROGRAMADAS:")
+            lineas.append("-" * 40)
+            for i, (titulo, contenidos) in enumerate(self.plan.unidades, 1):
+                lineas.append(f"{i}. {titulo}")
+                lineas.extend(f"   - {contenido}" for contenido in contenidos)
+                lineas.append("")
+            lineas.append(SEPARADOR)
+        lineas.append("\n📋 Planificación semanal completa:")
+        lineas.append(SEPARADOR)
+        return "\n".join(lineas) + "\n"
+
+    def sesion(self, sesion):
+        clase = sesion.clase
+        if clase:
+            momentos = clase.momentos
+            detalle = (
+                f" 🟢 Unidad: {clase.unidad}\n"
+                f" 📄 Contenido: {clase.contenido}\n"
+                f" 🎯 Objetivo: {clase.objetivo}\n"
+                f" 🪜 Nivel Bloom: {clase.nivel}\n"
+                f" 📌 Momentos Didácticos:\n"
+                f" ▪ Retroalimentación: {momentos.retroalimentacion}\n"
+                f" ▪ Introducción: {momentos.introduccion}\n"
+                f" ▪ Inicio: {momentos.inicio}\n"
+                f" ▪ Desarrollo: {momentos.desarrollo}\n"
+                f" ▪ Cierre: {momentos.cierre}\n"
+                f" 🧰 Recursos: {clase.recursos}\n"
+                f" 📝 Evaluación: {clase.evaluacion}\n"
+            )
+        else:
+            detalle = DETALLE_EVENTOS.get(sesion.evento, "")
+        if sesion.en_feriado:
+            detalle += " ⚠️ ¡Advertencia! Esta sesión coincide con un feriado. Reagendar si es necesario.\n"
+        elif sesion.reagendada:
+            detalle += " 📅 Sesión reagendada por feriado.\n"
+        return (
+            f"Sesión {sesion.numero:2d} | {sesion.fecha_es} | {sesion.evento}\n"
+            f"{detalle}{LINEA_SESION}"
+        )
+
+    def cierre(self):
+        archivos = self.opciones.get("archivos")
+        if not archivos:
+            return ""
+        return (
+            "\n" + SEPARADOR + "\nARCHIVOS GENERADOS:\n"
+            + "".join(f"- {etiqueta}: {nombre}\n" for etiqueta, nombre in archivos)
+        )
+
+
+DETALLE_EVENTOS = {
+    "Prueba parcial": " 📝 Evaluación parcial programada\n",
+    "Retroalimentación": " 🔄 Sesión de retroalimentación pre-prueba\n",
+    "Revisión de prueba": " 📊 Revisión y análisis de resultados de prueba\n",
+    "Examen final": " 🎓 Evaluación final del curso\n",
+}
+
+
+# === JSON ===
+def _texto_fecha(valor):
+    return valor.strftime('%Y-%m-%d') if hasattr(valor, 'strftime') else str(valor)
+
+
+def _json_por_defecto(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    raise TypeError(f"{type(valor).__name__} no es serializable")
+
+
+class EscritorJSON(Escritor):
+    """Documento JSON con configuración, unidades y sesiones, escrito sesión por sesión"""
+    extension = "json"
+    mime = "application/json"
+    etiqueta = "JSON"
+
+    def encabezado(self):
+        self._primera = True
+        cabecera = {
+            "generado": self.plan.generado,
+            "configuracion": dict(self.plan.configuracion),
+            "unidades": {titulo: list(contenidos) for titulo, contenidos in self.plan.unidades},
+        }
+        texto = json.dumps(cabecera, ensure_ascii=False, default=_json_por_defecto)
+        # Se abre la lista de sesiones dentro del mismo objeto
+        return texto[:-1] + ', "sesiones": ['
+
+    def sesion(self, sesion):
+        datos = asdict(sesion)
+        del datos["fecha_es"]
+        separador = "\n" if self._primera else ",\n"
+        self._primera = False
+        return separador + json.dumps(datos, ensure_ascii=False, default=_json_por_defecto)
+
+    def cierre(self):
+        return "\n]}\n"
+
+
+# === CSV ===
+COLUMNAS_CSV = [
+    "sesion", "fecha", "dia", "evento", "unidad", "contenido", "objetivo", "nivel",
+    "retroalimentacion", "introduccion", "inicio", "desarrollo", "cierre",
+    "recursos", "evaluacion", "feriado", "reagendada",
+]
+
+
+class EscritorCSV(Escritor):
+    """Una fila por sesión"""
+    extension = "csv"
+    mime = "text/csv"
+    etiqueta = "CSV (planilla)"
+
+    def _fila(self, valores):
+        # Un único buffer de una línea, reutilizado para cada fila
+        self._linea.seek(0)
+        self._linea.truncate()
+        self._csv.writerow(valores)
+        return self._linea.getvalue()
+
+    def encabezado(self):
+        self._linea = io.StringIO()
+        self._csv = csv.writer(self._linea)
+        return self._fila(COLUMNAS_CSV)
+
+    def sesion(self, sesion):
+        clase = sesion.clase
+        if clase:
+            momentos = clase.momentos
+            detalle = [
+                clase.unidad, clase.contenido, clase.objetivo, clase.nivel,
+                momentos.retroalimentacion, momentos.introduccion, momentos.inicio,
+                momentos.desarrollo, momentos.cierre, clase.recursos, clase.evaluacion,
+            ]
+        else:
+            detalle = [""] * 11
+        return self._fila([
+            sesion.numero,
+            sesion.fecha.isoformat(),
+            sesion.fecha_es.split(",")[0],
+            sesion.evento,
+            *detalle,
+            "sí" if sesion.en_feriado else "",
+            "sí" if sesion.reagendada else "",
+        ])
+
+
+# === iCalendar ===
+def _escapar_ics(texto):
+    return (str(texto)
+            .replace("\\", "\\\\")
+            .replace(";", "\\;")
+            .replace(",", "\\,")
+            .replace("\n", "\\n"))
+
+
+def _linea_ics(linea):
+    """Línea terminada en CRLF y plegada a 75 octetos (RFC 5545)"""
+    datos = linea.encode('utf-8')
+    if len(datos) <= 75:
+        return linea + "\r\n"
+    partes = []
+    inicio = 0
+    limite = 75
+    while inicio < len(datos):
+        fin = min(inicio + limite, len(datos))
+        # No cortar un carácter UTF-8 por la mitad
+        while fin < len(datos) and (datos[fin] & 0xC0) == 0x80:
+            fin -= 1
+        partes.append(datos[inicio:fin].decode('utf-8'))
+        inicio = fin
+        limite = 74
+    return "\r\n ".join(partes) + "\r\n"
+
+
+class EscritorICS(Escritor):
+    """Calendario iCalendar con un evento de día completo por sesión"""
+    extension = "ics"
+    mime = "text/calendar"
+    etiqueta = "Calendario (iCalendar .ics)"
+
+    def encabezado(self):
+        self._marca = self.plan.generado.strftime("%Y%m%dT%H%M%S")
+        # Los UID no dependen de la fecha de generación: al volver a importar
+        # un plan regenerado, el calendario actualiza los eventos sin duplicarlos
+        curso = json.dumps([self.plan.configuracion.get("semilla"), self.plan.unidades], ensure_ascii=False)
+        self._huella = hashlib.sha256(curso.encode('utf-8')).hexdigest()[:16]
+        return (
+            "BEGIN:VCALENDAR\r\n"
+            "VERSION:2.0\r\n"
+            "PRODID:-//Planificador de Clases//ES\r\n"
+            "CALSCALE:GREGORIAN\r\n"
+        )
+
+    def sesion(self, sesion):
+        fecha = sesion.fecha
+        clase = sesion.clase
+        resumen = f"Sesión {sesion.numero}: {sesion.evento}"
+        if clase:
+            resumen += f" - {clase.unidad}"
+            descripcion = f"{clase.contenido}\n{clase.objetivo}\nNivel Bloom: {clase.nivel}"
+        else:
+            descripcion = DETALLE_EVENTOS.get(sesion.evento, "").strip()
+        return (
+            "BEGIN:VEVENT\r\n"
+            f"UID:sesion-{sesion.numero}-{fecha.strftime('%Y%m%d')}-{self._huella}@planificador\r\n"
+            f"DTSTAMP:{self._marca}\r\n"
+            f"DTSTART;VALUE=DATE:{fecha.strftime('%Y%m%d')}\r\n"
+            f"DTEND;VALUE=DATE:{(fecha + timedelta(days=1)).strftime('%Y%m%d')}\r\n"
+            + _linea_ics(f"SUMMARY:{_escapar_ics(resumen)}")
+            + (_linea_ics(f"DESCRIPTION:{_escapar_ics(descripcion)}") if descripcion else "")
+            + "END:VEVENT\r\n"
+        )
+
+    def cierre(self):
+        return "END:VCALENDAR\r\n"
+
+
+FORMATOS = {
+    escritor.extension: escritor
+    for escritor in (EscritorTXT, EscritorJSON, EscritorCSV, EscritorICS)
+}
+
+
+def partes(plan, formato, **opciones):
+    """Documento completo de un formato, como iterable de partes de texto"""
+    escritor = FORMATOS[formato](plan, **opciones)
+    yield escritor.encabezado()
+    for sesion in plan.sesiones:
+        yield escritor.sesion(sesion)
+    yield escritor.cierre()
+
+
+def exportar(plan, destinos):
+    """
+    Escribe el plan en varios formatos recorriendo las sesiones una vez.
+    destinos: lista de (formato, sink) o (formato, sink, opciones); cada sink
+    es un archivo de texto o cualquier objeto con write(str).
+    """
+    escritores = []
+    for destino in destinos:
+        formato, sink = destino[0], destino[1]
+        opciones = destino[2] if len(destino) > 2 else {}
+        escritores.append((FORMATOS[formato](plan, **opciones), sink))
+
+    # Una escritura por sesión y formato: el sink nunca ve el documento entero
+    for escritor, sink in escritores:
+        sink.write(escritor.encabezado())
+    for sesion in plan.sesiones:
+        # La parte de una sesión depende solo de la sesión y del formato: si
+        # el mismo formato va a varios sinks (pantalla y archivo) se arma una vez
+        partes_sesion = {}
+        for escritor, sink in escritores:
+            parte = partes_sesion.get(type(escritor))
+            if parte is None:
+                parte = partes_sesion[type(escritor)] = escritor.sesion(sesion)
+            sink.write(parte)
+    for escritor, sink in escritores:
+        sink.write(escritor.cierre())
+
+
+class SinkUTF8:
+    """Adapta un archivo binario como sink: codifica cada parte al escribirla"""
+
+    def __init__(self, archivo):
+        self.archivo = archivo
+
+    def write(self, texto):
+        return self.archivo.write(texto.encode('utf-8'))
+
+
+def exportar_bytes(plan, formato, **opciones):
+    """Documento de un formato codificado en UTF-8 (para descargas)"""
+    buffer = io.BytesIO()
+    exportar(plan, [(formato, SinkUTF8(buffer), opciones)])
+    return buffer.getvalue()
@@ -0,0 +1,176 @@
+"""
+Servicio de calendarios de feriados.
+
+Importa en bloque calendarios nacionales o institucionales (.ics o .csv) y
+los guarda en un índice ordenado por año: "¿es feriado?" se responde con un
+diccionario (O(1)) y "feriados entre dos fechas" con búsqueda binaria sobre
+las listas ordenadas de cada año (O(log n)).
+
+Cada archivo importado se indexa una sola vez por proceso (identificado por
+el hash de su contenido), así que todas las sesiones que usan el mismo
+calendario comparten el índice.
+"""
+import csv
+import hashlib
+import io
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+FORMATOS_FECHA = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d", "%Y%m%d")
+
+_RE_LINEA_ICS = re.compile(r'^([A-Z-]+)((?:;[^:]*)?):(.*)$')
+
+
+class CalendarioFeriados:
+    """Índice inmutable de feriados: fecha → nombre y fechas ordenadas por año"""
+
+    def __init__(self, feriados=()):
+        self._nombres = {}
+        for fecha, nombre in feriados:
+            # Si un día aparece en varios calendarios se conserva el primer nombre
+            self._nombres.setdefault(fecha, nombre or "Feriado")
+
+        self._por_anio = {}
+        for fecha in sorted(self._nombres):
+            self._por_anio.setdefault(fecha.year, []).append(fecha)
+
+    def __len__(self):
+        return len(self._nombres)
+
+    def __contains__(self, fecha):
+        return fecha in self._nombres
+
+    def es_feriado(self, fecha):
+        return fecha in self._nombres
+
+    def nombre(self, fecha):
+        """Nombre del feriado o None si la fecha no es feriado"""
+        return self._nombres.get(fecha)
+
+    def en_rango(self, desde, hasta):
+        """Feriados entre desde y hasta (ambos incluidos), en orden"""
+        resultado = []
+        for anio in range(desde.year, hasta.year + 1):
+            fechas = self._por_anio.get(anio)
+            if not fechas:
+                continue
+            inicio = bisect_left(fechas, desde) if anio == desde.year else 0
+            fin = bisect_right(fechas, hasta) if anio == hasta.year else len(fechas)
+            resultado.extend(fechas[inicio:fin])
+        return resultado
+
+    def fechas(self):
+        return [fecha for anio in sorted(self._por_anio) for fecha in self._por_anio[anio]]
+
+
+# === Lectura de archivos ===
+def parsear_fecha(valor):
+    """Fecha desde texto en los formatos habituales; None si no se reconoce"""
+    valor = valor.strip()
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(valor, formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _fecha_ics(valor):
+    # DATE (AAAAMMDD) o DATE-TIME (AAAAMMDDTHHMMSS[Z]): solo interesa el día
+    return datetime.strptime(valor.strip()[:8], "%Y%m%d").date()
+
+
+def leer_ics(texto):
+    """Lista de (fecha, nombre) de los VEVENT de un iCalendar; los eventos de varios días se expanden"""
+    # Las líneas largas continúan en la siguiente con un espacio o tabulación inicial
+    texto = re.sub(r'\r?\n[ \t]', '', texto)
+    feriados = []
+    evento = None
+    for linea in texto.splitlines():
+        if linea == "BEGIN:VEVENT":
+            evento = {}
+            continue
+        if linea == "END:VEVENT":
+            if evento and "DTSTART" in evento:
+                inicio = _fecha_ics(evento["DTSTART"])
+                # DTEND es exclusivo en eventos de día completo
+                fin = _fecha_ics(evento["DTEND"]) - timedelta(days=1) if "DTEND" in evento else inicio
+                nombre = evento.get("SUMMARY", "").replace("\\,", ",").replace("\\;", ";").strip()
+                for dias in range((max(fin, inicio) - inicio).days + 1):
+                    feriados.append((inicio + timedelta(days=dias), nombre))
+            evento = None
+            continue
+        if evento is None:
+            continue
+        coincidencia = _RE_LINEA_ICS.match(linea)
+        if coincidencia:
+            evento.setdefault(coincidencia.group(1), coincidencia.group(3))
+    return feriados
+
+
+def leer_csv(texto):
+    """
+    Lista de (fecha, nombre) de un CSV con la fecha en la primera columna y,
+    opcionalmente, el nombre en la segunda. La fila de encabezado se ignora.
+    """
+    muestra = texto[:2048]
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+    except csv.Error:
+        dialecto = csv.excel
+    feriados = []
+    for fila in csv.reader(io.StringIO(texto), dialecto):
+        if not fila or not fila[0].strip():
+            continue
+        fecha = parsear_fecha(fila[0])
+        if fecha is None:
+            # Encabezado o fila no válida
+            continue
+        feriados.append((fecha, fila[1].strip() if len(fila) > 1 else ""))
+    return feriados
+
+
+def leer_feriados(datos, nombre_archivo):
+    """Lee un calendario (.ics o .csv) en bytes y devuelve la lista de (fecha, nombre)"""
+    texto = datos.decode('utf-8-sig', errors='replace')
+    if nombre_archivo.lower().endswith(".ics") or texto.lstrip().startswith("BEGIN:VCALENDAR"):
+        return leer_ics(texto)
+    return leer_csv(texto)
+
+
+# === Índices compartidos por el proceso ===
+MAX_CALENDARIOS = 32
+
+_calendarios = {}
+_calendarios_lock = threading.Lock()
+
+
+def importar_calendario(datos, nombre_archivo):
+    """Índice del calendario importado; cada contenido distinto se lee una sola vez"""
+    clave = hashlib.sha256(datos).hexdigest()
+    with _calendarios_lock:
+        calendario = _calendarios.get(clave)
+    if calendario is None:
+        calendario = CalendarioFeriados(leer_feriados(datos, nombre_archivo))
+        with _calendarios_lock:
+            calendario = _calendarios.setdefault(clave, calendario)
+            while len(_calendarios) > MAX_CALENDARIOS:
+                _calendarios.pop(next(iter(_calendarios)))
+    return calendario
+
+
+def combinar_calendarios(calendarios, feriados_manuales=()):
+    """Un calendario con todos los importados más las fechas elegidas a mano"""
+    feriados = [
+        (fecha, calendario.nombre(fecha))
+        for calendario in calendarios for fecha in calendario.fechas()
+    ]
+    feriados.extend((fecha, "") for fecha in feriados_manuales)
+    return CalendarioFeriados(feriados)
+
+
+def indice_sesiones(sesiones):
+    """Mapa fecha → sesión del plan (modelo_plan.Sesion), para cruzar feriados sin recorrer todo el plan"""
+    return {sesion.fecha: sesion for sesion in sesiones}
@@ -0,0 +1,321 @@
+"""
+Generación por lotes (sin interfaz) de planificaciones para toda una facultad.
+
+Lee un manifiesto de cursos (JSON o CSV), ejecuta para cada uno el mismo
+pipeline que la aplicación (unidades → ajuste a sesiones → calendario →
+contextos → DOCX/TXT) repartiendo los cursos entre todos los núcleos, y
+escribe un ZIP por curso en el directorio de salida.
+
+El progreso se registra en <salida>/_lote_estado.jsonl: si el proceso se
+interrumpe, al volver a ejecutarlo se saltan los cursos ya generados.
+
+Manifiesto JSON: lista de cursos (o {"cursos": [...]}) con los campos
+    id, unidades, fecha_inicio, fecha_fin, dia_clase, feriados,
+    prueba1, prueba2, fecha_examen_final
+y, opcionalmente, las opciones del calendario
+    total_sesiones, dias_extra, semanas_omitidas, reagendar_feriados
+y calendarios_feriados (rutas a calendarios .ics o .csv a sumar a feriados)
+y programa (ruta al programa de la asignatura en .docx, .md o .txt; si está,
+reemplaza a unidades)
+y semilla (entero; si falta se deriva del programa, así que volver a
+generar un curso da el mismo plan aunque cambien fechas o feriados)
+y generado (fecha y hora de generación, AAAA-MM-DDTHH:MM:SS; si falta, la
+del momento: fijándola, volver a generar da archivos idénticos byte a byte),
+donde unidades es una lista de {"titulo": ..., "contenidos": texto o lista}
+y las fechas están en formato AAAA-MM-DD.
+
+Manifiesto CSV: mismas columnas; unidades es un JSON con la lista anterior
+y feriados, dias_extra, semanas_omitidas y calendarios_feriados son listas
+separadas por ';'.
+
+Uso:
+    python generar_lote.py cursos.json salida/ [--procesos N] [--plantillas templates]
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime
+
+ARCHIVO_ESTADO = "_lote_estado.jsonl"
+
+
+# === Lectura del manifiesto ===
+def _fecha(valor):
+    if isinstance(valor, date):
+        return valor
+    return date.fromisoformat(str(valor).strip())
+
+
+def _normalizar_curso(crudo, posicion):
+    """Convierte una fila del manifiesto en los argumentos del pipeline"""
+    unidades = crudo.get("unidades") or []
+    if isinstance(unidades, str):
+        unidades = json.loads(unidades)
+    if isinstance(unidades, dict):
+        unidades = [{"titulo": t, "contenidos": c} for t, c in unidades.items()]
+
+    unidades_data = []
+    for unidad in unidades:
+        contenidos = unidad.get("contenidos", "")
+        if isinstance(contenidos, list):
+            contenidos = "\n".join(contenidos)
+        unidades_data.append((unidad.get("titulo", ""), contenidos))
+
+    feriados = crudo.get("feriados") or []
+    if isinstance(feriados, str):
+        feriados = [f for f in feriados.split(";") if f.strip()]
+
+    calendarios_feriados = crudo.get("calendarios_feriados") or []
+    if isinstance(calendarios_feriados, str):
+        calendarios_feriados = [c.strip() for c in calendarios_feriados.split(";") if c.strip()]
+
+    pruebas = crudo.get("pruebas") or [crudo.get("prueba1") or 5, crudo.get("prueba2") or 10]
+
+    opciones_calendario = {}
+    if crudo.get("total_sesiones"):
+        opciones_calendario["total_sesiones"] = int(crudo["total_sesiones"])
+    for campo in ("dias_extra", "semanas_omitidas"):
+        valores = crudo.get(campo) or []
+        if isinstance(valores, str):
+            valores = [v.strip() for v in valores.split(";") if v.strip()]
+        if valores:
+            opciones_calendario[campo] = (
+                [int(v) for v in valores] if campo == "semanas_omitidas" else [str(v).lower() for v in valores]
+            )
+    reagendar = crudo.get("reagendar_feriados")
+    if reagendar not in (None, ""):
+        opciones_calendario["reagendar_feriados"] = str(reagendar).strip().lower() not in ("0", "false", "no")
+
+    return {
+        "id": str(crudo.get("id") or f"curso_{posicion}"),
+        "unidades_data": unidades_data,
+        "fecha_inicio": _fecha(crudo["fecha_inicio"]),
+        "fecha_fin": _fecha(crudo["fecha_fin"]),
+        "dia_clase": str(crudo.get("dia_clase", "lunes")).strip().lower(),
+        "feriados": [_fecha(f) for f in feriados],
+        "calendarios_feriados": calendarios_feriados,
+        "programa": str(crudo["programa"]).strip() if crudo.get("programa") else None,
+        "prueba1": int(pruebas[0]),
+        "prueba2": int(pruebas[1]),
+        "fecha_examen_final": _fecha(crudo["fecha_examen_final"]),
+        "opciones_calendario": opciones_calendario,
+        "semilla": int(crudo["semilla"]) if crudo.get("semilla") not in (None, "") else None,
+        "generado": datetime.fromisoformat(str(crudo["generado"]).strip()) if crudo.get("generado") else None,
+    }
+
+
+def leer_manifiesto(ruta):
+    """Lee un manifiesto JSON o CSV y devuelve la lista de cursos normalizados"""
+    with open(ruta, 'r', encoding='utf-8', newline='') as f:
+        if ruta.lower().endswith(".csv"):
+            filas = list(csv.DictReader(f))
+        else:
+            filas = json.load(f)
+            if isinstance(filas, dict):
+                filas = filas.get("cursos", [])
+
+    cursos = [_normalizar_curso(fila, i) for i, fila in enumerate(filas, 1)]
+    ids = [c["id"] for c in cursos]
+    if len(set(ids)) != len(ids):
+        raise ValueError("El manifiesto contiene identificadores de curso repetidos")
+    return cursos
+
+
+def nombre_salida(id_curso):
+    """Nombre de archivo seguro para el ZIP del curso"""
+    return re.sub(r'[^\w.-]+', '_', id_curso) + ".zip"
+
+
+# === Trabajo por curso (se ejecuta en los procesos del pool) ===
+def _inicializar_trabajador():
+    # Cada trabajador ya ocupa un núcleo: los documentos se renderizan en el propio proceso
+    import motor_render
+    motor_render.MAX_PROCESOS_RENDER = 0
+
+
+def procesar_curso(curso, directorio_salida, directorio_plantillas):
+    """Genera el ZIP de un curso; devuelve un registro para el estado del lote"""
+    import planificacion
+    from feriados import importar_calendario, combinar_calendarios
+    from programa import importar_programa
+    from registro_plantillas import obtener_registro
+
+    inicio = time.perf_counter()
+    registro = {"id": curso["id"], "ok": False}
+    try:
+        # Cada calendario se indexa una vez por proceso trabajador
+        calendarios = []
+        for ruta in curso["calendarios_feriados"]:
+            with open(ruta, 'rb') as f:
+                calendarios.append(importar_calendario(f.read(), ruta))
+        feriados = combinar_calendarios(calendarios, curso["feriados"]).en_rango(
+            curso["fecha_inicio"], max(curso["fecha_fin"], curso["fecha_examen_final"])
+        )
+
+        if curso["programa"]:
+            # Se lee en el trabajador, en streaming, directo al modelo de unidades
+            with open(curso["programa"], 'rb') as f:
+                curso = {**curso, "unidades_data": importar_programa(f, curso["programa"])[0]}
+
+        errores = planificacion.validar_entradas(
+            curso["unidades_data"], curso["fecha_inicio"], curso["fecha_fin"],
+            curso["fecha_examen_final"], curso["prueba1"], curso["prueba2"],
+            curso["opciones_calendario"].get("total_sesiones", planificacion.SESIONES_POR_DEFECTO),
+            curso["dia_clase"], feriados, curso["opciones_calendario"]
+        )
+        if errores:
+            raise ValueError("; ".join(errores))
+
+        # Mismas etapas que la aplicación (GRAFO_GENERACION): la configuración
+        # del plan es la etapa configuracion_plan, y el programa compartido por
+        # varios cursos del lote se procesa una vez por trabajador
+        entradas = {
+            clave: curso[clave] for clave in (
+                "unidades_data", "fecha_inicio", "fecha_fin", "dia_clase", "fecha_examen_final",
+                "prueba1", "prueba2", "opciones_calendario", "semilla"
+            )
+        }
+        valores, _ = planificacion.GRAFO_GENERACION.ejecutar(
+            {**entradas, "feriados": feriados, "generado": curso["generado"] or datetime.now()},
+            ["semilla_generacion", "asignacion", "plan", "contextos"]
+        )
+        plan = valores["plan"]
+        context, context_cronograma = valores["contextos"]
+        plantillas = obtener_registro(directorio_plantillas)
+        planeamiento = plantillas.obtener("planeamiento")
+        cronograma = plantillas.obtener("cronograma")
+
+        # Escritura atómica: un ZIP existente siempre está completo
+        destino = os.path.join(directorio_salida, nombre_salida(curso["id"]))
+        temporal = f"{destino}.{os.getpid()}.tmp"
+        try:
+            with open(temporal, 'wb') as f:
+                fallidos = planificacion.escribir_archivo_zip(
+                    f, context, context_cronograma,
+                    planeamiento["datos"] if planeamiento else None,
+                    cronograma["datos"] if cronograma else None,
+                    plan
+                )
+            if fallidos:
+                raise RuntimeError("; ".join(f"{nombre}: {error}" for nombre, error in fallidos))
+            os.replace(temporal, destino)
+        finally:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+
+        registro["ok"] = True
+        registro["advertencias"] = list(valores["asignacion"][1])
+    except Exception as e:
+        registro["error"] = f"{type(e).__name__}: {e}"
+
+    registro["segundos"] = time.perf_counter() - inicio
+    return registro
+
+
+# === Coordinación del lote ===
+def _cursos_completados(directorio_salida):
+    """Ids registrados como generados cuyo ZIP sigue en disco"""
+    completados = set()
+    ruta_estado = os.path.join(directorio_salida, ARCHIVO_ESTADO)
+    if not os.path.exists(ruta_estado):
+        return completados
+    with open(ruta_estado, 'r', encoding='utf-8') as f:
+        for linea in f:
+            try:
+                registro = json.loads(linea)
+            except ValueError:
+                # Línea truncada por una interrupción
+                continue
+            if registro.get("ok") and os.path.exists(os.path.join(directorio_salida, nombre_salida(registro["id"]))):
+                completados.add(registro["id"])
+    return completados
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def generar_lote(ruta_manifiesto, directorio_salida, procesos=None, directorio_plantillas="templates"):
+    """Genera todos los cursos pendientes del manifiesto y devuelve el resumen"""
+    cursos = leer_manifiesto(ruta_manifiesto)
+    os.makedirs(directorio_salida, exist_ok=True)
+
+    # Solo cuentan los cursos de este manifiesto, aunque el estado tenga otros
+    completados = _cursos_completados(directorio_salida) & {c["id"] for c in cursos}
+    pendientes = [c for c in cursos if c["id"] not in completados]
+    print(f"{len(cursos)} cursos en el manifiesto, {len(completados)} ya generados, {len(pendientes)} pendientes")
+
+    tiempos = []
+    fallidos = []
+    inicio = time.perf_counter()
+    if pendientes:
+        with open(os.path.join(directorio_salida, ARCHIVO_ESTADO), 'a', encoding='utf-8') as estado, \
+                ProcessPoolExecutor(max_workers=procesos or os.cpu_count(),
+                                    initializer=_inicializar_trabajador) as pool:
+            futuros = {
+                pool.submit(procesar_curso, curso, directorio_salida, directorio_plantillas): curso["id"]
+                for curso in pendientes
+            }
+            for futuro in as_completed(futuros):
+                try:
+                    registro = futuro.result()
+                except BrokenProcessPool as e:
+                    # Un trabajador murió (memoria, señal): el curso queda como
+                    # fallido en el estado y se reintenta en la próxima ejecución
+                    registro = {
+                        "id": futuros[futuro], "ok": False,
+                        "error": f"BrokenProcessPool: {e}", "segundos": 0.0,
+                    }
+                estado.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                estado.flush()
+                if registro["ok"]:
+                    tiempos.append(registro["segundos"])
+                else:
+                    fallidos.append(registro)
+                    print(f"❌ {registro['id']}: {registro['error']}", file=sys.stderr)
+    duracion = time.perf_counter() - inicio
+
+    resumen = {
+        "generados": len(tiempos),
+        "fallidos": len(fallidos),
+        "omitidos": len(completados),
+        "segundos": duracion,
+        "cursos_por_segundo": len(tiempos) / duracion if duracion > 0 else 0.0,
+        "p50_ms": _percentil(tiempos, 50) * 1000 if tiempos else 0.0,
+        "p95_ms": _percentil(tiempos, 95) * 1000 if tiempos else 0.0,
+        "media_ms": statistics.fmean(tiempos) * 1000 if tiempos else 0.0,
+    }
+    print(
+        f"✅ {resumen['generados']} generados, {resumen['fallidos']} fallidos, "
+        f"{resumen['omitidos']} omitidos en {duracion:.1f} s"
+    )
+    print(
+        f"Rendimiento: {resumen['cursos_por_segundo']:.2f} cursos/s | "
+        f"p50 {resumen['p50_ms']:.0f} ms | p95 {resumen['p95_ms']:.0f} ms por curso"
+    )
+    return resumen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera planificaciones por lotes a partir de un manifiesto de cursos")
+    parser.add_argument("manifiesto", help="archivo JSON o CSV con los cursos")
+    parser.add_argument("salida", help="directorio donde se escribe un ZIP por curso")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos en paralelo (por defecto, todos los núcleos)")
+    parser.add_argument("--plantillas", default="templates", help="directorio de plantillas .docx")
+    args = parser.parse_args(argv)
+
+    resumen = generar_lote(args.manifiesto, args.salida, args.procesos, args.plantillas)
+    return 1 if resumen["fallidos"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
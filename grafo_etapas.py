@@ -0,0 +1,201 @@
+"""
+Pipeline como grafo de etapas con resultados memorizados.
+
+Cada etapa declara sus entradas (entradas del pipeline u otras etapas
+anteriores) y una función pura de ellas, que no debe modificarlas. Su clave
+es la huella de su nombre y de las huellas de sus entradas; los valores se
+identifican por contenido (SHA-256 de su pickle), así que si una etapa se
+recalcula y da lo mismo que antes, las que dependen de ella se reutilizan.
+
+Al ejecutar se piden objetivos y solo corren las etapas de las que dependen:
+las que ya tienen un resultado para esas mismas entradas se reutilizan, el
+resto se recalcula, y cada etapa informa qué pasó con ella. Varios juegos de
+entradas (las secciones de un curso) se ejecutan juntos con ejecutar_lote.
+
+Los resultados se guardan en una memoria LRU única por proceso, de hasta
+PLANEAMIENTO_ETAPAS_MAX resultados (por defecto 512).
+"""
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+MAX_RESULTADOS_ETAPAS = int(os.environ.get("PLANEAMIENTO_ETAPAS_MAX", 512))
+
+REUTILIZADA = "reutilizada"
+RECALCULADA = "recalculada"
+
+
+def huella_valor(valor):
+    """Huella de un valor por su contenido (valores iguales armados distinto pueden diferir: solo se pierde un acierto)"""
+    return hashlib.sha256(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+@dataclass(frozen=True)
+class Etapa:
+    """Etapa del grafo: funcion(*valores de entradas), en el orden declarado"""
+    nombre: str
+    entradas: Tuple[str, ...]
+    funcion: Callable
+    # Si devuelve False para un resultado, no se guarda (p. ej. documentos con errores)
+    memorizable: Optional[Callable] = None
+    # Opcional: funcion_lote([argumentos de cada llamada]) -> [resultados], para
+    # calcular de una vez la etapa de varios juegos de entradas (ejecutar_lote)
+    funcion_lote: Optional[Callable] = None
+
+
+class MemoriaEtapas:
+    """LRU de resultados por clave de etapa; cada entrada es [valor, huella del valor o None]"""
+
+    def __init__(self, maximo=MAX_RESULTADOS_ETAPAS):
+        self.maximo = maximo
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada
+
+    def guardar(self, clave, valor):
+        entrada = [valor, None]
+        with self._lock:
+            self._entradas[clave] = entrada
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+        return entrada
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self):
+        with self._lock:
+            return {"entradas": len(self._entradas), "aciertos": self.aciertos, "fallos": self.fallos}
+
+
+_memoria = MemoriaEtapas()
+
+
+def obtener_memoria_etapas():
+    """Memoria única por proceso"""
+    return _memoria
+
+
+class GrafoEtapas:
+    """Etapas en orden topológico (cada una solo usa entradas del pipeline o etapas anteriores)"""
+
+    def __init__(self, etapas):
+        self.etapas = {}
+        for etapa in etapas:
+            if etapa.nombre in self.etapas:
+                raise ValueError(f"Etapa repetida: {etapa.nombre}")
+            self.etapas[etapa.nombre] = etapa
+        posterior = {nombre: i for i, nombre in enumerate(self.etapas)}
+        for i, etapa in enumerate(self.etapas.values()):
+            for entrada in etapa.entradas:
+                if posterior.get(entrada, -1) >= i:
+                    raise ValueError(f"La etapa {etapa.nombre} depende de {entrada}, que va después")
+
+    def necesarias(self, objetivos):
+        """Etapas de las que dependen los objetivos (incluidos), en orden"""
+        pendientes = list(objetivos)
+        necesarias = set()
+        while pendientes:
+            nombre = pendientes.pop()
+            if nombre in self.etapas and nombre not in necesarias:
+                necesarias.add(nombre)
+                pendientes.extend(self.etapas[nombre].entradas)
+        return [nombre for nombre in self.etapas if nombre in necesarias]
+
+    def ejecutar(self, entradas, objetivos, memoria=None, al_terminar=None):
+        """
+        Calcula los objetivos a partir de las entradas del pipeline.
+        Devuelve (valores de entradas y etapas, {etapa: REUTILIZADA o RECALCULADA}).
+        al_terminar: opcional, se llama con el nombre de cada etapa al resolverla.
+        """
+        return self.ejecutar_lote([entradas], objetivos, memoria, al_terminar)[0]
+
+    def ejecutar_lote(self, lista_entradas, objetivos, memoria=None, al_terminar=None):
+        """
+        Como ejecutar, para varios juegos de entradas a la vez (p. ej. las
+        secciones de un curso), etapa por etapa: las que dan la misma clave en
+        varios juegos se calculan una sola vez, y las que tienen funcion_lote
+        calculan en una llamada todas las pendientes. Devuelve una lista de
+        (valores, informe), en el orden de lista_entradas.
+        al_terminar: opcional, se llama con el nombre de cada etapa cuando
+        quedó resuelta en todos los juegos.
+        """
+        memoria = memoria or _memoria
+        necesarias = self.necesarias(objetivos)
+        for entradas in lista_entradas:
+            repetidas = [nombre for nombre in necesarias if nombre in entradas]
+            if repetidas:
+                raise ValueError(f"Entradas con nombre de etapa: {', '.join(repetidas)}")
+        valores = [dict(entradas) for entradas in lista_entradas]
+        # Por juego: etapa -> entrada [valor, huella o None] de la memoria (o local, si no se guardó)
+        guardadas = [{} for _ in lista_entradas]
+        huellas = [{} for _ in lista_entradas]
+        informes = [{} for _ in lista_entradas]
+
+        def huella(i, nombre):
+            if nombre not in huellas[i]:
+                entrada = guardadas[i].get(nombre)
+                if entrada is not None and entrada[1] is not None:
+                    huellas[i][nombre] = entrada[1]
+                else:
+                    huellas[i][nombre] = huella_valor(valores[i][nombre])
+                    if entrada is not None:
+                        # La huella del resultado se calcula una sola vez por entrada
+                        entrada[1] = huellas[i][nombre]
+            return huellas[i][nombre]
+
+        for nombre in necesarias:
+            etapa = self.etapas[nombre]
+            pendientes = {}  # clave -> juegos que la necesitan
+            for i, juego in enumerate(valores):
+                faltantes = [entrada for entrada in etapa.entradas if entrada not in juego]
+                if faltantes:
+                    raise KeyError(f"Faltan entradas de {nombre}: {', '.join(faltantes)}")
+                clave = huella_valor((nombre, tuple(huella(i, entrada) for entrada in etapa.entradas)))
+                if clave in pendientes:
+                    pendientes[clave].append(i)
+                    continue
+                entrada = memoria.obtener(clave)
+                if entrada is not None:
+                    juego[nombre] = entrada[0]
+                    guardadas[i][nombre] = entrada
+                    informes[i][nombre] = REUTILIZADA
+                else:
+                    pendientes[clave] = [i]
+
+            if pendientes:
+                argumentos = [
+                    tuple(valores[juegos[0]][e] for e in etapa.entradas) for juegos in pendientes.values()
+                ]
+                if etapa.funcion_lote is not None and len(argumentos) > 1:
+                    resultados = etapa.funcion_lote(argumentos)
+                else:
+                    resultados = [etapa.funcion(*args) for args in argumentos]
+                for (clave, juegos), valor in zip(pendientes.items(), resultados):
+                    if etapa.memorizable is None or etapa.memorizable(valor):
+                        entrada = memoria.guardar(clave, valor)
+                    else:
+                        entrada = [valor, None]
+                    for i in juegos:
+                        valores[i][nombre] = valor
+                        guardadas[i][nombre] = entrada
+                        informes[i][nombre] = RECALCULADA
+            if al_terminar:
+                al_terminar(nombre)
+        return list(zip(valores, informes))
@@ -0,0 +1,153 @@
+"""
+Tiempos por etapa de la generación.
+
+Cada etapa del pipeline se envuelve con medir("etapa"). La duración se
+anota en la solicitud en curso (si hay una abierta con solicitud(), para
+mostrar el desglose de esa generación) y en el agregado del proceso, que
+guarda cantidad, suma y máximo, más una ventana de las últimas muestras
+para calcular p50/p95.
+
+El agregado se puede volcar en formato de texto de Prometheus para el
+textfile collector del node exporter: si PLANEAMIENTO_METRICAS_DIR está
+definido, cada proceso escribe ahí su propio archivo .prom tras cada
+generación (escritura atómica).
+"""
+import contextvars
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+DIRECTORIO_METRICAS = os.environ.get("PLANEAMIENTO_METRICAS_DIR")
+
+# Muestras recientes por etapa para los percentiles
+VENTANA_MUESTRAS = 1000
+
+_solicitud = contextvars.ContextVar("solicitud_tiempos", default=None)
+
+
+def _percentil(ordenados, p):
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+class RegistroTiempos:
+    """Agregado por proceso de las duraciones de cada etapa"""
+
+    def __init__(self, ventana=VENTANA_MUESTRAS):
+        self._lock = threading.Lock()
+        self._ventana = ventana
+        self._etapas = {}
+
+    def anotar(self, etapa, segundos):
+        with self._lock:
+            datos = self._etapas.get(etapa)
+            if datos is None:
+                datos = self._etapas[etapa] = {
+                    "cantidad": 0, "suma": 0.0, "maximo": 0.0, "muestras": deque(maxlen=self._ventana)
+                }
+            datos["cantidad"] += 1
+            datos["suma"] += segundos
+            datos["maximo"] = max(datos["maximo"], segundos)
+            datos["muestras"].append(segundos)
+
+    def resumen(self):
+        """{etapa: {cantidad, suma, p50, p95, maximo}} en segundos"""
+        with self._lock:
+            copia = {
+                etapa: (datos["cantidad"], datos["suma"], datos["maximo"], sorted(datos["muestras"]))
+                for etapa, datos in self._etapas.items()
+            }
+        return {
+            etapa: {
+                "cantidad": cantidad,
+                "suma": suma,
+                "p50": _percentil(muestras, 50),
+                "p95": _percentil(muestras, 95),
+                "maximo": maximo,
+            }
+            for etapa, (cantidad, suma, maximo, muestras) in copia.items()
+        }
+
+    def texto_prometheus(self):
+        """Agregado en formato de texto de Prometheus (un summary por etapa)"""
+        lineas = [
+            "# HELP planeamiento_etapa_segundos Duración de las etapas de generación de planificaciones.",
+            "# TYPE planeamiento_etapa_segundos summary",
+        ]
+        maximos = []
+        for etapa, datos in sorted(self.resumen().items()):
+            etiqueta = f'etapa="{etapa}"'
+            lineas.append(f'planeamiento_etapa_segundos{{{etiqueta},quantile="0.5"}} {datos["p50"]:.6f}')
+            lineas.append(f'planeamiento_etapa_segundos{{{etiqueta},quantile="0.95"}} {datos["p95"]:.6f}')
+            lineas.append(f'planeamiento_etapa_segundos_sum{{{etiqueta}}} {datos["suma"]:.6f}')
+            lineas.append(f'planeamiento_etapa_segundos_count{{{etiqueta}}} {datos["cantidad"]}')
+            maximos.append(f'planeamiento_etapa_max_segundos{{{etiqueta}}} {datos["maximo"]:.6f}')
+        lineas.append("# HELP planeamiento_etapa_max_segundos Duración máxima observada por etapa.")
+        lineas.append("# TYPE planeamiento_etapa_max_segundos gauge")
+        lineas.extend(maximos)
+        return "\n".join(lineas) + "\n"
+
+    def escribir_prometheus(self, directorio=None):
+        """Vuelca el agregado en <directorio>/planeamiento_<pid>.prom; no hace nada sin directorio"""
+        directorio = directorio or DIRECTORIO_METRICAS
+        if not directorio:
+            return None
+        ruta = os.path.join(directorio, f"planeamiento_{os.getpid()}.prom")
+        try:
+            # El collector ignora los archivos que no terminan en .prom
+            descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+            try:
+                with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+                    f.write(self.texto_prometheus())
+                os.replace(temporal, ruta)
+            except BaseException:
+                os.unlink(temporal)
+                raise
+        except OSError:
+            # Las métricas nunca deben interrumpir una generación
+            return None
+        return ruta
+
+
+_registro = RegistroTiempos()
+
+
+def obtener_registro_tiempos():
+    """Agregado único por proceso"""
+    return _registro
+
+
+def anotar(etapa, segundos):
+    """Anota una duración ya medida en la solicitud en curso y en el agregado"""
+    tiempos = _solicitud.get()
+    if tiempos is not None:
+        tiempos[etapa] = tiempos.get(etapa, 0.0) + segundos
+    _registro.anotar(etapa, segundos)
+
+
+@contextmanager
+def medir(etapa):
+    """Mide el bloque como una etapa"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        anotar(etapa, time.perf_counter() - inicio)
+
+
+@contextmanager
+def solicitud():
+    """
+    Abre la medición de una solicitud: entrega el dict etapa → segundos que
+    se va llenando con las etapas medidas dentro del bloque (en este hilo)
+    """
+    tiempos = {}
+    token = _solicitud.set(tiempos)
+    try:
+        yield tiempos
+    finally:
+        _solicitud.reset(token)
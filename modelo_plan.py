@@ -0,0 +1,58 @@
+"""
+Modelo inmutable de una planificación generada.
+
+Se construye una sola vez por generación (incluido el sorteo de los momentos
+didácticos) y de él se derivan el texto en pantalla, los contextos de las
+plantillas, los formatos de exportación, la tabla del calendario y las
+métricas, de modo que todas las salidas muestran exactamente lo mismo.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class Momentos:
+    """Momentos didácticos de una clase"""
+    retroalimentacion: str
+    introduccion: str
+    inicio: str
+    desarrollo: str
+    cierre: str
+
+
+@dataclass(frozen=True, slots=True)
+class Clase:
+    """Contenido de una sesión de clase normal"""
+    unidad: str
+    contenido: str
+    objetivo: str
+    nivel: str
+    momentos: Momentos
+    recursos: str
+    evaluacion: str
+
+
+@dataclass(frozen=True, slots=True)
+class Sesion:
+    """Una sesión del calendario; clase es None en las sesiones especiales"""
+    numero: int
+    fecha: date
+    fecha_es: str
+    evento: str
+    clase: Optional[Clase]
+    en_feriado: bool
+    reagendada: bool
+
+
+@dataclass(frozen=True, slots=True)
+class Plan:
+    """Planificación completa: sesiones, unidades (título, contenidos) y configuración"""
+    sesiones: Tuple[Sesion, ...]
+    unidades: Tuple[Tuple[str, Tuple[str, ...]], ...]
+    configuracion: Mapping
+    generado: datetime
+
+    def clases(self):
+        """Sesiones de clase normal con contenido asignado"""
+        return [sesion for sesion in self.sesiones if sesion.clase is not None]
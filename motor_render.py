@@ -0,0 +1,260 @@
+"""
+Motor de renderizado de plantillas DOCX pre-compiladas.
+
+DocxTemplate descomprime el .docx, parsea el XML, limpia las etiquetas y
+compila el código Jinja en cada render. Aquí todo eso se hace una sola vez
+por plantilla (identificada por el hash de su contenido) y cada render solo
+ejecuta la sustitución:
+
+- el cuerpo y los encabezados/pies quedan compilados como plantillas Jinja;
+- las partes que no cambian se guardan en un ZIP base ya comprimido, que se
+  copia por render y al que solo se agregan las partes renderizadas.
+
+Si una plantilla usa Jinja en sus propiedades del documento (título, autor...)
+se usa DocxTemplate tal cual, que es quien las procesa.
+
+Varios documentos de una misma descarga se pueden renderizar a la vez en un
+pool de procesos acotado, creado una sola vez por servidor.
+"""
+import atexit
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import docx.oxml.ns
+from docx.opc.oxml import parse_xml, serialize_part_xml
+from docxtpl import DocxTemplate
+from jinja2 import Template
+from lxml import etree
+
+_PROPIEDADES = ['author', 'comments', 'identifier', 'language', 'subject', 'title']
+
+
+def _marcar_parrafos(xml):
+    """Mismo preprocesado que DocxTemplate.render_xml_part antes de compilar"""
+    return re.sub(r'<w:p([ >])', r'\n<w:p\1', xml)
+
+
+def _desmarcar_parrafos(xml):
+    """Mismo posprocesado que DocxTemplate.render_xml_part tras renderizar"""
+    xml = re.sub(r'\n<w:p([ >])', r'<w:p\1', xml)
+    return (xml
+            .replace('{_{', '{{')
+            .replace('}_}', '}}')
+            .replace('{_%', '{%')
+            .replace('%_}', '%}'))
+
+
+class PlantillaCompilada:
+    """Plantilla DOCX parseada y compilada una vez, renderizable muchas veces"""
+
+    def __init__(self, datos, jinja_env=None):
+        self.datos = datos
+        self.jinja_env = jinja_env
+        self.hash = hashlib.sha256(datos).hexdigest()
+
+        # DocxTemplate se usa solo para parsear y para sus utilidades sin estado
+        self._ayudante = DocxTemplate(io.BytesIO(datos))
+        self._ayudante.init_docx()
+        documento = self._ayudante.docx
+
+        self.respaldo = any(
+            '{' in (getattr(documento.core_properties, prop) or '')
+            for prop in _PROPIEDADES
+        )
+        if self.respaldo:
+            return
+
+        # Cuerpo: XML limpio y compilado
+        self._cuerpo = self._compilar(self._ayudante.get_xml())
+
+        # Documento sin cuerpo, para envolver el cuerpo renderizado
+        raiz = etree.fromstring(serialize_part_xml(documento.element))
+        cuerpo = raiz.find(docx.oxml.ns.qn('w:body'))
+        cuerpo.clear()
+        marca = b'<w:body/>'
+        prefijo, sufijo = serialize_part_xml(raiz).split(marca, 1)
+        self._envoltura = (prefijo, sufijo)
+        self._nombre_documento = documento.part.partname.lstrip('/')
+
+        # Encabezados y pies de página
+        self._partes = {}
+        for uri in (DocxTemplate.HEADER_URI, DocxTemplate.FOOTER_URI):
+            for _, parte in self._ayudante.get_headers_footers(uri):
+                xml = self._ayudante.get_part_xml(parte)
+                self._partes[parte.partname.lstrip('/')] = self._compilar(xml)
+
+        # ZIP base con todas las partes que no se renderizan, ya comprimidas
+        renderizadas = {self._nombre_documento, *self._partes}
+        base = io.BytesIO()
+        with zipfile.ZipFile(io.BytesIO(datos)) as origen, \
+                zipfile.ZipFile(base, 'w', zipfile.ZIP_DEFLATED) as destino:
+            for info in origen.infolist():
+                if info.filename not in renderizadas:
+                    destino.writestr(info, origen.read(info), compress_type=info.compress_type)
+        self._base = base.getvalue()
+
+    def _compilar(self, xml):
+        xml = _marcar_parrafos(self._ayudante.patch_xml(xml))
+        if self.jinja_env:
+            return self.jinja_env.from_string(xml)
+        return Template(xml)
+
+    def _renderizar_parte(self, plantilla, context):
+        xml = _desmarcar_parrafos(plantilla.render(context))
+        return self._ayudante.resolve_listing(xml)
+
+    def _renderizar_en_memoria(self, context):
+        """Genera el .docx en un buffer propio (copia del ZIP base + partes renderizadas)"""
+        # Cuerpo: mismas correcciones que DocxTemplate.render
+        arbol = self._ayudante.fix_tables(self._renderizar_parte(self._cuerpo, context))
+        for indice, elemento in enumerate(
+                arbol.xpath('//wp:docPr', namespaces=docx.oxml.ns.nsmap), start=1001):
+            elemento.attrib['id'] = str(indice)
+        prefijo, sufijo = self._envoltura
+        documento = prefijo + etree.tostring(arbol, encoding='UTF-8') + sufijo
+
+        salida = io.BytesIO(self._base)
+        salida.seek(0, io.SEEK_END)
+        with zipfile.ZipFile(salida, 'a', zipfile.ZIP_DEFLATED) as zip_docx:
+            zip_docx.writestr(self._nombre_documento, documento)
+            for nombre, plantilla in self._partes.items():
+                xml = self._renderizar_parte(plantilla, context)
+                zip_docx.writestr(nombre, serialize_part_xml(parse_xml(xml)))
+        return salida
+
+    def renderizar(self, context, destino):
+        """Renderiza la plantilla con el contexto y escribe el .docx en destino"""
+        if self.respaldo:
+            doc = DocxTemplate(io.BytesIO(self.datos))
+            doc.render(context, self.jinja_env)
+            doc.save(destino)
+            return
+        destino.write(self._renderizar_en_memoria(context).getbuffer())
+
+    def renderizar_bytes(self, context):
+        """Renderiza y devuelve el contenido del .docx"""
+        if self.respaldo:
+            buffer = io.BytesIO()
+            self.renderizar(context, buffer)
+            return buffer.getvalue()
+        return self._renderizar_en_memoria(context).getvalue()
+
+
+# Pocas plantillas por proceso; las versiones viejas (tras editar un .docx) se descartan
+MAX_PLANTILLAS_COMPILADAS = 8
+
+_compiladas = {}
+_compiladas_lock = threading.Lock()
+
+
+def obtener_plantilla_compilada(datos, clave=None):
+    """Devuelve la plantilla compilada para estos bytes, compilándola solo la primera vez"""
+    clave = clave or hashlib.sha256(datos).hexdigest()
+    with _compiladas_lock:
+        plantilla = _compiladas.get(clave)
+    if plantilla is None:
+        plantilla = PlantillaCompilada(datos)
+        with _compiladas_lock:
+            plantilla = _compiladas.setdefault(clave, plantilla)
+            while len(_compiladas) > MAX_PLANTILLAS_COMPILADAS:
+                _compiladas.pop(next(iter(_compiladas)))
+    return plantilla
+
+
+def renderizar_docx(datos, context):
+    """Renderiza una plantilla DOCX (bytes) y devuelve el documento generado (bytes)"""
+    return obtener_plantilla_compilada(datos).renderizar_bytes(context)
+
+
+# === Render en paralelo ===
+# Procesos del pool compartido (uno por documento de la descarga); 0 desactiva
+# el pool y renderiza en el proceso actual, lo único útil con una sola CPU
+MAX_PROCESOS_RENDER = int(os.environ.get(
+    "PLANEAMIENTO_PROCESOS_RENDER", 2 if (os.cpu_count() or 1) > 1 else 0
+))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _obtener_pool():
+    """Pool de procesos único por servidor"""
+    global _pool
+    with _pool_lock:
+        if _pool is None and MAX_PROCESOS_RENDER > 0:
+            _pool = ProcessPoolExecutor(
+                max_workers=MAX_PROCESOS_RENDER,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def _descartar_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _renderizar_trabajo(datos, clave, context):
+    """Se ejecuta en el proceso trabajador; cada uno mantiene su propia caché compilada"""
+    return obtener_plantilla_compilada(datos, clave).renderizar_bytes(context)
+
+
+def renderizar_docx_en_paralelo(trabajos, al_terminar=None):
+    """
+    Renderiza varios documentos a la vez.
+    trabajos: lista de (nombre, datos_plantilla, context).
+    al_terminar: opcional, se llama con el índice de cada documento apenas
+    está listo, en el orden en que terminan (para informar el progreso).
+    Devuelve, en el mismo orden, (nombre, bytes, error): un error en un
+    documento no impide obtener los demás.
+    """
+    claves = [hashlib.sha256(datos).hexdigest() for _, datos, _ in trabajos]
+    resultados = [None] * len(trabajos)
+
+    def terminar(i, contenido=None, error=None):
+        resultados[i] = (trabajos[i][0], contenido, error)
+        if al_terminar is not None:
+            al_terminar(i)
+
+    pool = _obtener_pool() if len(trabajos) > 1 else None
+    indices = {}
+    if pool is not None:
+        try:
+            for i, (_, datos, context) in enumerate(trabajos):
+                indices[pool.submit(_renderizar_trabajo, datos, claves[i], context)] = i
+        except (BrokenProcessPool, RuntimeError):
+            _descartar_pool()
+            indices = {}
+
+    # Los del pool, en el orden en que terminan
+    en_pool = set(indices.values())
+    locales = [i for i in range(len(trabajos)) if i not in en_pool]
+    for futuro in as_completed(indices):
+        i = indices[futuro]
+        try:
+            terminar(i, futuro.result())
+        except BrokenProcessPool:
+            # Un trabajador murió: se descarta el pool y se renderiza aquí
+            _descartar_pool()
+            locales.append(i)
+        except Exception as e:
+            terminar(i, error=e)
+
+    for i in sorted(locales):
+        _, datos, context = trabajos[i]
+        try:
+            terminar(i, _renderizar_trabajo(datos, claves[i], context))
+        except Exception as e:
+            terminar(i, error=e)
+    return resultados
@@ -0,0 +1,94 @@
+"""
+Escritura de paquetes ZIP por streaming.
+
+Cada miembro se escribe directamente en su entrada del ZIP (sin buffers
+intermedios) y los archivos que ya vienen comprimidos, como los .docx, se
+guardan sin recomprimir. El destino por defecto es un archivo temporal que
+se mantiene en memoria hasta cierto tamaño y después pasa a disco, de modo
+que la memoria usada para armar el paquete no crece con su tamaño.
+
+El paquete terminado se entrega como PaqueteZip, que conserva ese mismo
+archivo temporal: los trabajos terminados no guardan los bytes, y el ZIP se
+lee completo recién al dibujar el botón de descarga (st.download_button
+necesita los bytes).
+"""
+import os
+import tempfile
+import threading
+import zipfile
+from datetime import datetime
+
+# Formatos que ya son ZIP/deflate o imágenes comprimidas
+EXTENSIONES_COMPRIMIDAS = ('.docx', '.xlsx', '.pptx', '.zip', '.jpg', '.jpeg', '.png')
+
+# Tamaño a partir del cual el paquete en construcción pasa de memoria a disco
+MAX_PAQUETE_EN_MEMORIA = int(os.environ.get("PLANEAMIENTO_MAX_ZIP_MEMORIA", 8 * 1024 * 1024))
+
+# Tamaño de los bloques al escribir contenidos grandes en una entrada
+TAMANO_BLOQUE = 64 * 1024
+
+
+def crear_destino_temporal(max_en_memoria=None):
+    """Archivo temporal en memoria que pasa a disco al superar max_en_memoria bytes"""
+    return tempfile.SpooledTemporaryFile(
+        max_size=MAX_PAQUETE_EN_MEMORIA if max_en_memoria is None else max_en_memoria
+    )
+
+
+class PaqueteZip:
+    """ZIP terminado en su archivo temporal (en memoria hasta el umbral, después en disco)"""
+
+    def __init__(self, archivo):
+        self._archivo = archivo
+        self._lock = threading.Lock()
+        archivo.seek(0, os.SEEK_END)
+        self.tamano = archivo.tell()
+
+    def leer(self):
+        """Bytes del paquete, para servir la descarga"""
+        with self._lock:
+            self._archivo.seek(0)
+            return self._archivo.read()
+
+    def __len__(self):
+        return self.tamano
+
+    def cerrar(self):
+        with self._lock:
+            self._archivo.close()
+
+
+def _info_miembro(nombre, fecha):
+    info = zipfile.ZipInfo(nombre, date_time=fecha.timetuple()[:6])
+    if nombre.lower().endswith(EXTENSIONES_COMPRIMIDAS):
+        info.compress_type = zipfile.ZIP_STORED
+    else:
+        info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+
+def _escribir_contenido(entrada, contenido):
+    if isinstance(contenido, str):
+        contenido = contenido.encode('utf-8')
+    if isinstance(contenido, (bytes, bytearray, memoryview)):
+        vista = memoryview(contenido)
+        for inicio in range(0, len(vista), TAMANO_BLOQUE):
+            entrada.write(vista[inicio:inicio + TAMANO_BLOQUE])
+        return
+    # Iterable de partes (bytes o str), escrito a medida que se produce
+    for parte in contenido:
+        entrada.write(parte.encode('utf-8') if isinstance(parte, str) else parte)
+
+
+def escribir_paquete_zip(destino, miembros, fecha=None):
+    """
+    Escribe en destino un ZIP con los miembros dados.
+    miembros: iterable de (nombre, contenido); el contenido puede ser bytes,
+    str o un iterable de partes. Se consume de a un miembro por vez.
+    """
+    fecha = fecha or datetime.now()
+    with zipfile.ZipFile(destino, 'w') as zip_file:
+        for nombre, contenido in miembros:
+            with zip_file.open(_info_miembro(nombre, fecha), 'w') as entrada:
+                _escribir_contenido(entrada, contenido)
+    return destino
@@ -0,0 +1,1183 @@
+"""
+Núcleo de la planificación, sin interfaz.
+
+Tablas de Bloom, lectura de unidades, ajuste a sesiones, calendario, modelo
+del plan, contextos de las plantillas, render y empaquetado: todo lo que
+usan la aplicación Streamlit, el modo por lotes, la cola de trabajos y los
+benchmarks.
+
+El módulo no importa streamlit, e importa pandas, NumPy (a través de
+calendario) y docxtpl (a través de motor_render) recién cuando una función
+los necesita, de modo que importarlo es barato para procesos trabajadores
+y scripts (ver benchmarks/bench_importacion.py).
+"""
+import random
+import re
+from dataclasses import replace
+from datetime import datetime
+from functools import lru_cache
+from itertools import accumulate
+from operator import itemgetter
+from bisect import bisect_right
+import heapq
+import io
+import hashlib
+import json
+import time
+
+from paquete_zip import PaqueteZip, crear_destino_temporal, escribir_paquete_zip
+from calendario import calcular_fechas_sesiones, generar_calendarios, SESIONES_POR_DEFECTO
+from exportar import FORMATOS, SinkUTF8, exportar, exportar_bytes, partes
+from modelo_plan import Plan, Sesion, Clase, Momentos
+from cache_artefactos import obtener_cache, hash_contexto, clave_artefacto
+from metricas import medir, anotar, solicitud, obtener_registro_tiempos
+from conceptos import extraer_conceptos_lote
+from grafo_etapas import Etapa, GrafoEtapas
+
+# === Recursos y plantillas Bloom ===
+verbos_bloom = {
+    "Recordar": ["identificar", "definir", "listar"],
+    "Comprender": ["explicar", "resumir", "interpretar"],
+    "Aplicar": ["resolver", "utilizar", "demostrar"],
+    "Analizar": ["comparar", "diferenciar", "analizar"],
+    "Evaluar": ["justificar", "juzgar", "concluir"],
+    "Crear": ["diseñar", "elaborar", "idear"]
+}
+
+plantillas_actividades = {
+    "Recordar": "Realizar un glosario con términos sobre '{}'.",
+    "Comprender": "Redactar un resumen sobre '{}'.",
+    "Aplicar": "Resolver un ejercicio práctico sobre '{}'.",
+    "Analizar": "Analizar un caso relacionado con '{}'.",
+    "Evaluar": "Justificar la relevancia de '{}'.",
+    "Crear": "Diseñar una solución basada en '{}'."
+}
+
+recursos_bloom = {
+    "Recordar": ["fichas", "presentación", "mapas simples"],
+    "Comprender": ["lectura", "videos", "debate"],
+    "Aplicar": ["simulador", "ejercicios", "laboratorio"],
+    "Analizar": ["casos", "gráficos", "tablas"],
+    "Evaluar": ["rúbricas", "informes", "discusión crítica"],
+    "Crear": ["software", "proyecto", "portafolio"]
+}
+
+evaluacion_bloom = {
+    "Recordar": ["test", "lista de cotejo"],
+    "Comprender": ["resúmenes", "cuestionarios"],
+    "Aplicar": ["demostraciones", "resolución de problemas"],
+    "Analizar": ["ensayos", "mapas comparativos"],
+    "Evaluar": ["defensa oral", "argumentación escrita"],
+    "Crear": ["prototipo", "presentación final"]
+}
+
+inicio = ["Lluvia de ideas", "Pregunta generadora", "Video disparador"]
+desarrollo = ["Actividad práctica", "Discusión guiada", "Resolución de caso"]
+cierre = ["Mapa mental", "Reflexión", "Síntesis grupal"]
+intro = ["Lectura disparadora", "Situación problema", "Contextualización narrativa"]
+retro = ["Recordatorio de clase anterior", "Juego de revisión", "Preguntas orales"]
+
+# Textos de recursos y evaluación por nivel, unidos una sola vez
+recursos_texto = {nivel: ", ".join(items) for nivel, items in recursos_bloom.items()}
+evaluacion_texto = {nivel: ", ".join(items) for nivel, items in evaluacion_bloom.items()}
+
+dias_semana = {
+    "lunes": 0, 
+    "martes": 1, 
+    "miércoles": 2, 
+    "jueves": 3, 
+    "viernes": 4
+}
+
+# Opciones del calendario por defecto: 16 sesiones de clase (más el examen final),
+# un solo día por semana y reagendado automático de las sesiones en feriado
+OPCIONES_CALENDARIO = {
+    "total_sesiones": SESIONES_POR_DEFECTO,
+    "dias_extra": [],
+    "semanas_omitidas": [],
+    "reagendar_feriados": True
+}
+
+dias_semana_es = {
+    0: "Lunes",
+    1: "Martes", 
+    2: "Miércoles",
+    3: "Jueves",
+    4: "Viernes",
+    5: "Sábado",
+    6: "Domingo"
+}
+
+meses_es = {
+    1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril",
+    5: "Mayo", 6: "Junio", 7: "Julio", 8: "Agosto",
+    9: "Septiembre", 10: "Octubre", 11: "Noviembre", 12: "Diciembre"
+}
+
+# === Funciones auxiliares ===
+_RE_FIN_ORACION = re.compile(r'(?<=[.!?])\s+')
+
+def genera_dict_unidades(unidades_data):
+    """Genera diccionario de unidades desde los datos de entrada"""
+    unidades = {}
+    for i, (titulo, contenidos) in enumerate(unidades_data):
+        if not titulo.strip():
+            titulo = f"Unidad {i+1}"
+        
+        if not contenidos.strip():
+            continue
+            
+        lineas = [fr.strip() for fr in contenidos.split('\n') if fr.strip()]
+        if len(lineas) == 1:
+            # Split by sentence if it's a single line of text
+            frases = [fr.strip() for fr in _RE_FIN_ORACION.split(lineas[0]) if fr.strip()]
+        else:
+            # Treat each line as a "phrase" if multiple lines are entered
+            frases = lineas
+        unidades[titulo] = frases
+    return unidades
+
+def peso_frase(frase):
+    """Carga de una frase: cantidad de palabras (mínimo 1)"""
+    return max(1, len(frase.split()))
+
+def particion_lineal(pesos, k):
+    """
+    Divide una secuencia de pesos en k grupos contiguos no vacíos minimizando
+    el peso del grupo más cargado. Devuelve los índices de corte [0, ..., n].
+    Búsqueda binaria sobre la carga máxima con saltos por bisect sobre las
+    sumas acumuladas: O(n + k·log n·log S), más O(k²·log n) al fijar los cortes.
+    """
+    n = len(pesos)
+    k = max(1, min(k, n))
+    acumulado = [0]
+    acumulado.extend(accumulate(pesos))
+    
+    def grupos_necesarios(carga_max, pos=0, limite=k):
+        grupos = 0
+        while pos < n:
+            pos = bisect_right(acumulado, acumulado[pos] + carga_max) - 1
+            grupos += 1
+            if grupos > limite:
+                break
+        return grupos
+    
+    bajo, alto = max(pesos, default=0), acumulado[-1]
+    while bajo < alto:
+        medio = (bajo + alto) // 2
+        if grupos_necesarios(medio) <= k:
+            alto = medio
+        else:
+            bajo = medio + 1
+    
+    # Cortes con exactamente k grupos y carga máxima óptima: cada grupo se
+    # acerca al promedio de lo que queda, sin impedir que el resto quepa
+    cortes = [0]
+    for g in range(k):
+        pos = cortes[-1]
+        restantes = k - g - 1
+        maximo = min(bisect_right(acumulado, acumulado[pos] + bajo) - 1, n - restantes)
+        objetivo = acumulado[pos] + (acumulado[n] - acumulado[pos]) / (k - g)
+        fin = bisect_right(acumulado, objetivo) - 1
+        if fin < maximo and acumulado[fin + 1] - objetivo < objetivo - acumulado[fin]:
+            fin += 1
+        fin = max(pos + 1, min(fin, maximo))
+        if restantes and grupos_necesarios(bajo, fin, restantes) > restantes:
+            fin = maximo
+        cortes.append(fin)
+    cortes[-1] = n
+    return cortes
+
+def _repartir_sesiones(pesos_unidades, capacidades, total_sesiones):
+    """
+    Reparte sesiones entre unidades (al menos una cada una) dando la siguiente
+    sesión a la unidad con mayor carga por sesión que aún pueda dividirse.
+    """
+    asignadas = [1] * len(pesos_unidades)
+    heap = [(-peso, idx) for idx, peso in enumerate(pesos_unidades) if capacidades[idx] > 1]
+    heapq.heapify(heap)
+    restantes = total_sesiones - len(pesos_unidades)
+    while restantes > 0 and heap:
+        _, idx = heapq.heappop(heap)
+        asignadas[idx] += 1
+        restantes -= 1
+        if asignadas[idx] < capacidades[idx]:
+            heapq.heappush(heap, (-pesos_unidades[idx] / asignadas[idx], idx))
+    
+    # Sin frases suficientes: las sesiones sobrantes repiten el cierre de cada unidad
+    idx = 0
+    while restantes > 0:
+        asignadas[idx % len(asignadas)] += 1
+        restantes -= 1
+        idx += 1
+    return asignadas
+
+def ajustar_unidades_para_sesiones(unidades_originales, total_sesiones_normales=10):
+    """
+    Ajusta las unidades para que se adapten al número de sesiones disponibles.
+    Las sesiones son contiguas y balanceadas por cantidad de palabras; nunca se
+    descarta contenido.
+    - Menos unidades que sesiones: cada unidad recibe sesiones según su carga
+      y sus frases se reparten entre ellas.
+    - Más unidades que sesiones: se fusionan unidades consecutivas.
+    """
+    unidades = [(titulo, frases) for titulo, frases in unidades_originales.items() if frases]
+    if not unidades or total_sesiones_normales < 1:
+        return []
+    
+    pesos_frases = [[peso_frase(frase) for frase in frases] for _, frases in unidades]
+    pesos_unidades = [sum(pesos) for pesos in pesos_frases]
+    
+    lista_bloques_sesion = []
+    if len(unidades) > total_sesiones_normales:
+        # Fusionar unidades consecutivas en grupos balanceados
+        cortes = particion_lineal(pesos_unidades, total_sesiones_normales)
+        for inicio_grupo, fin_grupo in zip(cortes, cortes[1:]):
+            grupo = unidades[inicio_grupo:fin_grupo]
+            frases = [frase for _, frases_unidad in grupo for frase in frases_unidad]
+            lista_bloques_sesion.append({
+                "titulo": " - ".join(titulo for titulo, _ in grupo),
+                "frases": frases,
+                "longitud": len(frases)
+            })
+        return lista_bloques_sesion
+    
+    # Fraccionar unidades
+    sesiones_por_unidad = _repartir_sesiones(
+        pesos_unidades, [len(frases) for _, frases in unidades], total_sesiones_normales
+    )
+    for (titulo, frases), pesos, cantidad in zip(unidades, pesos_frases, sesiones_por_unidad):
+        cortes = particion_lineal(pesos, cantidad)
+        partes = [frases[a:b] for a, b in zip(cortes, cortes[1:])]
+        # Más sesiones que frases: se repite la última frase de la unidad
+        partes.extend([frases[-1:]] * (cantidad - len(partes)))
+        for s, fragmento_frases in enumerate(partes):
+            lista_bloques_sesion.append({
+                "titulo": f"{titulo} (Parte {s+1}/{cantidad})" if cantidad > 1 else titulo,
+                "frases": fragmento_frases,
+                "longitud": len(fragmento_frases)
+            })
+    return lista_bloques_sesion
+
+def generar_planificacion_calendario(fecha_inicio_dt, dia_clase_num, fecha_examen_final, feriados, pruebas, retro_sesiones, revision_sesiones,
+                                     total_sesiones=SESIONES_POR_DEFECTO, semanas_omitidas=(), reagendar_feriados=True):
+    """
+    Genera la planificación del calendario: total_sesiones de clase más el examen final.
+    dia_clase_num puede ser un número de día o una lista (varios días por semana).
+    """
+    dias_clase = [dia_clase_num] if isinstance(dia_clase_num, int) else list(dia_clase_num)
+    fechas, en_feriado, reagendada = calcular_fechas_sesiones(
+        fecha_inicio_dt, dias_clase, total_sesiones, feriados, semanas_omitidas, reagendar_feriados
+    )
+    return _plan_calendario(
+        fechas[0].astype(object).tolist(), en_feriado[0].tolist(), reagendada[0].tolist(),
+        fecha_examen_final, feriados, pruebas, retro_sesiones, revision_sesiones
+    )
+
+def _plan_calendario(fechas, en_feriado, reagendada, fecha_examen_final, feriados, pruebas, retro_sesiones, revision_sesiones):
+    """Sesiones del calendario (más el examen final) a partir de las fechas y marcas de cada sesión"""
+    pruebas = set(pruebas)
+    retro_sesiones = set(retro_sesiones)
+    revision_sesiones = set(revision_sesiones)
+    plan = []
+    for sesion_num, (dia_evento, feriado, movida) in enumerate(zip(fechas, en_feriado, reagendada), start=1):
+        if sesion_num in pruebas:
+            estado = "Prueba parcial"
+        elif sesion_num in retro_sesiones:
+            estado = "Retroalimentación"
+        elif sesion_num in revision_sesiones:
+            estado = "Revisión de prueba"
+        else:
+            estado = "Clase normal"
+        plan.append({
+            "Sesion": sesion_num,
+            "Fecha": dia_evento,
+            "Evento": estado,
+            "En_feriado": feriado,
+            "Reagendada": movida
+        })
+    
+    plan.append({
+        "Sesion": len(plan) + 1,
+        "Fecha": fecha_examen_final,
+        "Evento": "Examen final",
+        "En_feriado": fecha_examen_final in set(feriados),
+        "Reagendada": False
+    })
+    return plan
+
+def formatear_fecha_es(fecha):
+    """Formatea fecha en español"""
+    # Manejar diferentes tipos de entrada
+    if isinstance(fecha, tuple):
+        fecha = fecha[0] if fecha else None
+    
+    if not fecha or not hasattr(fecha, 'weekday'):
+        return "Fecha inválida"
+    
+    dia_sem = dias_semana_es[fecha.weekday()]
+    mes = meses_es[fecha.month]
+    return f"{dia_sem}, {fecha.day} de {mes} de {fecha.year}"
+
+# === Pipeline de planificación (compartido por la interfaz y el modo por lotes) ===
+def validar_entradas(unidades_data, fecha_inicio, fecha_fin, fecha_examen_final, prueba1, prueba2, total_sesiones=SESIONES_POR_DEFECTO,
+                     dia_clase=None, feriados=(), opciones_calendario=None):
+    """
+    Valida la configuración del curso y devuelve la lista de errores.
+    Con dia_clase también se revisa el calendario: ninguna sesión puede
+    quedar después de la fecha de fin (p. ej. corrida por feriados).
+    """
+    errores = []
+    
+    if fecha_inicio >= fecha_fin:
+        errores.append("La fecha de inicio debe ser anterior a la fecha de fin")
+    
+    if fecha_examen_final <= fecha_fin:
+        errores.append("La fecha del examen final debe ser posterior a la fecha de fin del curso")
+    
+    if prueba1 == prueba2:
+        errores.append("Las dos pruebas parciales deben ser en sesiones diferentes")
+    
+    if not (1 <= prueba1 <= total_sesiones and 1 <= prueba2 <= total_sesiones):
+        errores.append(f"Las pruebas parciales deben estar entre la sesión 1 y la {total_sesiones}")
+    
+    # Verificar que hay contenido en las unidades
+    unidades_vacias = 0
+    for titulo, contenidos in unidades_data:
+        if not contenidos.strip():
+            unidades_vacias += 1
+    
+    if unidades_vacias == len(unidades_data):
+        errores.append("Debe ingresar contenido en al menos una unidad")
+    
+    if dia_clase is not None and not errores:
+        errores.extend(validar_calendario(
+            fecha_inicio, fecha_fin, fecha_examen_final, dia_clase, feriados,
+            {**(opciones_calendario or {}), "total_sesiones": total_sesiones}
+        ))
+    
+    return errores
+
+def validar_calendario(fecha_inicio, fecha_fin, fecha_examen_final, dia_clase, feriados, opciones_calendario=None):
+    """Errores si las sesiones reagendadas u omitidas empujan clases más allá del fin del curso o del examen final"""
+    opciones = {**OPCIONES_CALENDARIO, **(opciones_calendario or {})}
+    dias_clase = sorted({dias_semana[dia_clase], *(dias_semana[d] for d in opciones["dias_extra"])})
+    fechas, _, reagendada = calcular_fechas_sesiones(
+        fecha_inicio, dias_clase, opciones["total_sesiones"], list(feriados),
+        opciones["semanas_omitidas"], opciones["reagendar_feriados"]
+    )
+    fechas = fechas[0].astype(object).tolist()
+    tardias = [numero for numero, fecha in enumerate(fechas, start=1) if fecha > fecha_fin]
+    if not tardias:
+        return []
+    sesiones = f"La sesión {tardias[0]} queda" if len(tardias) == 1 else f"Las sesiones {tardias[0]} a {tardias[-1]} quedan"
+    examen = ", el día del examen final o después" if fechas[-1] >= fecha_examen_final else ""
+    causa = " (hay sesiones movidas por feriados)" if reagendada[0].any() else ""
+    return [
+        f"{sesiones} después de la fecha de fin del curso: la última cae el "
+        f"{formatear_fecha_es(fechas[-1])}{examen}{causa}. Reduzca las sesiones o las semanas "
+        f"omitidas, o extienda el curso"
+    ]
+
+def preparar_bloques(lista_bloques_sesion):
+    """
+    Parte de los fragmentos que depende solo del programa: (unidad, fragmento,
+    concepto) de cada bloque con contenido. No usa el generador, así que se
+    puede compartir entre secciones (etapa bloques de GRAFO_GENERACION).
+    """
+    bloques = [bloque for bloque in lista_bloques_sesion if bloque["frases"]]
+    
+    # Todos los fragmentos del plan en una sola llamada; cada frase en su
+    # propia línea para que los conceptos no crucen de un tema al siguiente
+    conceptos_por_bloque = extraer_conceptos_lote(["\n".join(bloque["frases"]) for bloque in bloques])
+    
+    preparados = []
+    for bloque_sesion, conceptos in zip(bloques, conceptos_por_bloque):
+        fragmento = " ".join(bloque_sesion["frases"])
+        concepto = conceptos[0] if conceptos else fragmento.strip()
+        preparados.append((bloque_sesion["titulo"], fragmento, concepto))
+    return preparados
+
+def asignar_niveles(bloques_preparados, generador):
+    """Asigna nivel de Bloom, verbo (sorteado con generador) y actividad a cada bloque preparado"""
+    fragmentos_sesiones = []
+    niveles = list(verbos_bloom.keys())
+    
+    for nivel_idx, (unidad_titulo, fragmento, concepto) in enumerate(bloques_preparados):
+        nivel = niveles[nivel_idx % len(niveles)]
+        verbo = generador.choice(verbos_bloom[nivel])
+        actividad = plantillas_actividades[nivel].format(concepto)
+        
+        fragmentos_sesiones.append({
+            "Unidad": unidad_titulo,
+            "Contenido": fragmento,
+            "Concepto": concepto,
+            "Nivel": nivel,
+            "Verbo": verbo,
+            "Actividad": actividad,
+            "Nivel_idx": nivel_idx
+        })
+    
+    return fragmentos_sesiones
+
+def semilla_entradas(unidades_data):
+    """
+    Semilla de 64 bits derivada solo del programa (unidades y contenidos):
+    mismo programa, mismos sorteos. Cambiar fechas, feriados, pruebas u
+    opciones del calendario no vuelve a sortear los contenidos.
+    """
+    entradas = [list(unidad) for unidad in unidades_data]
+    huella = hashlib.sha256(json.dumps(entradas, ensure_ascii=False).encode('utf-8'))
+    return int.from_bytes(huella.digest()[:8], "big")
+
+def estructura_sesiones(dia_clase, prueba1, prueba2, opciones_calendario=None):
+    """Días de clase, sesiones especiales y cantidad de sesiones normales del curso"""
+    opciones = {**OPCIONES_CALENDARIO, **(opciones_calendario or {})}
+    total_sesiones = opciones["total_sesiones"]
+    
+    # Usar las pruebas seleccionadas
+    pruebas = [prueba1, prueba2]
+    retro_sesiones = [p - 1 for p in pruebas if p > 1]
+    revision_sesiones = [p + 1 for p in pruebas if p < total_sesiones]
+    
+    # Calcular sesiones normales disponibles
+    sesiones_especiales = len(pruebas) + len(retro_sesiones) + len(revision_sesiones)
+    return {
+        "opciones": opciones,
+        "dias_clase": sorted({dias_semana[dia_clase], *(dias_semana[d] for d in opciones["dias_extra"])}),
+        "pruebas": pruebas,
+        "retro_sesiones": retro_sesiones,
+        "revision_sesiones": revision_sesiones,
+        "sesiones_normales": total_sesiones - sesiones_especiales  # el examen final va aparte
+    }
+
+def calendario_sesiones(fecha_inicio, fecha_examen_final, feriados, sesiones):
+    """Calendario de sesiones (sin contenidos) para la estructura de estructura_sesiones"""
+    opciones = sesiones["opciones"]
+    with medir("calendario"):
+        return generar_planificacion_calendario(
+            fecha_inicio, sesiones["dias_clase"], fecha_examen_final,
+            feriados, sesiones["pruebas"], sesiones["retro_sesiones"], sesiones["revision_sesiones"],
+            opciones["total_sesiones"], opciones["semanas_omitidas"], opciones["reagendar_feriados"]
+        )
+
+def calendarios_sesiones(argumentos):
+    """
+    calendario_sesiones de varias secciones a la vez (funcion_lote de la etapa
+    calendario): un solo generar_calendarios por juego de feriados y opciones.
+    argumentos: lista de (fecha_inicio, fecha_examen_final, feriados, sesiones).
+    """
+    grupos = {}
+    for posicion, (_, _, feriados, sesiones) in enumerate(argumentos):
+        opciones = sesiones["opciones"]
+        clave = (tuple(feriados), opciones["total_sesiones"], tuple(opciones["semanas_omitidas"]),
+                 opciones["reagendar_feriados"])
+        grupos.setdefault(clave, []).append(posicion)
+    
+    resultado = [None] * len(argumentos)
+    with medir("calendario"):
+        for (feriados, total_sesiones, semanas_omitidas, reagendar_feriados), posiciones in grupos.items():
+            calendarios = generar_calendarios(
+                [(argumentos[p][0], argumentos[p][3]["dias_clase"]) for p in posiciones],
+                total_sesiones, list(feriados), list(semanas_omitidas), reagendar_feriados, con_marcas=True
+            )
+            for p, (fechas, en_feriado, reagendada) in zip(posiciones, calendarios):
+                _, fecha_examen_final, feriados_seccion, sesiones = argumentos[p]
+                resultado[p] = _plan_calendario(
+                    fechas, en_feriado, reagendada, fecha_examen_final, feriados_seccion,
+                    sesiones["pruebas"], sesiones["retro_sesiones"], sesiones["revision_sesiones"]
+                )
+    return resultado
+
+def asignar_fragmentos(plan_semanal, fragmentos_sesiones):
+    """
+    Asigna los fragmentos, en orden, a las clases normales de plan_semanal.
+    Devuelve las advertencias; lanza ValueError si no hay ningún fragmento.
+    """
+    advertencias = []
+    sesiones_normales_idx = [i for i, s in enumerate(plan_semanal) if s["Evento"] == "Clase normal"]
+    
+    # Asignar contenido a sesiones
+    if len(sesiones_normales_idx) < len(fragmentos_sesiones):
+        advertencias.append("⚠️ Hay menos sesiones normales disponibles que unidades ajustadas. Algunas unidades no serán asignadas.")
+        total_asignar = len(sesiones_normales_idx)
+    else:
+        total_asignar = len(fragmentos_sesiones)
+    
+    if not fragmentos_sesiones:
+        raise ValueError("No se pudo generar ningún fragmento de unidad. Verifique el contenido ingresado.")
+    
+    for idx, frag_idx in enumerate(range(total_asignar)):
+        i = sesiones_normales_idx[idx]
+        plan_semanal[i]["Planificacion"] = fragmentos_sesiones[frag_idx]
+    return advertencias
+
+def construir_modelo_plan(plan_semanal, unidades_originales, configuracion, generador, generado=None):
+    """
+    Construye el modelo inmutable del plan (modelo_plan.Plan) del que se
+    derivan la pantalla, las plantillas, todos los formatos y las métricas.
+    generador: el random.Random de la generación, tras sortear los niveles.
+    generado: fecha de generación (por defecto, ahora); con la misma semilla y
+    la misma fecha los archivos exportados son idénticos byte a byte.
+    """
+    # Momentos didácticos sorteados en bloque (uno por sesión y momento)
+    n = len(plan_semanal)
+    momentos = zip(generador.choices(retro, k=n), generador.choices(intro, k=n),
+                   generador.choices(inicio, k=n), generador.choices(cierre, k=n))
+    
+    sesiones = []
+    for sesion, (m_retro, m_intro, m_inicio, m_cierre) in zip(plan_semanal, momentos):
+        clase = None
+        if sesion["Evento"] == "Clase normal" and "Planificacion" in sesion:
+            p = sesion["Planificacion"]
+            clase = Clase(
+                unidad=p["Unidad"],
+                contenido=p["Contenido"],
+                objetivo=f"El estudiante será capaz de {p['Verbo']} {p['Concepto']}",
+                nivel=p["Nivel"],
+                momentos=Momentos(m_retro, m_intro, m_inicio, p["Actividad"], m_cierre),
+                recursos=recursos_texto[p["Nivel"]],
+                evaluacion=evaluacion_texto[p["Nivel"]]
+            )
+        sesiones.append(Sesion(
+            numero=sesion["Sesion"],
+            fecha=sesion["Fecha"],
+            fecha_es=formatear_fecha_es(sesion["Fecha"]),
+            evento=sesion["Evento"],
+            clase=clase,
+            en_feriado=sesion["En_feriado"],
+            reagendada=sesion.get("Reagendada", False)
+        ))
+    return Plan(
+        sesiones=tuple(sesiones),
+        unidades=tuple((titulo, tuple(contenidos)) for titulo, contenidos in unidades_originales.items()),
+        configuracion=configuracion,
+        generado=generado or datetime.now()
+    )
+
+def generar_textos(plan):
+    """
+    Texto de la planificación para pantalla y archivo TXT, en un solo recorrido.
+    Devuelve (out, txt_data, txt_filename).
+    """
+    pantalla = io.StringIO()
+    archivo = io.BytesIO()
+    exportar(plan, [("txt", pantalla, {"solo_plan": True}), ("txt", SinkUTF8(archivo))])
+    timestamp = plan.generado.strftime("%Y%m%d_%H%M%S")
+    return pantalla.getvalue(), archivo.getvalue(), f"Planificacion_{timestamp}.txt"
+
+@lru_cache(maxsize=4096)
+def _contextos_sesion(sesion):
+    """
+    Entradas de una sesión en los contextos de planeamiento y cronograma.
+    Sesion es inmutable: al regenerar, solo se arman las de las sesiones que cambiaron.
+    """
+    context = {}
+    context_cronograma = {}
+    pref = f"SESION_{sesion.numero}_"
+
+    # Contexto común
+    context[pref + "FECHA"] = sesion.fecha.strftime("%Y-%m-%d")
+    context[pref + "EVENTO"] = sesion.evento
+    context_cronograma[pref + "FECHA"] = sesion.fecha.strftime("%Y-%m-%d")
+    context_cronograma[pref + "EVENTO"] = sesion.evento
+
+    clase = sesion.clase
+    if clase:
+        momentos = clase.momentos
+
+        # Contexto completo para planeamiento SIN ICONOS (documento institucional)
+        context[pref + "UNIDAD"] = clase.unidad
+        context[pref + "CONTENIDO"] = clase.contenido
+        context[pref + "OBJETIVO"] = clase.objetivo
+        context[pref + "NIVEL_BLOOM"] = clase.nivel
+        context[pref + "RETROALIMENTACION"] = f"Retroalimentación: {momentos.retroalimentacion}"
+        context[pref + "INTRODUCCION"] = f"Introducción: {momentos.introduccion}"
+        context[pref + "INICIO"] = f"Inicio: {momentos.inicio}"
+        context[pref + "DESARROLLO"] = f"Desarrollo: {momentos.desarrollo}"
+        context[pref + "CIERRE"] = f"Cierre: {momentos.cierre}"
+        context[pref + "RECURSOS"] = f"Recursos: {clase.recursos}"
+        context[pref + "EVALUACION"] = f"Evaluación: {clase.evaluacion}"
+
+        # Contexto resumido para cronograma
+        context_cronograma[pref + "UNIDAD"] = clase.unidad
+        context_cronograma[pref + "CONTENIDO"] = clase.contenido
+        context_cronograma[pref + "OBJETIVO"] = clase.objetivo
+        context_cronograma[pref + "NIVEL_BLOOM"] = clase.nivel
+
+    else:
+        # Campos vacíos para sesiones especiales
+        campos_vacios = ["UNIDAD", "CONTENIDO", "OBJETIVO", "NIVEL_BLOOM", 
+                       "RETROALIMENTACION", "INTRODUCCION", "INICIO", 
+                       "DESARROLLO", "CIERRE", "RECURSOS", "EVALUACION"]
+        for campo in campos_vacios:
+            context[pref + campo] = ""
+
+        # Para cronograma solo los campos básicos
+        context_cronograma[pref + "UNIDAD"] = ""
+        context_cronograma[pref + "CONTENIDO"] = ""
+        context_cronograma[pref + "OBJETIVO"] = ""
+        context_cronograma[pref + "NIVEL_BLOOM"] = ""
+
+    # Advertencia común SIN ICONOS
+    context[pref + "ADVERTENCIA"] = (
+        "ADVERTENCIA: Este día coincide con feriado." if sesion.en_feriado else ""
+    )
+    context_cronograma[pref + "ADVERTENCIA"] = (
+        "ADVERTENCIA: Este día coincide con feriado." if sesion.en_feriado else ""
+    )
+    
+    return context, context_cronograma
+
+def construir_contextos(plan):
+    """Genera los contextos de las plantillas de planeamiento y cronograma"""
+    context = {}
+    context_cronograma = {}
+    for sesion in plan.sesiones:
+        planeamiento, cronograma = _contextos_sesion(sesion)
+        context.update(planeamiento)
+        context_cronograma.update(cronograma)
+    return context, context_cronograma
+
+def huella_entradas(unidades_data, fecha_inicio, fecha_fin, dia_clase, feriados, prueba1, prueba2, fecha_examen_final, privilegio, plantillas, opciones_calendario=None, semilla=None, secciones=None):
+    """Huella (SHA-256) de todas las entradas que determinan el resultado generado"""
+    entradas = {
+        "unidades": [list(unidad) for unidad in unidades_data],
+        "fecha_inicio": str(fecha_inicio),
+        "fecha_fin": str(fecha_fin),
+        "dia_clase": dia_clase,
+        "feriados": sorted(str(f) for f in feriados),
+        "pruebas": [prueba1, prueba2],
+        "fecha_examen_final": str(fecha_examen_final),
+        "calendario": {**OPCIONES_CALENDARIO, **(opciones_calendario or {})},
+        "semilla": semilla,
+        "privilegio": privilegio,
+        "plantillas": {nombre: stats["hash"] for nombre, stats in plantillas.items()},
+        "secciones": [{clave: str(valor) for clave, valor in seccion.items()} for seccion in secciones or []]
+    }
+    return hashlib.sha256(json.dumps(entradas, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+# Color de fondo de cada fila del calendario (los feriados, si el evento no tiene color propio)
+COLORES_EVENTO = {
+    "Examen final": "#ffebee",
+    "Prueba parcial": "#fff3e0",
+    "Retroalimentación": "#e8f5e8",
+    "Revisión de prueba": "#e3f2fd",
+}
+COLOR_FERIADO = "#f3e5f5"
+
+_ORDINAL_EPOCA = datetime(1970, 1, 1).toordinal()
+
+def tabla_plan(plan, curso=None):
+    """
+    DataFrame del plan con una fila por sesión: sesion, fecha, evento, unidad,
+    nivel, en_feriado y reagendada (más curso, si se indica, para combinar
+    varios planes con pd.concat). Se arma por columnas en una sola pasada.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    sesiones = plan.sesiones
+    tabla = pd.DataFrame({
+        "sesion": [s.numero for s in sesiones],
+        # Ordinal → días desde 1970-01-01: NumPy no convierte objetos date uno por uno
+        "fecha": (np.fromiter((s.fecha.toordinal() for s in sesiones), dtype=np.int64, count=len(sesiones))
+                  - _ORDINAL_EPOCA).astype("datetime64[D]").astype("datetime64[ns]"),
+        "evento": [s.evento for s in sesiones],
+        "unidad": [s.clase.unidad if s.clase else None for s in sesiones],
+        "nivel": [s.clase.nivel if s.clase else None for s in sesiones],
+        "en_feriado": np.fromiter((s.en_feriado for s in sesiones), dtype=bool, count=len(sesiones)),
+        "reagendada": np.fromiter((s.reagendada for s in sesiones), dtype=bool, count=len(sesiones)),
+    })
+    if curso is not None:
+        tabla.insert(0, "curso", curso)
+    return tabla
+
+def metricas_por_curso(tabla):
+    """Métricas del resumen por curso (vista de varios cursos) sobre la concatenación de tabla_plan"""
+    return tabla.assign(
+        total_sesiones=1,
+        sesiones_normales=tabla["evento"].eq("Clase normal"),
+        pruebas=tabla["evento"].eq("Prueba parcial"),
+        feriados=tabla["en_feriado"],
+    ).groupby("curso", sort=False)[["total_sesiones", "sesiones_normales", "pruebas", "feriados"]].sum()
+
+def _fechas_dd_mm_aaaa(fechas):
+    """Columna de fechas como texto DD/MM/AAAA, sin formatear fila por fila"""
+    import numpy as np
+    
+    # "AAAA-MM-DD" de NumPy, reordenado carácter a carácter
+    iso = np.datetime_as_string(fechas.to_numpy(dtype="datetime64[D]"), unit="D").astype("<U10")
+    caracteres = iso.view("<U1").reshape(-1, 10)
+    reordenado = caracteres[:, [8, 9, 4, 5, 6, 4, 0, 1, 2, 3]]
+    reordenado[:, [2, 5]] = "/"
+    return np.ascontiguousarray(reordenado).view("<U10").ravel()
+
+def resumir_planificacion(plan):
+    """Calcula las métricas, la distribución de Bloom y la tabla del calendario a partir de tabla_plan"""
+    import numpy as np
+    import pandas as pd
+    
+    tabla = tabla_plan(plan)
+    eventos = tabla["evento"].value_counts()
+    metricas = {
+        "total_sesiones": len(tabla),
+        "sesiones_normales": int(eventos.get("Clase normal", 0)),
+        "pruebas": int(eventos.get("Prueba parcial", 0)),
+        "feriados": int(tabla["en_feriado"].sum())
+    }
+    
+    # Niveles en el orden de la taxonomía, solo los que aparecen
+    niveles = tabla["nivel"].value_counts()
+    distribucion_bloom = niveles.reindex([nivel for nivel in verbos_bloom if nivel in niveles.index])
+    
+    df_calendar = pd.DataFrame({
+        "Sesión": tabla["sesion"],
+        "Fecha": _fechas_dd_mm_aaaa(tabla["fecha"]),
+        "Día": tabla["fecha"].dt.weekday.map(dias_semana_es),
+        "Evento": tabla["evento"],
+        "Unidad": tabla["unidad"].fillna("-"),
+        "Feriado": np.select([tabla["en_feriado"], tabla["reagendada"]], ["⚠️", "📅 Reagendada"], ""),
+    })
+    colores = tabla["evento"].map(COLORES_EVENTO).astype(object)
+    colores = colores.where(colores.notna(), np.where(tabla["en_feriado"], COLOR_FERIADO, ""))
+    
+    return {
+        "metricas": metricas,
+        "distribucion_bloom": distribucion_bloom,
+        "df_calendar": df_calendar,
+        "colores_calendar": colores
+    }
+
+def renderizar_documentos(trabajos, avance=None):
+    """
+    Renderiza los documentos pasando por la caché de artefactos.
+    trabajos: lista de (nombre, tipo, datos_plantilla, context); devuelve,
+    en el mismo orden, (nombre, bytes, error). Solo los fallos de caché se
+    renderizan (en paralelo) y se guardan.
+    avance: opcional, se llama con el tipo de cada documento apenas está listo.
+    """
+    cache = obtener_cache()
+    claves = [
+        clave_artefacto(hashlib.sha256(datos).hexdigest(), hash_contexto(context), tipo)
+        for _, tipo, datos, context in trabajos
+    ]
+    documentos = [None] * len(trabajos)
+    pendientes = []
+    for i, (nombre, _, datos, context) in enumerate(trabajos):
+        contenido = cache.obtener(claves[i])
+        if contenido is not None:
+            documentos[i] = (nombre, contenido, None)
+            if avance:
+                avance(trabajos[i][1])
+        else:
+            pendientes.append(i)
+    
+    inicio_render = time.perf_counter()
+    
+    def al_terminar(j):
+        # Con el render en paralelo, cada documento cuenta desde el inicio del lote
+        tipo = trabajos[pendientes[j]][1]
+        anotar(f"render_{tipo}", time.perf_counter() - inicio_render)
+        if avance:
+            avance(tipo)
+    
+    from motor_render import renderizar_docx_en_paralelo
+    renderizados = renderizar_docx_en_paralelo(
+        [(trabajos[i][0], trabajos[i][2], trabajos[i][3]) for i in pendientes],
+        al_terminar=al_terminar
+    )
+    for i, (nombre, contenido, error) in zip(pendientes, renderizados):
+        if error is None:
+            cache.guardar(claves[i], contenido)
+        documentos[i] = (nombre, contenido, error)
+    return documentos
+
+def _trabajos_documentos(context, context_cronograma, plantilla_planeamiento, plantilla_cronograma, plan, carpeta=""):
+    """Documentos Word a renderizar para un plan: (nombre, tipo, plantilla, context)"""
+    timestamp = plan.generado.strftime("%Y%m%d_%H%M%S")
+    trabajos = []
+    if plantilla_planeamiento:
+        trabajos.append((f"{carpeta}Planeamiento_{timestamp}.docx", "planeamiento", plantilla_planeamiento, context))
+    if plantilla_cronograma:
+        trabajos.append((f"{carpeta}Cronograma_{timestamp}.docx", "cronograma", plantilla_cronograma, context_cronograma))
+    return trabajos
+
+def _miembros_plan(plan, documentos, fallidos, carpeta=""):
+    """Miembros del ZIP de un plan: documentos renderizados y el resumen en cada formato"""
+    timestamp = plan.generado.strftime("%Y%m%d_%H%M%S")
+    archivos = [("Planeamiento", f"Planeamiento_{timestamp}.docx"), ("Cronograma", f"Cronograma_{timestamp}.docx")]
+    archivos += [(escritor.etiqueta, f"Planificacion_{timestamp}.{formato}") for formato, escritor in FORMATOS.items()]
+    
+    # Agregar los documentos en orden fijo; un error no descarta el otro
+    for nombre_archivo, contenido, error in documentos:
+        if error is not None:
+            fallidos.append((nombre_archivo, error))
+            continue
+        yield nombre_archivo, contenido
+    
+    # Resumen en cada formato, escrito por partes directo en su entrada
+    for formato in FORMATOS:
+        opciones = {"archivos": archivos} if formato == "txt" else {}
+        yield f"{carpeta}Planificacion_{timestamp}.{formato}", partes(plan, formato, **opciones)
+
+def escribir_archivo_zip(destino, context, context_cronograma, plantilla_planeamiento, plantilla_cronograma, plan, avance=None):
+    """
+    Escribe en destino (archivo o buffer) el ZIP con todos los documentos generados.
+    avance: opcional, se llama con "planeamiento", "cronograma" y "zip" al completar cada uno.
+    Devuelve la lista de (nombre, error) de los documentos que no se pudieron generar.
+    """
+    # Renderizar Planeamiento y Cronograma a la vez en el pool de procesos
+    # (las plantillas se compilan una vez por proceso; aquí solo se sustituye),
+    # salvo los que ya están en la caché de artefactos
+    documentos = renderizar_documentos(
+        _trabajos_documentos(context, context_cronograma, plantilla_planeamiento, plantilla_cronograma, plan),
+        avance
+    )
+    
+    # Cada miembro va directo a su entrada; los .docx se guardan sin recomprimir
+    fallidos = []
+    with medir("zip"):
+        escribir_paquete_zip(destino, _miembros_plan(plan, documentos, fallidos), plan.generado)
+    if avance:
+        avance("zip")
+    
+    return fallidos
+
+def crear_archivo_zip(context, context_cronograma, plantilla_planeamiento, plantilla_cronograma, plan, avance=None):
+    """
+    Crea un archivo ZIP con todos los documentos generados.
+    Devuelve (PaqueteZip o None, lista de mensajes de error).
+    """
+    zip_buffer = crear_destino_temporal()
+    try:
+        fallidos = escribir_archivo_zip(
+            zip_buffer, context, context_cronograma,
+            plantilla_planeamiento, plantilla_cronograma, plan, avance
+        )
+    except Exception as e:
+        zip_buffer.close()
+        return None, [f"Error al generar los archivos: {str(e)}"]
+    
+    return PaqueteZip(zip_buffer), [f"Error al generar {nombre_archivo}: {str(error)}" for nombre_archivo, error in fallidos]
+
+def crear_archivo_exportado(plan, formato):
+    """Crea el archivo de un formato de exportación; devuelve (bytes, nombre)"""
+    timestamp = plan.generado.strftime("%Y%m%d_%H%M%S")
+    return exportar_bytes(plan, formato), f"Planificacion_{timestamp}.{formato}"
+
+# Etapas de una generación, en orden, con su nombre para mostrar
+ETAPAS_GENERACION = {
+    "unidades": "Unidades",
+    "calendario": "Calendario",
+    "planeamiento": "Planeamiento (Word)",
+    "cronograma": "Cronograma (Word)",
+    "zip": "Paquete ZIP",
+}
+
+def etapas_generacion(documentos, plantilla_planeamiento, plantilla_cronograma):
+    """Etapas que recorrerá la generación según el privilegio y las plantillas disponibles"""
+    etapas = ["unidades", "calendario"]
+    if documentos and (plantilla_planeamiento or plantilla_cronograma):
+        if plantilla_planeamiento:
+            etapas.append("planeamiento")
+        if plantilla_cronograma:
+            etapas.append("cronograma")
+        etapas.append("zip")
+    return etapas
+
+def ejecutar_generacion(entradas, avance=None):
+    """
+    Pipeline completo de una generación, sin interfaz (corre en la cola de trabajos).
+    entradas: datos del curso, opciones, plantillas y si se generan los documentos;
+    opcionalmente "generado", la fecha de generación (por defecto, ahora): con
+    la misma semilla y la misma fecha los archivos son idénticos byte a byte.
+    Devuelve el resultado que dibuja mostrar_resultados, con los tiempos por
+    etapa en "tiempos"; lanza ValueError si el contenido no alcanza para
+    generar el plan.
+    """
+    with solicitud() as tiempos:
+        with medir("total"):
+            resultado = generar_resultado(entradas, avance)
+    resultado["tiempos"] = tiempos
+    obtener_registro_tiempos().escribir_prometheus()
+    return resultado
+
+def configuracion_plan(fecha_inicio, fecha_fin, dia_clase, opciones_calendario, feriados, prueba1, prueba2, fecha_examen_final, semilla):
+    """Configuración del plan que se guarda en el modelo y en los archivos"""
+    return {
+        'fecha_inicio': fecha_inicio.strftime("%Y-%m-%d"),
+        'fecha_fin': fecha_fin.strftime("%Y-%m-%d"),
+        'dia_clase': ", ".join(dict.fromkeys([dia_clase, *(opciones_calendario or {}).get("dias_extra", [])])),
+        'feriados': feriados,
+        'pruebas': [prueba1, prueba2],
+        'fecha_examen_final': fecha_examen_final.strftime("%Y-%m-%d"),
+        'semilla': semilla
+    }
+
+# === Generación incremental: el pipeline como grafo de etapas ===
+def _etapa_semilla(unidades_data, semilla):
+    if semilla is not None:
+        return semilla
+    return semilla_entradas(unidades_data)
+
+def _etapa_unidades(unidades_data):
+    with medir("unidades"):
+        return genera_dict_unidades(unidades_data)
+
+def _etapa_bloques(unidades_originales, sesiones_normales):
+    with medir("ajuste_sesiones"):
+        lista_bloques_sesion = ajustar_unidades_para_sesiones(unidades_originales, sesiones_normales)
+    with medir("conceptos"):
+        return preparar_bloques(lista_bloques_sesion)
+
+def _etapa_niveles(bloques, semilla):
+    """Fragmentos y estado del generador tras sortear los verbos (los momentos siguen desde ahí)"""
+    generador = random.Random(semilla)
+    fragmentos_sesiones = asignar_niveles(bloques, generador)
+    return fragmentos_sesiones, generador.getstate()
+
+def _etapa_asignacion(calendario, niveles):
+    # Copia de cada sesión: el calendario memorizado no se modifica
+    plan_semanal = [dict(sesion) for sesion in calendario]
+    advertencias = asignar_fragmentos(plan_semanal, niveles[0])
+    return plan_semanal, advertencias
+
+def _etapa_modelo(asignacion, unidades_originales, configuracion, niveles):
+    """Modelo sin fecha (datetime.min): se memoriza, y la etapa plan le pone la de cada generación"""
+    generador = random.Random()
+    generador.setstate(niveles[1])
+    with medir("modelo"):
+        return construir_modelo_plan(asignacion[0], unidades_originales, configuracion, generador, datetime.min)
+
+def _etapa_plan(modelo, generado):
+    return replace(modelo, generado=generado)
+
+def _etapa_textos(plan):
+    with medir("texto_txt"):
+        return generar_textos(plan)
+
+def _etapa_contextos(plan):
+    with medir("contextos"):
+        return construir_contextos(plan)
+
+def _etapa_paquete(plan, contextos, plantilla_planeamiento, plantilla_cronograma):
+    """(PaqueteZip o None, mensajes de error)"""
+    return crear_archivo_zip(*contextos, plantilla_planeamiento, plantilla_cronograma, plan)
+
+# Cada etapa solo ve sus entradas: si cambia un feriado se rehacen el calendario
+# y lo que depende de él, pero no las unidades, el ajuste ni los conceptos
+GRAFO_GENERACION = GrafoEtapas([
+    Etapa("semilla_generacion", ("unidades_data", "semilla"), _etapa_semilla),
+    Etapa("sesiones", ("dia_clase", "prueba1", "prueba2", "opciones_calendario"), estructura_sesiones),
+    Etapa("sesiones_normales", ("sesiones",), itemgetter("sesiones_normales")),
+    Etapa("unidades", ("unidades_data",), _etapa_unidades),
+    Etapa("bloques", ("unidades", "sesiones_normales"), _etapa_bloques),
+    Etapa("niveles", ("bloques", "semilla_generacion"), _etapa_niveles),
+    # Con varias secciones, todos los calendarios salen de un generar_calendarios
+    Etapa("calendario", ("fecha_inicio", "fecha_examen_final", "feriados", "sesiones"), calendario_sesiones,
+          funcion_lote=calendarios_sesiones),
+    Etapa("asignacion", ("calendario", "niveles"), _etapa_asignacion),
+    Etapa("configuracion", ("fecha_inicio", "fecha_fin", "dia_clase", "opciones_calendario", "feriados",
+                            "prueba1", "prueba2", "fecha_examen_final", "semilla_generacion"), configuracion_plan),
+    Etapa("modelo", ("asignacion", "unidades", "configuracion", "niveles"), _etapa_modelo),
+    # Lo que lleva la fecha de generación (encabezado del TXT, nombres de los
+    # archivos) no se memoriza: sin fecha fija, cambia en cada generación
+    Etapa("plan", ("modelo", "generado"), _etapa_plan, memorizable=lambda plan: False),
+    Etapa("textos", ("plan",), _etapa_textos, memorizable=lambda textos: False),
+    Etapa("resumen", ("modelo",), resumir_planificacion),
+    Etapa("contextos", ("modelo",), _etapa_contextos),
+    # El ZIP tampoco: ocuparía su tamaño completo en cada entrada, y sus
+    # documentos ya se reutilizan desde la caché de artefactos
+    Etapa("paquete", ("plan", "contextos", "plantilla_planeamiento", "plantilla_cronograma"),
+          _etapa_paquete, memorizable=lambda paquete: False),
+])
+
+# Etapas que entregan todo lo que muestra la pantalla de un plan
+OBJETIVOS_PLAN = ["semilla_generacion", "asignacion", "plan", "textos", "resumen"]
+
+# Pasos de avance (ETAPAS_GENERACION) que completa cada etapa del grafo
+PASOS_AVANCE = {"niveles": ["unidades"], "asignacion": ["calendario"]}
+
+def _al_terminar(pasos, avance):
+    """al_terminar del grafo que informa a avance los pasos de cada etapa resuelta"""
+    if avance is None:
+        return None
+    
+    def al_terminar(etapa):
+        for paso in pasos.get(etapa, ()):
+            avance(paso)
+    return al_terminar
+
+def _resultado_etapas(entradas, valores, informe):
+    """Resultado de un plan (lo que dibuja mostrar_resultados) a partir de los valores de OBJETIVOS_PLAN"""
+    plan_semanal, advertencias = valores["asignacion"]
+    out, txt_data, txt_filename = valores["textos"]
+    return {
+        "unidades_originales": valores["unidades"],
+        "fragmentos_sesiones": valores["niveles"][0],
+        "plan_semanal": plan_semanal,
+        "pruebas": [entradas["prueba1"], entradas["prueba2"]],
+        "advertencias": list(advertencias),
+        "semilla": valores["semilla_generacion"],
+        "out": out,
+        "plan": valores["plan"],
+        "feriados": entradas["feriados"],
+        "nombres_feriados": entradas["nombres_feriados"],
+        "zip_paquete": None,
+        "zip_filename": None,
+        "errores_documentos": [],
+        "txt_data": txt_data,
+        "txt_filename": txt_filename,
+        "etapas": informe,
+        **valores["resumen"]
+    }
+
+def generar_resultado(entradas, avance=None):
+    """
+    Etapas de ejecutar_generacion sobre GRAFO_GENERACION: solo se recalculan
+    las que tienen alguna entrada distinta de una generación anterior.
+    El resultado incluye "etapas", con {etapa: "reutilizada" o "recalculada"}.
+    """
+    # La fecha se fija antes del grafo: el plan y sus archivos llevan la misma
+    entradas = {**entradas, "generado": entradas.get("generado") or datetime.now()}
+    plantilla_planeamiento = entradas["plantilla_planeamiento"]
+    plantilla_cronograma = entradas["plantilla_cronograma"]
+    documentos = entradas["documentos"] and (plantilla_planeamiento or plantilla_cronograma)
+    objetivos = OBJETIVOS_PLAN + (["paquete"] if documentos else [])
+    
+    # Pasos de avance que completa cada etapa (el paquete, todos los documentos y el ZIP)
+    pasos = {
+        **PASOS_AVANCE,
+        "paquete": etapas_generacion(entradas["documentos"], plantilla_planeamiento, plantilla_cronograma)[2:],
+    }
+    valores, informe = GRAFO_GENERACION.ejecutar(entradas, objetivos, al_terminar=_al_terminar(pasos, avance))
+    resultado = _resultado_etapas(entradas, valores, informe)
+    
+    if documentos:
+        resultado["zip_paquete"], errores = valores["paquete"]
+        resultado["errores_documentos"] = list(errores)
+        if resultado["zip_paquete"]:
+            resultado["zip_filename"] = f"Planificacion_Completa_{resultado['plan'].generado.strftime('%Y%m%d_%H%M%S')}.zip"
+    
+    return resultado
+
+# === Secciones: un programa, varios calendarios ===
+def nombre_carpeta_seccion(nombre):
+    """Carpeta segura para los archivos de una sección dentro del paquete"""
+    return re.sub(r'[^\w.-]+', '_', nombre).strip('._') or "seccion"
+
+def _avance_por_tipo(trabajos, avance):
+    """avance(tipo) recién cuando terminaron todos los documentos de ese tipo"""
+    if avance is None:
+        return None
+    faltan = {}
+    for _, tipo, _, _ in trabajos:
+        faltan[tipo] = faltan.get(tipo, 0) + 1
+    
+    def avance_tipo(tipo):
+        faltan[tipo] -= 1
+        if faltan[tipo] == 0:
+            avance(tipo)
+    return avance_tipo
+
+def ejecutar_generacion_secciones(entradas, avance=None):
+    """
+    Como ejecutar_generacion, pero para varias secciones de un mismo programa.
+    entradas: las de ejecutar_generacion más "secciones", una lista de
+    {nombre, dia_clase, prueba1, prueba2, fecha_examen_final}; los campos
+    propios de cada sección reemplazan a los del curso.
+    """
+    with solicitud() as tiempos:
+        with medir("total"):
+            resultado = generar_secciones(entradas, avance)
+    resultado["tiempos"] = tiempos
+    obtener_registro_tiempos().escribir_prometheus()
+    return resultado
+
+def generar_secciones(entradas, avance=None):
+    """
+    Genera todas las secciones con las etapas de GRAFO_GENERACION, en un solo
+    lote (ejecutar_lote): lo que solo depende del programa (unidades, ajuste a
+    sesiones y conceptos) se calcula una vez por cantidad distinta de
+    sesiones normales, y lo de cada sección se reutiliza entre generaciones
+    como en generar_resultado. Los documentos de todas se renderizan en un
+    solo lote y se entregan en un único ZIP con una carpeta por sección y un
+    resumen CSV.
+    """
+    import pandas as pd
+    
+    carpetas = [nombre_carpeta_seccion(seccion["nombre"]) for seccion in entradas["secciones"]]
+    if len(set(carpetas)) != len(carpetas):
+        raise ValueError("Los nombres de las secciones deben ser distintos")
+    
+    plantilla_planeamiento = entradas["plantilla_planeamiento"]
+    plantilla_cronograma = entradas["plantilla_cronograma"]
+    documentos_activos = entradas["documentos"] and (plantilla_planeamiento or plantilla_cronograma)
+    
+    # Una sola fecha de generación para todas las secciones y el paquete
+    generado = entradas.get("generado") or datetime.now()
+    curso = {clave: valor for clave, valor in entradas.items() if clave != "secciones"}
+    lista_entradas = [
+        {**curso, **{clave: valor for clave, valor in seccion.items() if clave != "nombre"}, "generado": generado}
+        for seccion in entradas["secciones"]
+    ]
+    objetivos = OBJETIVOS_PLAN + (["contextos"] if documentos_activos else [])
+    ejecutadas = GRAFO_GENERACION.ejecutar_lote(
+        lista_entradas, objetivos, al_terminar=_al_terminar(PASOS_AVANCE, avance)
+    )
+    secciones = [
+        {**_resultado_etapas(entradas_seccion, valores, informe), "nombre": seccion["nombre"]}
+        for seccion, entradas_seccion, (valores, informe) in zip(entradas["secciones"], lista_entradas, ejecutadas)
+    ]
+    
+    # Documentos de todas las secciones en un solo lote (en paralelo y pasando por la caché)
+    documentos_por_seccion = [None] * len(secciones)
+    if documentos_activos:
+        trabajos = []
+        rangos = []
+        for seccion, carpeta, (valores, _) in zip(secciones, carpetas, ejecutadas):
+            context, context_cronograma = valores["contextos"]
+            inicio = len(trabajos)
+            trabajos += _trabajos_documentos(
+                context, context_cronograma, plantilla_planeamiento, plantilla_cronograma,
+                seccion["plan"], f"{carpeta}/"
+            )
+            rangos.append((inicio, len(trabajos)))
+        documentos = renderizar_documentos(trabajos, _avance_por_tipo(trabajos, avance))
+        documentos_por_seccion = [documentos[inicio:fin] for inicio, fin in rangos]
+    
+    # Las métricas de cada sección ya están en su resumen: no se vuelve a recorrer ningún plan
+    resumen = pd.DataFrame.from_dict(
+        {seccion["nombre"]: seccion["metricas"] for seccion in secciones}, orient="index"
+    ).rename_axis("curso")
+    
+    fallidos = []
+    
+    def miembros():
+        for seccion, carpeta, documentos in zip(secciones, carpetas, documentos_por_seccion):
+            if documentos is None:
+                # Sin documentos (privilegio Estándar): solo el TXT de cada sección
+                yield f"{carpeta}/{seccion['txt_filename']}", seccion["txt_data"]
+            else:
+                yield from _miembros_plan(seccion["plan"], documentos, fallidos, f"{carpeta}/")
+        yield "Resumen_secciones.csv", resumen.to_csv(index_label="seccion")
+    
+    # El paquete queda en su archivo temporal; se lee al servir la descarga
+    zip_buffer = crear_destino_temporal()
+    try:
+        with medir("zip"):
+            escribir_paquete_zip(zip_buffer, miembros(), generado)
+    except BaseException:
+        zip_buffer.close()
+        raise
+    if avance:
+        avance("zip")
+    
+    return {
+        "secciones": secciones,
+        "resumen_secciones": resumen,
+        "zip_paquete": PaqueteZip(zip_buffer),
+        "zip_filename": f"Planificacion_Secciones_{generado.strftime('%Y%m%d_%H%M%S')}.zip",
+        "errores_documentos": [f"Error al generar {nombre_archivo}: {str(error)}" for nombre_archivo, error in fallidos],
+    }
@@ -0,0 +1,214 @@
+"""
+Importación de programas de asignatura (.docx, .md o .txt).
+
+El archivo se recorre párrafo a párrafo, sin armar el documento completo en
+memoria: los .md y .txt línea a línea sobre el flujo de bytes, y los .docx
+leyendo word/document.xml con iterparse y descartando cada párrafo apenas
+se procesa.
+
+Cada párrafo pasa por ImportadorPrograma, que a medida que llegan separa
+encabezados e ítems de contenido (sin viñetas ni numeración) en secciones.
+Al terminar decide cuáles encabezados son unidades:
+
+- si hay encabezados "Unidad 3: ...", "Módulo II - ...", "Capítulo 4."
+  (y similares), esos son las unidades;
+- si no, los títulos (estilos Título/Heading de Word, "#" de Markdown) del
+  nivel menos profundo que se repite; un único título de nivel superior es
+  el del documento;
+- los subtítulos pasan a ser ítems de su unidad, y lo que está antes de la
+  primera unidad (portada: nombre del curso, docentes...) se descarta.
+
+El resultado es directamente la lista de (título, contenidos) que usa el
+resto del pipeline, con un ítem por línea.
+"""
+import io
+import re
+import zipfile
+from xml.etree import ElementTree
+
+EXTENSIONES = (".docx", ".md", ".txt")
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_P = f"{_W}p"
+_T = f"{_W}t"
+_TAB = f"{_W}tab"
+_BR = f"{_W}br"
+_PPR = f"{_W}pPr"
+_PSTYLE = f"{_W}pStyle"
+_OUTLINE = f"{_W}outlineLvl"
+_BODY = f"{_W}body"
+_VAL = f"{_W}val"
+
+_RE_UNIDAD = re.compile(
+    r"^(?:unidad|m[óo]dulo|bloque|cap[íi]tulo|eje)\s+(?:\d{1,3}|[ivxlc]{1,6})\b", re.IGNORECASE
+)
+_RE_TITULO_MD = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_RE_ESTILO_TITULO = re.compile(r"^(?:heading|t[íi]?tulo)\s?(\d)$", re.IGNORECASE)
+_RE_VINETA = re.compile(
+    r"^\s*(?:[-*+•·▪◦–—]|\d{1,3}(?:\.\d{1,3})*[.)]?|[a-zA-Z][.)]|[ivxlc]{1,5}[.)])\s+", re.IGNORECASE
+)
+_RE_ENFASIS = re.compile(r"\*\*|__|`")
+_RE_ROTULO = re.compile(
+    r"^(?:contenidos?|temas?|temario|objetivos?|programa)(?:\s+\w+){0,2}\s*:?\s*$", re.IGNORECASE
+)
+_RE_ESPACIOS = re.compile(r"\s+")
+
+
+# === Lectura párrafo a párrafo: (texto, nivel de título o None) ===
+def parrafos_texto(flujo):
+    """Párrafos de un .md o .txt (flujo binario), línea a línea"""
+    lector = io.TextIOWrapper(flujo, encoding="utf-8-sig", errors="replace")
+    try:
+        for linea in lector:
+            coincidencia = _RE_TITULO_MD.match(linea)
+            if coincidencia:
+                yield coincidencia.group(2), len(coincidencia.group(1))
+            else:
+                yield linea, None
+    finally:
+        # Sin cerrar el flujo del llamador
+        lector.detach()
+
+
+def _nivel_docx(p_pr):
+    if p_pr is None:
+        return None
+    estilo = p_pr.find(_PSTYLE)
+    if estilo is not None:
+        coincidencia = _RE_ESTILO_TITULO.match(estilo.get(_VAL, ""))
+        if coincidencia:
+            return int(coincidencia.group(1))
+        if estilo.get(_VAL, "").lower() in ("title", "titulo", "ttulo"):
+            return 0
+    esquema = p_pr.find(_OUTLINE)
+    if esquema is not None and esquema.get(_VAL, "").isdigit():
+        return int(esquema.get(_VAL)) + 1
+    return None
+
+
+def parrafos_docx(flujo):
+    """
+    Párrafos de un .docx (flujo binario con seek), incluidos los de tablas.
+    Cada párrafo se libera al procesarlo y los ya leídos se quitan del cuerpo.
+    """
+    try:
+        with zipfile.ZipFile(flujo) as paquete, paquete.open("word/document.xml") as documento:
+            cuerpo = None
+            profundidad = 0
+            for evento, elemento in ElementTree.iterparse(documento, events=("start", "end")):
+                if evento == "start":
+                    profundidad += 1
+                    if elemento.tag == _BODY:
+                        cuerpo, profundidad_cuerpo = elemento, profundidad
+                    continue
+                profundidad -= 1
+                if elemento.tag == _P:
+                    partes = []
+                    for hijo in elemento.iter():
+                        if hijo.tag == _T:
+                            partes.append(hijo.text or "")
+                        elif hijo.tag in (_TAB, _BR):
+                            partes.append(" ")
+                    yield "".join(partes), _nivel_docx(elemento.find(_PPR))
+                    elemento.clear()
+                if cuerpo is not None and profundidad == profundidad_cuerpo:
+                    # Terminó un hijo directo del cuerpo (párrafo o tabla)
+                    cuerpo.clear()
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ValueError("no es un documento .docx válido") from e
+    except ElementTree.ParseError as e:
+        raise ValueError(f"XML del documento dañado ({e})") from e
+
+
+class ImportadorPrograma:
+    """
+    Reúne los párrafos en secciones a medida que llegan (cada encabezado abre
+    una) y al final decide cuáles son unidades, sin volver a leer el archivo.
+    """
+
+    def __init__(self):
+        # [título, nivel, es "Unidad N", ítems]; la primera es la portada
+        self._secciones = [[None, None, False, []]]
+        self._niveles = {}
+        self._explicitas = 0
+        self.parrafos = 0
+
+    def agregar(self, texto, nivel=None):
+        """Procesa un párrafo; nivel es el nivel de título (None si es texto)"""
+        self.parrafos += 1
+        texto = _RE_ESPACIOS.sub(" ", _RE_ENFASIS.sub("", texto)).strip()
+        if not texto:
+            return
+
+        explicita = bool(_RE_UNIDAD.match(texto))
+        if explicita or nivel is not None:
+            self._secciones.append([texto.rstrip(" .:"), nivel, explicita, []])
+            self._explicitas += explicita
+            if nivel is not None:
+                self._niveles[nivel] = self._niveles.get(nivel, 0) + 1
+            return
+
+        if _RE_ROTULO.match(texto):
+            return
+        item = _RE_VINETA.sub("", texto, count=1).strip()
+        if item:
+            self._secciones[-1][3].append(item)
+
+    def _nivel_unidades(self):
+        """Nivel de título de las unidades: el menos profundo que se repite"""
+        repetidos = [nivel for nivel, cantidad in self._niveles.items() if cantidad > 1 and nivel > 0]
+        if repetidos:
+            return min(repetidos)
+        return max(self._niveles, default=None)
+
+    def unidades(self):
+        """Lista de [título, ítems] de las unidades con contenido"""
+        nivel_unidades = None if self._explicitas else self._nivel_unidades()
+        unidades = []
+        actual = None
+        nivel_actual = None
+        for titulo, nivel, explicita, items in self._secciones[1:]:
+            if explicita if self._explicitas else nivel == nivel_unidades:
+                actual = [titulo, list(items)]
+                nivel_actual = nivel if nivel is not None else nivel_unidades
+                unidades.append(actual)
+            elif actual is not None and (nivel is None or nivel_actual is None or nivel > nivel_actual):
+                # Subtítulo dentro de la unidad: es un ítem más
+                actual[1].append(titulo)
+                actual[1].extend(items)
+            else:
+                # Portada o sección de nivel superior (título del documento, bibliografía...)
+                actual = None
+        unidades = [unidad for unidad in unidades if unidad[1]]
+        if not unidades and not self._explicitas and not self._niveles:
+            # Sin encabezados: todo es una sola unidad
+            unidades = [["Unidad 1", list(self._secciones[0][3])]] if self._secciones[0][3] else []
+        return unidades
+
+
+def importar_programa(flujo, nombre_archivo):
+    """
+    Lee un programa (.docx, .md o .txt) desde un flujo binario o bytes y
+    devuelve (unidades_data, estadísticas). Lanza ValueError si el formato
+    no es válido o no se encontró ningún contenido.
+    """
+    if isinstance(flujo, (bytes, bytearray)):
+        flujo = io.BytesIO(flujo)
+    extension = nombre_archivo.lower().rsplit(".", 1)[-1]
+    if f".{extension}" not in EXTENSIONES:
+        raise ValueError(f"formato no soportado (.{extension}); use {', '.join(EXTENSIONES)}")
+
+    importador = ImportadorPrograma()
+    parrafos = parrafos_docx(flujo) if extension == "docx" else parrafos_texto(flujo)
+    for texto, nivel in parrafos:
+        importador.agregar(texto, nivel)
+
+    unidades = importador.unidades()
+    if not unidades:
+        raise ValueError("no se encontraron contenidos en el programa")
+    estadisticas = {
+        "parrafos": importador.parrafos,
+        "unidades": len(unidades),
+        "items": sum(len(items) for _, items in unidades),
+    }
+    return [(titulo, "\n".join(items)) for titulo, items in unidades], estadisticas
@@ -0,0 +1,144 @@
+"""
+Preparación de recursos NLTK sin acceso a red.
+
+La extracción de conceptos solo usa el corpus de stopwords en español.
+Se verifica en su categoría (corpora), el resultado se guarda en un
+manifiesto local para que los siguientes arranques no vuelvan a sondear, y
+NLTK se carga de forma diferida solo cuando la extracción lo necesita.
+
+Para instalar los recursos en un servidor sin red, copie la carpeta
+nltk_data a una de las rutas de NLTK (o defina NLTK_DATA) y ejecute:
+
+    python recursos_nltk.py
+"""
+import json
+import os
+import time
+from importlib import metadata
+
+# Recurso -> ruta relativa dentro de nltk_data
+RECURSOS_NLTK = {
+    "stopwords": "corpora/stopwords",
+}
+
+ARCHIVO_MANIFIESTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".nltk_manifest.json")
+
+_estado = None
+_nltk = None
+
+
+def _clave_entorno():
+    """Identifica el entorno NLTK sin importar la librería"""
+    try:
+        version = metadata.version("nltk")
+    except metadata.PackageNotFoundError:
+        version = None
+    return {"nltk": version, "nltk_data": os.environ.get("NLTK_DATA", "")}
+
+
+def _leer_manifiesto():
+    """Lee el manifiesto local si existe"""
+    try:
+        with open(ARCHIVO_MANIFIESTO, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _guardar_manifiesto(manifiesto):
+    """Guarda el manifiesto de forma atómica"""
+    temporal = f"{ARCHIVO_MANIFIESTO}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(manifiesto, f, indent=2, ensure_ascii=False)
+        os.replace(temporal, ARCHIVO_MANIFIESTO)
+    except OSError:
+        # Directorio de solo lectura: el estado se mantiene en memoria
+        pass
+
+
+def _sondear_recursos():
+    """Busca cada recurso en su categoría, solo en disco"""
+    try:
+        import nltk
+    except ImportError:
+        return None, {recurso: False for recurso in RECURSOS_NLTK}
+
+    disponibles = {}
+    for recurso, ruta in RECURSOS_NLTK.items():
+        try:
+            nltk.data.find(ruta)
+            disponibles[recurso] = True
+        except LookupError:
+            disponibles[recurso] = False
+    return nltk, disponibles
+
+
+def preparar_recursos_nltk(forzar=False):
+    """
+    Verifica los recursos NLTK una sola vez por proceso.
+    Si el manifiesto coincide con el entorno no vuelve a sondear; use
+    forzar=True (o ejecute este módulo) tras instalar recursos nuevos.
+    Nunca descarga nada.
+    """
+    global _estado
+    if _estado is not None and not forzar:
+        return _estado
+
+    inicio = time.perf_counter()
+    clave = _clave_entorno()
+    manifiesto = None if forzar else _leer_manifiesto()
+
+    if (manifiesto and manifiesto.get("entorno") == clave
+            and manifiesto.get("recursos", {}).keys() == RECURSOS_NLTK.keys()):
+        recursos = manifiesto["recursos"]
+        origen = "manifiesto"
+    else:
+        _, recursos = _sondear_recursos()
+        origen = "sondeo"
+        _guardar_manifiesto({
+            "entorno": clave,
+            "recursos": recursos,
+            "verificado": time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+
+    _estado = {
+        "instalado": clave["nltk"] is not None,
+        "recursos": recursos,
+        "listo": clave["nltk"] is not None and all(recursos.values()),
+        "faltantes": [r for r, ok in recursos.items() if not ok],
+        "origen": origen,
+        "duracion_ms": (time.perf_counter() - inicio) * 1000,
+    }
+    return _estado
+
+
+def cargar_nltk():
+    """Importa NLTK de forma diferida; devuelve None si no está listo"""
+    global _nltk
+    if _nltk is not None:
+        return _nltk
+
+    estado = preparar_recursos_nltk()
+    if not estado["instalado"] or not estado["listo"]:
+        return None
+
+    try:
+        import nltk
+    except ImportError:
+        return None
+    _nltk = nltk
+    return _nltk
+
+
+if __name__ == "__main__":
+    estado = preparar_recursos_nltk(forzar=True)
+    for recurso, ok in estado["recursos"].items():
+        print(f"{'✅' if ok else '❌'} {RECURSOS_NLTK[recurso]}")
+    if not estado["instalado"]:
+        print("NLTK no está instalado. Por favor instale con: pip install nltk")
+    elif estado["faltantes"]:
+        print("Recursos faltantes. En una máquina con red ejecute:")
+        print(f"    python -m nltk.downloader -d <nltk_data> {' '.join(estado['faltantes'])}")
+        print("y copie la carpeta al servidor (o defina NLTK_DATA).")
+    print(f"Tiempo de verificación: {estado['duracion_ms']:.1f} ms")
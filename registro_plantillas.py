@@ -0,0 +1,90 @@
+"""
+Registro de plantillas compartido por todo el proceso.
+
+Las plantillas .docx se leen una sola vez y se mantienen en memoria junto
+con su hash de contenido. Solo se vuelven a leer si cambia el mtime o el
+tamaño del archivo, de modo que los reruns de Streamlit y las sesiones
+concurrentes no repiten la lectura de disco.
+"""
+import hashlib
+import os
+import threading
+import time
+
+PLANTILLAS = {
+    "planeamiento": "plantilla_planeamiento.docx",
+    "cronograma": "plantilla_cronograma.docx",
+}
+
+
+class RegistroPlantillas:
+    """Caché de plantillas con recarga por mtime/tamaño"""
+
+    def __init__(self, directorio="templates"):
+        self.directorio = directorio
+        self._entradas = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, nombre):
+        """Devuelve la entrada de la plantilla (bytes, hash, ...) o None si no existe"""
+        ruta = os.path.join(self.directorio, PLANTILLAS[nombre])
+        try:
+            st = os.stat(ruta)
+        except OSError:
+            with self._lock:
+                self._entradas.pop(nombre, None)
+            return None
+
+        firma = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entrada = self._entradas.get(nombre)
+            if entrada and entrada["firma"] == firma:
+                entrada["aciertos"] += 1
+                return entrada
+
+            inicio = time.perf_counter()
+            try:
+                with open(ruta, 'rb') as f:
+                    datos = f.read()
+            except OSError:
+                self._entradas.pop(nombre, None)
+                return None
+
+            entrada = {
+                "nombre": nombre,
+                "ruta": ruta,
+                "datos": datos,
+                "hash": hashlib.sha256(datos).hexdigest(),
+                "firma": firma,
+                "carga_ms": (time.perf_counter() - inicio) * 1000,
+                "aciertos": entrada["aciertos"] if entrada else 0,
+                "fallos": (entrada["fallos"] if entrada else 0) + 1,
+            }
+            self._entradas[nombre] = entrada
+            return entrada
+
+    def estadisticas(self):
+        """Resumen por plantilla para mostrar en la interfaz"""
+        with self._lock:
+            return {
+                nombre: {
+                    "hash": e["hash"][:12],
+                    "carga_ms": e["carga_ms"],
+                    "aciertos": e["aciertos"],
+                    "fallos": e["fallos"],
+                }
+                for nombre, e in self._entradas.items()
+            }
+
+
+_registro = None
+_registro_lock = threading.Lock()
+
+
+def obtener_registro(directorio="templates"):
+    """Registro único por proceso"""
+    global _registro
+    with _registro_lock:
+        if _registro is None or _registro.directorio != directorio:
+            _registro = RegistroPlantillas(directorio)
+        return _registro
@@ -1,112 +1,54 @@
 import streamlit as st
-import random
-import re
-from datetime import datetime, timedelta
-from collections import defaultdict
+import pandas as pd
+import altair as alt
+import importlib.util
 import os
-import zipfile
-import io
-import hashlib
-import json
+import sqlite3
+import time
 
-# Importar NLTK como reemplazo de spaCy
-try:
-    import nltk
-    from nltk.tokenize import word_tokenize, sent_tokenize
-    from nltk.corpus import stopwords
-    from nltk.tag import pos_tag
-    from nltk.chunk import ne_chunk
-    from nltk.tree import Tree
-    
-    # Descargar recursos necesarios si no están disponibles
-    nltk_downloads = ['punkt', 'averaged_perceptron_tagger', 'maxent_ne_chunker', 'words', 'stopwords']
-    for resource in nltk_downloads:
-        try:
-            nltk.data.find(f'tokenizers/{resource}')
-        except LookupError:
-            try:
-                nltk.download(resource, quiet=True)
-            except:
-                pass
-                
-except ImportError:
-    st.error("NLTK no está instalado. Por favor instale con: pip install nltk")
-    st.stop()
+# NLTK se carga de forma diferida; aquí solo se verifica (sin red) qué recursos hay
+from recursos_nltk import preparar_recursos_nltk
+from registro_plantillas import obtener_registro
+from cache_artefactos import obtener_cache
+from feriados import importar_calendario, combinar_calendarios, indice_sesiones
+from programa import importar_programa
+from usuarios import obtener_almacen
+from exportar import FORMATOS
+from trabajos import obtener_cola, ERROR, TERMINADO
+from metricas import obtener_registro_tiempos
+from grafo_etapas import REUTILIZADA
+from planificacion import (
+    SESIONES_POR_DEFECTO, dias_semana, ETAPAS_GENERACION, formatear_fecha_es, validar_entradas,
+    huella_entradas, etapas_generacion, ejecutar_generacion, ejecutar_generacion_secciones,
+    crear_archivo_exportado
+)
+
+estado_nltk = preparar_recursos_nltk()
 
-try:
-    from docxtpl import DocxTemplate
-except ImportError:
+# El núcleo importa el motor de render recién al usarlo; aquí solo se comprueba
+# (sin importarlo) que docxtpl esté instalado
+if importlib.util.find_spec("docxtpl") is None:
     st.error("python-docx-template no está instalado. Por favor instale con: pip install python-docx-template")
     st.stop()
 
 # === Sistema de autenticación ===
-def cargar_usuarios():
-    """Carga usuarios desde archivo JSON"""
-    archivo_usuarios = "usuarios.json"
-    
-    # Crear archivo por defecto si no existe
-    if not os.path.exists(archivo_usuarios):
-        usuarios_default = {
-            "admin": {
-                "password": "admin123",
-                "privilegio": "Completo"
-            },
-            "profesor": {
-                "password": "prof456",
-                "privilegio": "Estándar"
-            },
-            "coordinador": {
-                "password": "coord789",
-                "privilegio": "Completo"
-            },
-            "docente1": {
-                "password": "doc123",
-                "privilegio": "Estándar"
-            },
-             "yudith": {
-                "password": "yudith01",
-                "privilegio": "Estándar"
-    }
-        }
-        
-        with open(archivo_usuarios, 'w', encoding='utf-8') as f:
-            json.dump(usuarios_default, f, indent=2, ensure_ascii=False)
-    
-    # Cargar usuarios del archivo
-    try:
-        with open(archivo_usuarios, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except:
-        st.error(f"Error al cargar el archivo {archivo_usuarios}")
-        return {}
-
 def verificar_credenciales(usuario, password):
     """Verifica las credenciales del usuario"""
-    usuarios = cargar_usuarios()
-    if usuario in usuarios:
-        return usuarios[usuario]["password"] == password, usuarios[usuario].get("privilegio", "Estándar")
-    return False, None
+    try:
+        return obtener_almacen().verificar(usuario, password)
+    except (sqlite3.Error, OSError, ValueError):
+        st.error("Error al cargar la base de usuarios")
+        return False, None
 
 def cargar_plantillas():
-    """Carga plantillas desde el subdirectorio templates"""
-    templates_dir = "templates"
-    plantilla_planeamiento = None
-    plantilla_cronograma = None
-    
-    if os.path.exists(templates_dir):
-        # Buscar plantilla de planeamiento
-        planeamiento_path = os.path.join(templates_dir, "plantilla_planeamiento.docx")
-        if os.path.exists(planeamiento_path):
-            with open(planeamiento_path, 'rb') as f:
-                plantilla_planeamiento = f.read()
-        
-        # Buscar plantilla de cronograma
-        cronograma_path = os.path.join(templates_dir, "plantilla_cronograma.docx")
-        if os.path.exists(cronograma_path):
-            with open(cronograma_path, 'rb') as f:
-                plantilla_cronograma = f.read()
-    
-    return plantilla_planeamiento, plantilla_cronograma
+    """Obtiene las plantillas del registro compartido (solo relee si cambiaron en disco)"""
+    registro = obtener_registro("templates")
+    planeamiento = registro.obtener("planeamiento")
+    cronograma = registro.obtener("cronograma")
+    return (
+        planeamiento["datos"] if planeamiento else None,
+        cronograma["datos"] if cronograma else None,
+    )
 
 def mostrar_login():
     """Muestra la pantalla de login"""
@@ -133,343 +75,270 @@ def mostrar_login():
     st.markdown("---")
     st.info("**Contacte al administrador para obtener credenciales de acceso**")
 
-# === Recursos y plantillas Bloom ===
-verbos_bloom = {
-    "Recordar": ["identificar", "definir", "listar"],
-    "Comprender": ["explicar", "resumir", "interpretar"],
-    "Aplicar": ["resolver", "utilizar", "demostrar"],
-    "Analizar": ["comparar", "diferenciar", "analizar"],
-    "Evaluar": ["justificar", "juzgar", "concluir"],
-    "Crear": ["diseñar", "elaborar", "idear"]
-}
+# Segundos entre consultas al estado de un trabajo de generación en curso
+INTERVALO_SONDEO = 0.5
 
-plantillas_actividades = {
-    "Recordar": "Realizar un glosario con términos sobre '{}'.",
-    "Comprender": "Redactar un resumen sobre '{}'.",
-    "Aplicar": "Resolver un ejercicio práctico sobre '{}'.",
-    "Analizar": "Analizar un caso relacionado con '{}'.",
-    "Evaluar": "Justificar la relevancia de '{}'.",
-    "Crear": "Diseñar una solución basada en '{}'."
-}
-
-recursos_bloom = {
-    "Recordar": ["fichas", "presentación", "mapas simples"],
-    "Comprender": ["lectura", "videos", "debate"],
-    "Aplicar": ["simulador", "ejercicios", "laboratorio"],
-    "Analizar": ["casos", "gráficos", "tablas"],
-    "Evaluar": ["rúbricas", "informes", "discusión crítica"],
-    "Crear": ["software", "proyecto", "portafolio"]
-}
-
-evaluacion_bloom = {
-    "Recordar": ["test", "lista de cotejo"],
-    "Comprender": ["resúmenes", "cuestionarios"],
-    "Aplicar": ["demostraciones", "resolución de problemas"],
-    "Analizar": ["ensayos", "mapas comparativos"],
-    "Evaluar": ["defensa oral", "argumentación escrita"],
-    "Crear": ["prototipo", "presentación final"]
-}
-
-inicio = ["Lluvia de ideas", "Pregunta generadora", "Video disparador"]
-desarrollo = ["Actividad práctica", "Discusión guiada", "Resolución de caso"]
-cierre = ["Mapa mental", "Reflexión", "Síntesis grupal"]
-intro = ["Lectura disparadora", "Situación problema", "Contextualización narrativa"]
-retro = ["Recordatorio de clase anterior", "Juego de revisión", "Preguntas orales"]
-
-dias_semana = {
-    "lunes": 0, 
-    "martes": 1, 
-    "miércoles": 2, 
-    "jueves": 3, 
-    "viernes": 4
-}
-
-dias_semana_es = {
-    0: "Lunes",
-    1: "Martes", 
-    2: "Miércoles",
-    3: "Jueves",
-    4: "Viernes",
-    5: "Sábado",
-    6: "Domingo"
-}
-
-meses_es = {
-    1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril",
-    5: "Mayo", 6: "Junio", 7: "Julio", 8: "Agosto",
-    9: "Septiembre", 10: "Octubre", 11: "Noviembre", 12: "Diciembre"
-}
-
-# === Funciones de procesamiento de texto con NLTK ===
-def extraer_conceptos_nltk(texto):
-    """
-    Extrae conceptos clave del texto usando NLTK como reemplazo de spaCy
-    Mejorado para extraer frases completas en lugar de palabras individuales
-    """
-    try:
-        # Dividir en frases
-        frases = [frase.strip() for frase in re.split(r'[,;\n]', texto) if frase.strip()]
-        
-        if frases:
-            # Tomar la primera frase completa como concepto principal
-            concepto_principal = frases[0].strip()
-            # Limpiar puntuación al final
-            concepto_principal = re.sub(r'[\.!?]+$', '', concepto_principal)
-            return [concepto_principal]
-        
-        # Si no hay frases separadas por comas, usar el texto completo
-        concepto_limpio = re.sub(r'[\.!?]+$', '', texto.strip())
-        return [concepto_limpio] if concepto_limpio else [texto.strip()]
-        
-    except Exception as e:
-        # En caso de error, devolver el texto original
-        return [texto.strip()]
+# === APLICACIÓN STREAMLIT ===
+@st.experimental_fragment
+def editor_unidades():
+    """Tabla de unidades (una fila por unidad); se sincroniza con unidades_data en una sola asignación"""
+    if "unidades_tabla" not in st.session_state:
+        # Datos base del editor: fijos mientras se edita (las ediciones quedan en su estado)
+        st.session_state.unidades_tabla = pd.DataFrame(
+            st.session_state.unidades_data, columns=["Título", "Contenidos"]
+        )
+    
+    editada = st.data_editor(
+        st.session_state.unidades_tabla,
+        key="editor_unidades",
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Título": st.column_config.TextColumn("Título", width="medium"),
+            "Contenidos": st.column_config.TextColumn("Contenidos (una línea por ítem)", width="large"),
+        },
+    )
+    
+    # Las filas nuevas llegan con celdas vacías (None)
+    unidades = [
+        (titulo if isinstance(titulo, str) else "", contenidos if isinstance(contenidos, str) else "")
+        for titulo, contenidos in editada.itertuples(index=False)
+    ]
+    if unidades != st.session_state.unidades_data:
+        st.session_state.unidades_data = unidades
+    st.caption(f"{len(unidades)} unidades · Mayús+Enter agrega una línea dentro de la celda")
 
-# === Funciones auxiliares ===
-def genera_dict_unidades(unidades_data):
-    """Genera diccionario de unidades desde los datos de entrada"""
-    unidades = {}
-    for i, (titulo, contenidos) in enumerate(unidades_data):
-        if not titulo.strip():
-            titulo = f"Unidad {i+1}"
-        
-        if not contenidos.strip():
-            continue
-            
-        lineas = [fr.strip() for fr in contenidos.split('\n') if fr.strip()]
-        if len(lineas) == 1:
-            # Split by sentence if it's a single line of text
-            frases = [fr.strip() for fr in re.split(r'(?<=[.!?])\s+', lineas[0]) if fr.strip()]
-        else:
-            # Treat each line as a "phrase" if multiple lines are entered
-            frases = lineas
-        unidades[titulo] = frases
-    return unidades
+def mostrar_progreso(trabajo):
+    """Progreso de un trabajo de generación en curso, etapa por etapa"""
+    etapas = trabajo["etapas"]
+    completadas = set(trabajo["completadas"])
+    pendientes = [etapa for etapa in etapas if etapa not in completadas]
+    texto = (
+        f"Generando: {ETAPAS_GENERACION[pendientes[0]]}..." if pendientes
+        else "Finalizando..."
+    )
+    st.progress(len(completadas) / max(len(etapas), 1), text=texto)
+    st.caption(" · ".join(
+        f"{'✅' if etapa in completadas else '⏳'} {ETAPAS_GENERACION[etapa]}" for etapa in etapas
+    ))
 
-def ajustar_unidades_para_sesiones(unidades_originales, total_sesiones_normales=10):
+def mostrar_panel_metricas(tiempos_ultima=None, etapas_ultima=None):
     """
-    Ajusta las unidades para que se adapten al número de sesiones disponibles
+    Panel lateral (usuarios Completo) con los tiempos por etapa del proceso y
+    de la última generación, y qué etapas de esta se reutilizaron.
     """
-    n_original = len(unidades_originales)
-    
-    # Crear lista de bloques de sesión
-    lista_bloques_sesion = []
-    for i, (titulo, frases) in enumerate(unidades_originales.items()):
-        lista_bloques_sesion.append({
-            "titulo": titulo,
-            "frases": frases,
-            "longitud": len(frases)
-        })
-    
-    # Lógica de ajuste
-    if n_original < total_sesiones_normales:
-        # Fraccionar unidades
-        sesiones_por_unidad_calc = [total_sesiones_normales // n_original] * n_original
-        for i in range(total_sesiones_normales % n_original):
-            sesiones_por_unidad_calc[i] += 1
-        
-        expanded_bloques = []
-        for idx, bloque_original in enumerate(lista_bloques_sesion):
-            cantidad_sesiones_para_unidad = sesiones_por_unidad_calc[idx]
-            frases_unidad = bloque_original["frases"]
-            
-            por_sesion = max(1, len(frases_unidad) // cantidad_sesiones_para_unidad) if cantidad_sesiones_para_unidad > 0 else 1
-            
-            for s in range(cantidad_sesiones_para_unidad):
-                fragmento_frases = frases_unidad[s*por_sesion:(s+1)*por_sesion]
-                
-                if not fragmento_frases:
-                    fragmento_frases = [frases_unidad[-1]] if frases_unidad else [f"Contenido de {bloque_original['titulo']}"]
-                
-                expanded_bloques.append({
-                    "titulo": f"{bloque_original['titulo']} (Parte {s+1}/{cantidad_sesiones_para_unidad})" if cantidad_sesiones_para_unidad > 1 else bloque_original['titulo'],
-                    "frases": fragmento_frases,
-                    "longitud": len(fragmento_frases)
-                })
-        lista_bloques_sesion = expanded_bloques
-        
-    elif n_original > total_sesiones_normales:
-        # Fusionar unidades
-        num_fusiones_necesarias = n_original - total_sesiones_normales
-        
-        for _ in range(num_fusiones_necesarias):
-            if len(lista_bloques_sesion) <= total_sesiones_normales:
-                break
-            
-            min_len_combined = float('inf')
-            idx_to_merge = -1
-            
-            for i in range(len(lista_bloques_sesion) - 1):
-                len_combined = lista_bloques_sesion[i]["longitud"] + lista_bloques_sesion[i+1]["longitud"]
-                if len_combined < min_len_combined:
-                    min_len_combined = len_combined
-                    idx_to_merge = i
-            
-            if idx_to_merge != -1:
-                unidad1 = lista_bloques_sesion[idx_to_merge]
-                unidad2 = lista_bloques_sesion[idx_to_merge + 1]
-                
-                nuevo_titulo = f"{unidad1['titulo']} - {unidad2['titulo']}"
-                nuevo_contenido = unidad1['frases'] + unidad2['frases']
-                nueva_longitud = len(nuevo_contenido)
-                
-                lista_bloques_sesion[idx_to_merge] = {
-                    "titulo": nuevo_titulo,
-                    "frases": nuevo_contenido,
-                    "longitud": nueva_longitud
+    resumen = obtener_registro_tiempos().resumen()
+    with st.sidebar.expander("📈 Tiempos por etapa"):
+        if not resumen:
+            st.caption("Todavía no hay generaciones en este proceso")
+            return
+        if tiempos_ultima:
+            st.caption(f"Última generación: {tiempos_ultima.get('total', 0) * 1000:.0f} ms")
+        if etapas_ultima:
+            reutilizadas = [etapa for etapa, estado in etapas_ultima.items() if estado == REUTILIZADA]
+            recalculadas = [etapa for etapa, estado in etapas_ultima.items() if estado != REUTILIZADA]
+            st.caption(f"♻️ Reutilizadas: {', '.join(reutilizadas) or 'ninguna'}")
+            st.caption(f"🔄 Recalculadas: {', '.join(recalculadas) or 'ninguna'}")
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "Etapa": etapa,
+                    "Última (ms)": round(tiempos_ultima[etapa] * 1000, 1) if tiempos_ultima and etapa in tiempos_ultima else None,
+                    "N": datos["cantidad"],
+                    "p50 (ms)": round(datos["p50"] * 1000, 1),
+                    "p95 (ms)": round(datos["p95"] * 1000, 1),
+                    "Máx (ms)": round(datos["maximo"] * 1000, 1)
                 }
-                lista_bloques_sesion.pop(idx_to_merge + 1)
-            else:
-                break
+                for etapa, datos in resumen.items()
+            ]),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption(f"Proceso {os.getpid()}; los render en paralelo cuentan desde el inicio del lote")
+
+def mostrar_resultados_secciones(resultado):
+    """Resumen y paquete de todas las secciones; el detalle se ve de a una sección"""
+    st.success(f"¡{len(resultado['secciones'])} secciones generadas a partir del mismo programa!")
+    for error in resultado["errores_documentos"]:
+        st.error(error)
     
-    return lista_bloques_sesion
+    st.dataframe(
+        resultado["resumen_secciones"].rename_axis("Sección").rename(columns={
+            "total_sesiones": "Total sesiones",
+            "sesiones_normales": "Clases normales",
+            "pruebas": "Pruebas",
+            "feriados": "En feriado",
+        }),
+        use_container_width=True
+    )
+    st.download_button(
+        label="📥 Descargar todas las secciones (ZIP con una carpeta por sección)",
+        data=resultado["zip_paquete"].leer(),
+        file_name=resultado["zip_filename"],
+        mime="application/zip",
+        use_container_width=True
+    )
+    
+    secciones = {seccion["nombre"]: seccion for seccion in resultado["secciones"]}
+    nombre = st.selectbox("Ver sección", list(secciones), key="seccion_visible")
+    st.markdown("---")
+    mostrar_resultados(secciones[nombre])
 
-def generar_planificacion_calendario(fecha_inicio_dt, dia_clase_num, fecha_examen_final, feriados, pruebas, retro_sesiones, revision_sesiones):
-    """Genera la planificación del calendario"""
-    plan = []
-    sesion_num = 1
-    while sesion_num <= 17:
-        if sesion_num == 17:
-            dia_evento = fecha_examen_final
-            estado = "Examen final"
-            en_feriado = dia_evento in feriados
-        else:
-            fecha_base = fecha_inicio_dt + timedelta(weeks=sesion_num - 1)
-            dia_evento = fecha_base + timedelta(days=(dia_clase_num - fecha_base.weekday()) % 7)
-            en_feriado = dia_evento in feriados
-            if sesion_num in pruebas:
-                estado = "Prueba parcial"
-            elif sesion_num in retro_sesiones:
-                estado = "Retroalimentación"
-            elif sesion_num in revision_sesiones:
-                estado = "Revisión de prueba"
+def mostrar_resultados(resultado):
+    """Dibuja la planificación generada a partir del resultado guardado en la sesión"""
+    plan = resultado["plan"]
+    feriados = resultado["feriados"]
+    metricas = resultado["metricas"]
+    
+    # Mostrar resultado en la interfaz
+    st.success("¡Planificación generada exitosamente!")
+    
+    for advertencia in resultado["advertencias"]:
+        st.warning(advertencia)
+    
+    for error in resultado["errores_documentos"]:
+        st.error(error)
+    
+    # Mostrar planificación en expander
+    with st.expander("📋 Ver Planificación Completa", expanded=True):
+        st.text(resultado["out"])
+    
+    # Botones de descarga según privilegio
+    if resultado["zip_paquete"]:
+        st.download_button(
+            label="📥 Descargar Archivos Completos (ZIP con Word, TXT, JSON, CSV e iCalendar)",
+            data=resultado["zip_paquete"].leer(),
+            file_name=resultado["zip_filename"],
+            mime="application/zip",
+            use_container_width=True
+        )
+    
+    # Botón para descargar solo TXT (disponible para todos)
+    label_txt = "📄 Descargar Planificación (TXT)"
+    if st.session_state.privilegio == "Estándar":
+        label_txt = "📄 Descargar Planificación (Solo TXT - Versión Estándar)"
+    
+    st.download_button(
+        label=label_txt,
+        data=resultado["txt_data"],
+        file_name=resultado["txt_filename"],
+        mime="text/plain",
+        use_container_width=True
+    )
+    
+    # Otros formatos, generados al pedirlos a partir del mismo modelo del plan
+    if st.session_state.privilegio == "Completo":
+        formatos = st.multiselect(
+            "Otros formatos de exportación",
+            [formato for formato in FORMATOS if formato != "txt"],
+            format_func=lambda formato: FORMATOS[formato].etiqueta,
+            key="formatos_exportacion"
+        )
+        for formato in formatos:
+            datos, nombre = crear_archivo_exportado(plan, formato)
+            st.download_button(
+                label=f"📄 Descargar {FORMATOS[formato].etiqueta}",
+                data=datos,
+                file_name=nombre,
+                mime=FORMATOS[formato].mime,
+                use_container_width=True,
+                key=f"descarga_{formato}"
+            )
+    
+    # Mostrar resumen de la planificación
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Total de Sesiones", metricas["total_sesiones"])
+    
+    with col2:
+        st.metric("Sesiones de Clase", metricas["sesiones_normales"])
+    
+    with col3:
+        st.metric("Pruebas Parciales", metricas["pruebas"])
+    
+    with col4:
+        st.metric("Días Feriados", metricas["feriados"])
+    
+    # Distribución por niveles de Bloom (un solo gráfico)
+    st.subheader("📊 Distribución por Niveles de Bloom")
+    
+    distribucion = resultado["distribucion_bloom"]
+    if len(distribucion):
+        datos_bloom = distribucion.rename_axis("Nivel").reset_index(name="Sesiones").assign(
+            Porcentaje=(distribucion / distribucion.sum()).to_numpy()
+        )
+        # sort=None mantiene el orden de la taxonomía en el eje
+        st.altair_chart(
+            alt.Chart(datos_bloom).mark_bar().encode(
+                x=alt.X("Nivel:N", sort=None),
+                y="Sesiones:Q",
+                tooltip=["Nivel", "Sesiones", alt.Tooltip("Porcentaje:Q", format=".1%")]
+            ),
+            use_container_width=True
+        )
+    
+    # Mostrar calendario visual
+    st.subheader("📅 Calendario de Sesiones")
+    
+    # Estilos condicionales: una matriz de CSS armada de una vez con los colores de cada fila
+    df_calendar = resultado["df_calendar"]
+    estilos_filas = ("background-color: " + resultado["colores_calendar"]).where(
+        resultado["colores_calendar"] != "", ""
+    )
+    st.dataframe(
+        df_calendar.style.apply(
+            lambda tabla: pd.DataFrame(
+                {columna: estilos_filas.to_numpy() for columna in tabla.columns}, index=tabla.index
+            ),
+            axis=None
+        ),
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    # Leyenda mejorada
+    st.caption("🟨 Pruebas parciales | 🟥 Examen final | 🟩 Retroalimentación | 🟦 Revisión | 🟪 Feriados")
+    
+    # Mostrar detalles de pruebas y feriados
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📝 Calendario de Evaluaciones")
+        evaluaciones = df_calendar.index[df_calendar["Evento"].isin(["Prueba parcial", "Examen final"])]
+        for sesion in (plan.sesiones[i] for i in evaluaciones):
+            if sesion.en_feriado:
+                st.warning(f"**Sesión {sesion.numero}** - {sesion.evento}: {sesion.fecha_es} ⚠️ FERIADO")
             else:
-                estado = "Clase normal"
-        plan.append({
-            "Sesion": sesion_num,
-            "Fecha": dia_evento,
-            "Evento": estado,
-            "En_feriado": en_feriado
-        })
-        sesion_num += 1
-    return plan
-
-def formatear_fecha_es(fecha):
-    """Formatea fecha en español"""
-    # Manejar diferentes tipos de entrada
-    if isinstance(fecha, tuple):
-        fecha = fecha[0] if fecha else None
-    
-    if not fecha or not hasattr(fecha, 'weekday'):
-        return "Fecha inválida"
-    
-    dia_sem = dias_semana_es[fecha.weekday()]
-    mes = meses_es[fecha.month]
-    return f"{dia_sem}, {fecha.day} de {mes} de {fecha.year}"
-
-def crear_archivo_zip(context, context_cronograma, plantilla_planeamiento, plantilla_cronograma, out_text, unidades_originales, configuracion):
-    """Crea un archivo ZIP con todos los documentos generados"""
-    zip_buffer = io.BytesIO()
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        try:
-            # Generar archivo de Planeamiento
-            if plantilla_planeamiento:
-                doc_planeamiento = DocxTemplate(io.BytesIO(plantilla_planeamiento))
-                doc_planeamiento.render(context)
-                docx_buffer = io.BytesIO()
-                doc_planeamiento.save(docx_buffer)
-                zip_file.writestr(f"Planeamiento_{timestamp}.docx", docx_buffer.getvalue())
-            
-            # Generar archivo de Cronograma
-            if plantilla_cronograma:
-                doc_cronograma = DocxTemplate(io.BytesIO(plantilla_cronograma))
-                doc_cronograma.render(context_cronograma)
-                cronograma_buffer = io.BytesIO()
-                doc_cronograma.save(cronograma_buffer)
-                zip_file.writestr(f"Cronograma_{timestamp}.docx", cronograma_buffer.getvalue())
-            
-            # Generar archivo TXT
-            txt_content = f"PLANIFICACIÓN DOCENTE - GENERADA EL {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n"
-            txt_content += "=" * 80 + "\n"
-            txt_content += f"PERÍODO: {configuracion['fecha_inicio']} al {configuracion['fecha_fin']}\n"
-            txt_content += f"DÍA DE CLASE: {configuracion['dia_clase'].capitalize()}\n"
-            
-            # Manejar feriados correctamente
-            if configuracion['feriados']:
-                feriados_str = []
-                for f in configuracion['feriados']:
-                    if hasattr(f, 'strftime'):
-                        feriados_str.append(f.strftime('%Y-%m-%d'))
-                    else:
-                        feriados_str.append(str(f))
-                txt_content += f"FERIADOS: {', '.join(feriados_str)}\n"
-            
-            if configuracion['pruebas']:
-                txt_content += f"PRUEBAS EN SESIONES: {', '.join(map(str, configuracion['pruebas']))}\n"
-            txt_content += f"EXAMEN FINAL: {configuracion['fecha_examen_final']}\n"
-            txt_content += "\n" + "=" * 80 + "\n"
-            txt_content += "UNIDADES PROGRAMADAS:\n"
-            txt_content += "-" * 40 + "\n"
-            for i, (titulo, contenidos) in enumerate(unidades_originales.items(), 1):
-                txt_content += f"{i}. {titulo}\n"
-                for contenido in contenidos:
-                    txt_content += f"   - {contenido}\n"
-                txt_content += "\n"
-            txt_content += "=" * 80 + "\n"
-            txt_content += out_text
-            txt_content += "\n" + "=" * 80 + "\n"
-            txt_content += "ARCHIVOS GENERADOS:\n"
-            txt_content += f"- Planeamiento: Planeamiento_{timestamp}.docx\n"
-            txt_content += f"- Cronograma: Cronograma_{timestamp}.docx\n"
-            txt_content += f"- Resumen TXT: Planificacion_{timestamp}.txt\n"
-            
-            zip_file.writestr(f"Planificacion_{timestamp}.txt", txt_content.encode('utf-8'))
-            
-        except Exception as e:
-            st.error(f"Error al generar los archivos: {str(e)}")
-            return None
+                st.info(f"**Sesión {sesion.numero}** - {sesion.evento}: {sesion.fecha_es}")
     
-    zip_buffer.seek(0)
-    return zip_buffer
-
-def crear_archivo_txt(out_text, unidades_originales, configuracion):
-    """Crea solo el archivo TXT para usuarios estándar"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    txt_content = f"PLANIFICACIÓN DOCENTE - GENERADA EL {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n"
-    txt_content += "=" * 80 + "\n"
-    txt_content += f"PERÍODO: {configuracion['fecha_inicio']} al {configuracion['fecha_fin']}\n"
-    txt_content += f"DÍA DE CLASE: {configuracion['dia_clase'].capitalize()}\n"
-    
-    # Manejar feriados correctamente
-    if configuracion['feriados']:
-        feriados_str = []
-        for f in configuracion['feriados']:
-            if hasattr(f, 'strftime'):
-                feriados_str.append(f.strftime('%Y-%m-%d'))
+    with col2:
+        if feriados:
+            st.subheader("🏖️ Feriados Programados")
+            nombres_feriados = resultado.get("nombres_feriados", {})
+            sesion_por_fecha = indice_sesiones(plan.sesiones)
+            feriados_con_clases = 0
+            for i, feriado in enumerate(feriados, 1):
+                fecha_es = formatear_fecha_es(feriado)
+                nombre = nombres_feriados.get(feriado) or f"Feriado {i}"
+                sesion_coincide = sesion_por_fecha.get(feriado)
+                if sesion_coincide:
+                    feriados_con_clases += 1
+                    st.warning(f"**{nombre}**: {fecha_es} - ⚠️ Coincide con Sesión {sesion_coincide.numero}")
+                else:
+                    st.success(f"**{nombre}**: {fecha_es} - ✅ No afecta clases")
+            
+            # Mostrar resumen de impacto
+            if feriados_con_clases > 0:
+                st.warning(f"⚠️ **{feriados_con_clases}** feriado(s) coinciden con clases programadas")
             else:
-                feriados_str.append(str(f))
-        txt_content += f"FERIADOS: {', '.join(feriados_str)}\n"
-    
-    if configuracion['pruebas']:
-        txt_content += f"PRUEBAS EN SESIONES: {', '.join(map(str, configuracion['pruebas']))}\n"
-    txt_content += f"EXAMEN FINAL: {configuracion['fecha_examen_final']}\n"
-    txt_content += "\n" + "=" * 80 + "\n"
-    txt_content += "UNIDADES PROGRAMADAS:\n"
-    txt_content += "-" * 40 + "\n"
-    for i, (titulo, contenidos) in enumerate(unidades_originales.items(), 1):
-        txt_content += f"{i}. {titulo}\n"
-        for contenido in contenidos:
-            txt_content += f"   - {contenido}\n"
-        txt_content += "\n"
-    txt_content += "=" * 80 + "\n"
-    txt_content += out_text
-    
-    return txt_content.encode('utf-8'), f"Planificacion_{timestamp}.txt"
+                st.success("✅ Ningún feriado afecta las clases programadas")
+                
+        else:
+            st.subheader("🏖️ Feriados")
+            st.info("No se han programado feriados")
 
-# === APLICACIÓN STREAMLIT ===
 def main():
     st.set_page_config(
         page_title="Planificador de Clases (Bloom)",
@@ -509,20 +378,27 @@ def main():
     with st.sidebar:
         st.header("⚙️ Configuración")
         
-        # Número de unidades
-        num_unidades = st.number_input(
-            "¿Cuántas unidades?",
-            min_value=1,
-            max_value=20,
-            value=len(st.session_state.unidades_data),
-            step=1
+        # Programa de la asignatura: reemplaza las unidades cargadas a mano
+        archivo_programa = st.file_uploader(
+            "Importar programa (.docx, .md o .txt)",
+            type=["docx", "md", "txt"],
+            key="programa_archivo"
         )
-        
-        # Ajustar la lista de unidades según el número seleccionado
-        while len(st.session_state.unidades_data) < num_unidades:
-            st.session_state.unidades_data.append((f"Unidad {len(st.session_state.unidades_data)+1}", ""))
-        while len(st.session_state.unidades_data) > num_unidades:
-            st.session_state.unidades_data.pop()
+        # El archivo sigue en el widget en cada rerun: se importa una sola vez
+        if archivo_programa is not None and st.session_state.get("programa_importado") != archivo_programa.file_id:
+            st.session_state.programa_importado = archivo_programa.file_id
+            try:
+                unidades_importadas, resumen_programa = importar_programa(archivo_programa, archivo_programa.name)
+            except ValueError as e:
+                st.error(f"No se pudo leer {archivo_programa.name}: {e}")
+            else:
+                st.session_state.unidades_data = unidades_importadas
+                # El editor se vuelve a armar desde las unidades importadas
+                for clave in ("unidades_tabla", "editor_unidades"):
+                    st.session_state.pop(clave, None)
+                st.success(
+                    f"✅ {resumen_programa['unidades']} unidades y {resumen_programa['items']} ítems importados"
+                )
         
         st.markdown("---")
         
@@ -537,6 +413,37 @@ def main():
         
         dia_clase = st.selectbox("Día de clase", list(dias_semana.keys()))
         
+        with st.expander("⚙️ Opciones del calendario"):
+            total_sesiones = st.number_input(
+                "Sesiones de clase (sin contar el examen final)",
+                min_value=4, max_value=60, value=SESIONES_POR_DEFECTO, step=1
+            )
+            dias_extra = st.multiselect(
+                "Otros días de clase en la semana",
+                list(dias_semana.keys())
+            )
+            semanas_omitidas = st.multiselect(
+                "Semanas sin clases (contadas desde la fecha de inicio)",
+                options=list(range(1, int(total_sesiones) + 1))
+            )
+            reagendar_feriados = st.checkbox(
+                "Mover al siguiente día de clase las sesiones que caen en feriado",
+                value=True
+            )
+            semilla_texto = st.text_input(
+                "Semilla de generación (opcional)",
+                help="Vacío: se deriva del programa, así el mismo programa da siempre los mismos contenidos aunque cambien las fechas o los feriados"
+            ).strip()
+        opciones_calendario = {
+            "total_sesiones": int(total_sesiones),
+            "dias_extra": dias_extra,
+            "semanas_omitidas": sorted(semanas_omitidas),
+            "reagendar_feriados": reagendar_feriados
+        }
+        semilla = int(semilla_texto) if semilla_texto.isdigit() else None
+        if semilla_texto and semilla is None:
+            st.warning("La semilla debe ser un número entero; se usará la derivada del programa")
+        
         # Fechas especiales
         st.subheader("📋 Fechas Especiales")
         
@@ -552,15 +459,39 @@ def main():
         if not isinstance(feriados_input, list):
             feriados_input = [feriados_input] if feriados_input else []
         
+        # Calendarios nacionales/institucionales importados en bloque
+        archivos_feriados = st.file_uploader(
+            "Importar calendario de feriados (.ics o .csv)",
+            type=["ics", "csv"],
+            accept_multiple_files=True,
+            key="feriados_archivos"
+        )
+        # Los calendarios leídos quedan en la sesión mientras no cambien los
+        # archivos: cada rerun solo compara sus ids, sin releer ni rehashear
+        clave_archivos = tuple(archivo.file_id for archivo in archivos_feriados or [])
+        importados = st.session_state.get("feriados_importados")
+        if importados is None or importados["clave"] != clave_archivos:
+            importados = {"clave": clave_archivos, "calendarios": [], "errores": []}
+            for archivo in archivos_feriados or []:
+                try:
+                    importados["calendarios"].append(importar_calendario(archivo.getvalue(), archivo.name))
+                except ValueError as e:
+                    importados["errores"].append(f"No se pudo leer {archivo.name}: {e}")
+            st.session_state.feriados_importados = importados
+        for error in importados["errores"]:
+            st.error(error)
+        calendarios_feriados = importados["calendarios"]
+        
         # Selección de pruebas parciales (exactamente 2)
         st.write("**Pruebas Parciales (seleccione 2 sesiones):**")
+        sesiones_prueba = list(range(1, int(total_sesiones) + 1))
         prueba1 = st.selectbox("Primera prueba parcial (sesión)", 
-                               options=list(range(1, 17)), 
-                               index=4,  # sesión 5 por defecto
+                               options=sesiones_prueba, 
+                               index=min(4, len(sesiones_prueba) - 1),  # sesión 5 por defecto
                                key="prueba1")
         prueba2 = st.selectbox("Segunda prueba parcial (sesión)", 
-                               options=list(range(1, 17)), 
-                               index=9,  # sesión 10 por defecto
+                               options=sesiones_prueba, 
+                               index=min(9, len(sesiones_prueba) - 1),  # sesión 10 por defecto
                                key="prueba2")
         
         # Validar que las pruebas no sean iguales
@@ -569,6 +500,44 @@ def main():
         
         fecha_examen_final = st.date_input("Fecha del examen final")
         
+        # Varias secciones del mismo curso: un calendario por fila, el programa se procesa una vez
+        with st.expander("👥 Secciones (mismo programa)"):
+            if "secciones_tabla" not in st.session_state:
+                st.session_state.secciones_tabla = pd.DataFrame({
+                    "Sección": pd.Series(dtype="object"),
+                    "Día": pd.Series(dtype="object"),
+                    "Prueba 1": pd.Series(dtype="Int64"),
+                    "Prueba 2": pd.Series(dtype="Int64"),
+                    "Examen final": pd.Series(dtype="datetime64[ns]"),
+                })
+            tabla_secciones = st.data_editor(
+                st.session_state.secciones_tabla,
+                num_rows="dynamic",
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Día": st.column_config.SelectboxColumn(options=list(dias_semana.keys())),
+                    "Prueba 1": st.column_config.NumberColumn(min_value=1, step=1),
+                    "Prueba 2": st.column_config.NumberColumn(min_value=1, step=1),
+                    "Examen final": st.column_config.DateColumn(format="DD/MM/YYYY"),
+                },
+                key="editor_secciones"
+            )
+            st.caption("Las celdas vacías toman el valor del curso. Sin filas se genera un solo plan.")
+        # Cada fila con nombre es una sección; lo que falta se completa con los datos del curso
+        secciones = []
+        for fila in tabla_secciones.itertuples(index=False):
+            nombre = str(fila[0]).strip() if pd.notna(fila[0]) else ""
+            if not nombre:
+                continue
+            secciones.append({
+                "nombre": nombre,
+                "dia_clase": fila[1] if pd.notna(fila[1]) else dia_clase,
+                "prueba1": int(fila[2]) if pd.notna(fila[2]) else prueba1,
+                "prueba2": int(fila[3]) if pd.notna(fila[3]) else prueba2,
+                "fecha_examen_final": pd.Timestamp(fila[4]).date() if pd.notna(fila[4]) else fecha_examen_final,
+            })
+        
         st.markdown("---")
         
         # Estado de plantillas
@@ -585,429 +554,173 @@ def main():
         
         if not plantilla_planeamiento and not plantilla_cronograma:
             st.info("💡 Coloque las plantillas en la carpeta 'templates/'")
+
+        # Estadísticas del registro de plantillas (compartido entre sesiones)
+        for nombre, stats in obtener_registro("templates").estadisticas().items():
+            st.caption(
+                f"{nombre.capitalize()}: {stats['carga_ms']:.1f} ms de carga · "
+                f"{stats['aciertos']} aciertos / {stats['fallos']} lecturas · "
+                f"hash {stats['hash']}"
+            )
+        if st.session_state.privilegio == "Completo":
+            # Caché de artefactos (compartida entre sesiones y procesos del servidor)
+            cache = obtener_cache().estadisticas()
+            st.caption(
+                f"Caché de documentos: {cache['aciertos']} aciertos / {cache['fallos']} fallos · "
+                f"{cache['entradas']} archivos, {cache['bytes'] / 1024 / 1024:.1f} de "
+                f"{cache['max_bytes'] / 1024 / 1024:.0f} MB · {cache['desalojos']} desalojos"
+            )
+
+        # Estado de recursos NLTK (verificados sin red al arrancar)
+        listos = len(estado_nltk["recursos"]) - len(estado_nltk["faltantes"])
+        if not estado_nltk["instalado"]:
+            st.warning("⚠️ NLTK no está instalado")
+        elif estado_nltk["faltantes"]:
+            st.warning(f"⚠️ Recursos NLTK: {listos}/{len(estado_nltk['recursos'])} disponibles")
+        st.caption(
+            f"NLTK verificado por {estado_nltk['origen']} "
+            f"en {estado_nltk['duracion_ms']:.1f} ms"
+        )
     
     # Contenido principal
     st.header("📖 Unidades del Curso")
     
-    # Editor de unidades
-    for i in range(num_unidades):
-        with st.expander(f"Unidad {i+1}", expanded=True):
-            col1, col2 = st.columns([1, 2])
-            
-            with col1:
-                titulo = st.text_input(
-                    "Título de la unidad",
-                    value=st.session_state.unidades_data[i][0],
-                    key=f"titulo_{i}"
-                )
-            
-            with col2:
-                contenidos = st.text_area(
-                    "Contenidos (una línea por ítem)",
-                    value=st.session_state.unidades_data[i][1],
-                    height=100,
-                    key=f"contenidos_{i}"
-                )
-            
-            # Actualizar session state
-            st.session_state.unidades_data[i] = (titulo, contenidos)
+    # Editor de unidades (fragmento: editar la tabla no vuelve a ejecutar toda la app)
+    editor_unidades()
     
     st.markdown("---")
     
+    # Procesar fechas especiales - Manejar múltiples feriados correctamente
+    feriados = []
+    if feriados_input:
+        if isinstance(feriados_input, (list, tuple)):
+            # Filtrar y procesar cada fecha
+            for fecha in feriados_input:
+                if isinstance(fecha, tuple):
+                    # Si es tupla, tomar el primer elemento válido
+                    fecha = fecha[0] if fecha and len(fecha) > 0 else None
+                if fecha and hasattr(fecha, 'strftime'):
+                    feriados.append(fecha)
+        else:
+            # Fecha única
+            if hasattr(feriados_input, 'strftime'):
+                feriados = [feriados_input]
+    
+    # Índice de feriados (importados + manuales), guardado en la sesión mientras
+    # no cambien los archivos ni las fechas manuales; al plan solo pasan los del período
+    clave_indice = (clave_archivos, tuple(sorted(set(feriados))))
+    indice_feriados = st.session_state.get("indice_feriados")
+    if indice_feriados is None or indice_feriados["clave"] != clave_indice:
+        indice_feriados = {"clave": clave_indice, "calendario": combinar_calendarios(calendarios_feriados, feriados)}
+        st.session_state.indice_feriados = indice_feriados
+    calendario_feriados = indice_feriados["calendario"]
+    fin_periodo = max(fecha_fin, fecha_examen_final)
+    ignorados = sorted(fecha for fecha in set(feriados) if not fecha_inicio <= fecha <= fin_periodo)
+    if ignorados:
+        st.warning(
+            "⚠️ Feriados fuera del período del curso (se ignoran): "
+            + ", ".join(formatear_fecha_es(fecha) for fecha in ignorados)
+        )
+    feriados = calendario_feriados.en_rango(fecha_inicio, fin_periodo)
+    if calendarios_feriados:
+        with st.sidebar:
+            st.caption(
+                f"📅 {len(calendario_feriados)} feriados cargados, "
+                f"{len(feriados)} dentro del período del curso"
+            )
+    
+    # Huella de todas las entradas: si no cambia, el resultado guardado sigue siendo válido
+    huella = huella_entradas(
+        st.session_state.unidades_data, fecha_inicio, fecha_fin, dia_clase,
+        feriados, prueba1, prueba2, fecha_examen_final,
+        st.session_state.privilegio, obtener_registro("templates").estadisticas(),
+        opciones_calendario, semilla, secciones
+    )
+    
     # Botón para generar planificación
     if st.button("🚀 Generar Planificación", type="primary", use_container_width=True):
         
-        # Validaciones
-        errores = []
-        
-        if fecha_inicio >= fecha_fin:
-            errores.append("La fecha de inicio debe ser anterior a la fecha de fin")
-        
-        if fecha_examen_final <= fecha_fin:
-            errores.append("La fecha del examen final debe ser posterior a la fecha de fin del curso")
-        
-        if prueba1 == prueba2:
-            errores.append("Las dos pruebas parciales deben ser en sesiones diferentes")
-        
-        # Verificar que hay contenido en las unidades
-        unidades_vacias = 0
-        for titulo, contenidos in st.session_state.unidades_data:
-            if not contenidos.strip():
-                unidades_vacias += 1
-        
-        if unidades_vacias == len(st.session_state.unidades_data):
-            errores.append("Debe ingresar contenido en al menos una unidad")
+        # Validaciones (de cada sección, si las hay)
+        errores = validar_entradas(
+            st.session_state.unidades_data, fecha_inicio, fecha_fin,
+            fecha_examen_final, prueba1, prueba2, opciones_calendario["total_sesiones"],
+            dia_clase, feriados, opciones_calendario
+        ) if not secciones else []
+        for seccion in secciones:
+            errores += [
+                f"{seccion['nombre']}: {error}" for error in validar_entradas(
+                    st.session_state.unidades_data, fecha_inicio, fecha_fin, seccion["fecha_examen_final"],
+                    seccion["prueba1"], seccion["prueba2"], opciones_calendario["total_sesiones"],
+                    seccion["dia_clase"], feriados, opciones_calendario
+                )
+            ]
+        if len({seccion["nombre"] for seccion in secciones}) != len(secciones):
+            errores.append("Los nombres de las secciones deben ser distintos")
         
         if errores:
             for error in errores:
                 st.error(error)
             return
         
-        # Procesar fechas especiales - Manejar múltiples feriados correctamente
-        feriados = []
-        if feriados_input:
-            if isinstance(feriados_input, (list, tuple)):
-                # Filtrar y procesar cada fecha
-                for fecha in feriados_input:
-                    if isinstance(fecha, tuple):
-                        # Si es tupla, tomar el primer elemento válido
-                        fecha = fecha[0] if fecha and len(fecha) > 0 else None
-                    if fecha and hasattr(fecha, 'strftime'):
-                        feriados.append(fecha)
-            else:
-                # Fecha única
-                if hasattr(feriados_input, 'strftime'):
-                    feriados = [feriados_input]
-        
-        # Usar las pruebas seleccionadas
-        pruebas = [prueba1, prueba2]
-        retro_sesiones = [p - 1 for p in pruebas if p > 1]
-        revision_sesiones = [p + 1 for p in pruebas if p < 16]
-        
-        # Generar planificación
-        with st.spinner("Generando planificación..."):
-            
-            # Generar diccionario de unidades
-            unidades_originales = genera_dict_unidades(st.session_state.unidades_data)
-            
-            # Calcular sesiones normales disponibles
-            sesiones_especiales = len(pruebas) + len(retro_sesiones) + len(revision_sesiones)
-            sesiones_normales_disponibles = 16 - sesiones_especiales  # 16 porque la 17 es examen final
-            
-            # Ajustar unidades para sesiones normales disponibles
-            lista_bloques_sesion = ajustar_unidades_para_sesiones(unidades_originales, sesiones_normales_disponibles)
-            
-            # Procesar fragmentos para sesiones normales
-            fragmentos_sesiones = []
-            niveles = list(verbos_bloom.keys())
-            nivel_idx = 0
-            
-            for idx, bloque_sesion in enumerate(lista_bloques_sesion):
-                unidad_titulo = bloque_sesion["titulo"]
-                frases = bloque_sesion["frases"]
-                
-                if not frases:
-                    continue
-                
-                fragmento = " ".join(frases)
-                
-                # Procesamiento con NLTK mejorado
-                conceptos = extraer_conceptos_nltk(fragmento)
-                concepto = conceptos[0] if conceptos else fragmento.strip()
-                
-                nivel = niveles[nivel_idx % len(niveles)]
-                verbo = random.choice(verbos_bloom[nivel])
-                actividad = plantillas_actividades[nivel].format(concepto)
-                
-                fragmentos_sesiones.append({
-                    "Unidad": unidad_titulo,
-                    "Contenido": fragmento,
-                    "Concepto": concepto,
-                    "Nivel": nivel,
-                    "Verbo": verbo,
-                    "Actividad": actividad,
-                    "Nivel_idx": nivel_idx
-                })
-                nivel_idx += 1
-            
-            # Generar planificación del calendario
-            plan_semanal = generar_planificacion_calendario(
-                fecha_inicio, dias_semana[dia_clase], fecha_examen_final,
-                feriados, pruebas, retro_sesiones, revision_sesiones
-            )
-            
-            sesiones_normales_idx = [i for i, s in enumerate(plan_semanal) if s["Evento"] == "Clase normal"]
-            
-            # Asignar contenido a sesiones
-            if len(sesiones_normales_idx) < len(fragmentos_sesiones):
-                st.warning("⚠️ Hay menos sesiones normales disponibles que unidades ajustadas. Algunas unidades no serán asignadas.")
-                total_asignar = len(sesiones_normales_idx)
-            else:
-                total_asignar = len(fragmentos_sesiones)
-            
-            if not fragmentos_sesiones:
-                st.error("No se pudo generar ningún fragmento de unidad. Verifique el contenido ingresado.")
-                return
-            
-            for idx, frag_idx in enumerate(range(total_asignar)):
-                i = sesiones_normales_idx[idx]
-                plan_semanal[i]["Planificacion"] = fragmentos_sesiones[frag_idx]
-            
-            # Generar texto de salida mejorado
-            out = "\n📋 Planificación semanal completa:\n"
-            out += "=" * 80 + "\n"
-            for sesion in plan_semanal:
-                fecha_formateada = formatear_fecha_es(sesion['Fecha'])
-                out += f"Sesión {sesion['Sesion']:2d} | {fecha_formateada} | {sesion['Evento']}\n"
-                if sesion["Evento"] == "Clase normal" and "Planificacion" in sesion:
-                    p = sesion["Planificacion"]
-                    out += f" 🟢 Unidad: {p['Unidad']}\n"
-                    out += f" 📄 Contenido: {p['Contenido']}\n"
-                    out += f" 🎯 Objetivo: El estudiante será capaz de {p['Verbo']} {p['Concepto']}\n"
-                    out += f" 🪜 Nivel Bloom: {p['Nivel']}\n"
-                    out += f" 📌 Momentos Didácticos:\n"
-                    out += f" ▪ Retroalimentación: {random.choice(retro)}\n"
-                    out += f" ▪ Introducción: {random.choice(intro)}\n"
-                    out += f" ▪ Inicio: {random.choice(inicio)}\n"
-                    out += f" ▪ Desarrollo: {p['Actividad']}\n"
-                    out += f" ▪ Cierre: {random.choice(cierre)}\n"
-                    out += f" 🧰 Recursos: {', '.join(recursos_bloom[p['Nivel']])}\n"
-                    out += f" 📝 Evaluación: {', '.join(evaluacion_bloom[p['Nivel']])}\n"
-                elif sesion["Evento"] == "Prueba parcial":
-                    out += f" 📝 Evaluación parcial programada\n"
-                elif sesion["Evento"] == "Retroalimentación":
-                    out += f" 🔄 Sesión de retroalimentación pre-prueba\n"
-                elif sesion["Evento"] == "Revisión de prueba":
-                    out += f" 📊 Revisión y análisis de resultados de prueba\n"
-                elif sesion["Evento"] == "Examen final":
-                    out += f" 🎓 Evaluación final del curso\n"
-                if sesion["En_feriado"]:
-                    out += " ⚠️ ¡Advertencia! Esta sesión coincide con un feriado. Reagendar si es necesario.\n"
-                out += "-" * 70 + "\n"
-            
-            # Mostrar resultado en la interfaz
-            st.success("¡Planificación generada exitosamente!")
-            
-            # Mostrar planificación en expander
-            with st.expander("📋 Ver Planificación Completa", expanded=True):
-                st.text(out)
-            
-            # Configuración para archivos
-            configuracion = {
-                'fecha_inicio': fecha_inicio.strftime("%Y-%m-%d"),
-                'fecha_fin': fecha_fin.strftime("%Y-%m-%d"),
-                'dia_clase': dia_clase,
-                'feriados': feriados,
-                'pruebas': pruebas,
-                'fecha_examen_final': fecha_examen_final.strftime("%Y-%m-%d")
-            }
-            
-            # Botones de descarga según privilegio
-            if st.session_state.privilegio == "Completo" and (plantilla_planeamiento or plantilla_cronograma):
-                # Generar contexto para plantillas
-                context = {}
-                context_cronograma = {}
-                
-                for sesion in plan_semanal:
-                    num = sesion["Sesion"]
-                    pref = f"SESION_{num}_"
-                    
-                    # Contexto común
-                    context[pref + "FECHA"] = sesion["Fecha"].strftime("%Y-%m-%d")
-                    context[pref + "EVENTO"] = sesion["Evento"]
-                    context_cronograma[pref + "FECHA"] = sesion["Fecha"].strftime("%Y-%m-%d")
-                    context_cronograma[pref + "EVENTO"] = sesion["Evento"]
-                    
-                    if sesion["Evento"] == "Clase normal" and "Planificacion" in sesion:
-                        p = sesion["Planificacion"]
-                        
-                        # Contexto completo para planeamiento SIN ICONOS (documento institucional)
-                        context[pref + "UNIDAD"] = p["Unidad"]
-                        context[pref + "CONTENIDO"] = p["Contenido"]
-                        context[pref + "OBJETIVO"] = f"El estudiante será capaz de {p['Verbo']} {p['Concepto']}"
-                        context[pref + "NIVEL_BLOOM"] = p["Nivel"]
-                        context[pref + "RETROALIMENTACION"] = f"Retroalimentación: {random.choice(retro)}"
-                        context[pref + "INTRODUCCION"] = f"Introducción: {random.choice(intro)}"
-                        context[pref + "INICIO"] = f"Inicio: {random.choice(inicio)}"
-                        context[pref + "DESARROLLO"] = f"Desarrollo: {p['Actividad']}"
-                        context[pref + "CIERRE"] = f"Cierre: {random.choice(cierre)}"
-                        context[pref + "RECURSOS"] = f"Recursos: {', '.join(recursos_bloom[p['Nivel']])}"
-                        context[pref + "EVALUACION"] = f"Evaluación: {', '.join(evaluacion_bloom[p['Nivel']])}"
-                        
-                        # Contexto resumido para cronograma
-                        context_cronograma[pref + "UNIDAD"] = p["Unidad"]
-                        context_cronograma[pref + "CONTENIDO"] = p["Contenido"]
-                        context_cronograma[pref + "OBJETIVO"] = f"El estudiante será capaz de {p['Verbo']} {p['Concepto']}"
-                        context_cronograma[pref + "NIVEL_BLOOM"] = p["Nivel"]
-                        
-                    else:
-                        # Campos vacíos para sesiones especiales
-                        campos_vacios = ["UNIDAD", "CONTENIDO", "OBJETIVO", "NIVEL_BLOOM", 
-                                       "RETROALIMENTACION", "INTRODUCCION", "INICIO", 
-                                       "DESARROLLO", "CIERRE", "RECURSOS", "EVALUACION"]
-                        for campo in campos_vacios:
-                            context[pref + campo] = ""
-                        
-                        # Para cronograma solo los campos básicos
-                        context_cronograma[pref + "UNIDAD"] = ""
-                        context_cronograma[pref + "CONTENIDO"] = ""
-                        context_cronograma[pref + "OBJETIVO"] = ""
-                        context_cronograma[pref + "NIVEL_BLOOM"] = ""
-                    
-                    # Advertencia común SIN ICONOS
-                    context[pref + "ADVERTENCIA"] = (
-                        "ADVERTENCIA: Este día coincide con feriado." if sesion["En_feriado"] else ""
-                    )
-                    context_cronograma[pref + "ADVERTENCIA"] = (
-                        "ADVERTENCIA: Este día coincide con feriado." if sesion["En_feriado"] else ""
-                    )
-                
-                # Crear archivo ZIP para usuarios completos
-                zip_buffer = crear_archivo_zip(
-                    context, context_cronograma, 
-                    plantilla_planeamiento, plantilla_cronograma,
-                    out, unidades_originales, configuracion
-                )
-                
-                if zip_buffer:
-                    st.download_button(
-                        label="📥 Descargar Archivos Completos (ZIP con Word + TXT)",
-                        data=zip_buffer,
-                        file_name=f"Planificacion_Completa_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
-                        mime="application/zip",
-                        use_container_width=True
-                    )
-            
-            # Botón para descargar solo TXT (disponible para todos)
-            txt_data, txt_filename = crear_archivo_txt(out, unidades_originales, configuracion)
-            
-            label_txt = "📄 Descargar Planificación (TXT)"
-            if st.session_state.privilegio == "Estándar":
-                label_txt = "📄 Descargar Planificación (Solo TXT - Versión Estándar)"
-            
-            st.download_button(
-                label=label_txt,
-                data=txt_data,
-                file_name=txt_filename,
-                mime="text/plain",
-                use_container_width=True
-            )
-            
-            # Mostrar resumen de la planificación
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric("Total de Sesiones", 17)
-            
-            with col2:
-                sesiones_normales = len([s for s in plan_semanal if s["Evento"] == "Clase normal"])
-                st.metric("Sesiones de Clase", sesiones_normales)
-            
-            with col3:
-                pruebas_count = len([s for s in plan_semanal if s["Evento"] == "Prueba parcial"])
-                st.metric("Pruebas Parciales", pruebas_count)
-            
-            with col4:
-                feriados_count = len([s for s in plan_semanal if s["En_feriado"]])
-                st.metric("Días Feriados", feriados_count)
-            
-            # Mostrar distribución por niveles de Bloom
-            st.subheader("📊 Distribución por Niveles de Bloom")
-            
-            if fragmentos_sesiones:
-                niveles_count = {}
-                for frag in fragmentos_sesiones:
-                    nivel = frag["Nivel"]
-                    niveles_count[nivel] = niveles_count.get(nivel, 0) + 1
-                
-                # Crear gráfico de barras simple con texto
-                for nivel, count in niveles_count.items():
-                    porcentaje = (count / len(fragmentos_sesiones)) * 100
-                    st.write(f"**{nivel}**: {count} sesiones ({porcentaje:.1f}%)")
-                    st.progress(porcentaje / 100)
-            
-            # Mostrar calendario visual
-            st.subheader("📅 Calendario de Sesiones")
-            
-            # Crear tabla del calendario
-            import pandas as pd
-            
-            calendar_data = []
-            for sesion in plan_semanal:
-                fecha_es = formatear_fecha_es(sesion["Fecha"])
-                calendar_data.append({
-                    "Sesión": sesion["Sesion"],
-                    "Fecha": sesion["Fecha"].strftime("%d/%m/%Y"),
-                    "Día": fecha_es.split(",")[0],  # Solo el día de la semana
-                    "Evento": sesion["Evento"],
-                    "Unidad": sesion.get("Planificacion", {}).get("Unidad", "-") if "Planificacion" in sesion else "-",
-                    "Feriado": "⚠️" if sesion["En_feriado"] else ""
-                })
-            
-            df_calendar = pd.DataFrame(calendar_data)
-            
-            # Aplicar estilos condicionales
-            def highlight_rows(row):
-                if row["Evento"] == "Examen final":
-                    return ['background-color: #ffebee'] * len(row)
-                elif row["Evento"] == "Prueba parcial":
-                    return ['background-color: #fff3e0'] * len(row)
-                elif row["Evento"] == "Retroalimentación":
-                    return ['background-color: #e8f5e8'] * len(row)
-                elif row["Evento"] == "Revisión de prueba":
-                    return ['background-color: #e3f2fd'] * len(row)
-                elif row["Feriado"] == "⚠️":
-                    return ['background-color: #f3e5f5'] * len(row)
-                else:
-                    return [''] * len(row)
-            
-            st.dataframe(
-                df_calendar.style.apply(highlight_rows, axis=1),
-                use_container_width=True,
-                hide_index=True
-            )
-            
-            # Leyenda mejorada
-            st.caption("🟨 Pruebas parciales | 🟥 Examen final | 🟩 Retroalimentación | 🟦 Revisión | 🟪 Feriados")
-            
-            # Mostrar detalles de pruebas y feriados
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.subheader("📝 Calendario de Evaluaciones")
-                for sesion in plan_semanal:
-                    if sesion["Evento"] in ["Prueba parcial", "Examen final"]:
-                        fecha_es = formatear_fecha_es(sesion["Fecha"])
-                        if sesion["En_feriado"]:
-                            st.warning(f"**Sesión {sesion['Sesion']}** - {sesion['Evento']}: {fecha_es} ⚠️ FERIADO")
-                        else:
-                            st.info(f"**Sesión {sesion['Sesion']}** - {sesion['Evento']}: {fecha_es}")
-            
-            with col2:
-                if feriados:
-                    st.subheader("🏖️ Feriados Programados")
-                    for i, feriado in enumerate(feriados, 1):
-                        # Manejar feriados que pueden ser tuplas o tipos incorrectos
-                        fecha_valida = None
-                        
-                        if isinstance(feriado, tuple):
-                            fecha_valida = feriado[0] if feriado and len(feriado) > 0 else None
-                        elif hasattr(feriado, 'strftime'):
-                            fecha_valida = feriado
-                        
-                        if fecha_valida and hasattr(fecha_valida, 'weekday'):
-                            fecha_es = formatear_fecha_es(fecha_valida)
-                            # Verificar si coincide con alguna sesión
-                            sesion_coincide = next((s for s in plan_semanal if s["Fecha"] == fecha_valida), None)
-                            if sesion_coincide:
-                                st.warning(f"**Feriado {i}**: {fecha_es} - ⚠️ Coincide con Sesión {sesion_coincide['Sesion']}")
-                            else:
-                                st.success(f"**Feriado {i}**: {fecha_es} - ✅ No afecta clases")
-                        else:
-                            st.error(f"**Feriado {i}**: Fecha inválida")
-                    
-                    # Mostrar resumen de impacto
-                    feriados_con_clases = 0
-                    for feriado in feriados:
-                        fecha_valida = None
-                        if isinstance(feriado, tuple):
-                            fecha_valida = feriado[0] if feriado and len(feriado) > 0 else None
-                        elif hasattr(feriado, 'strftime'):
-                            fecha_valida = feriado
-                        
-                        if fecha_valida:
-                            sesion_coincide = next((s for s in plan_semanal if s["Fecha"] == fecha_valida), None)
-                            if sesion_coincide:
-                                feriados_con_clases += 1
-                    
-                    if feriados_con_clases > 0:
-                        st.warning(f"⚠️ **{feriados_con_clases}** feriado(s) coinciden con clases programadas")
-                    else:
-                        st.success("✅ Ningún feriado afecta las clases programadas")
-                        
-                else:
-                    st.subheader("🏖️ Feriados")
-                    st.info("No se han programado feriados")
+        # La generación corre en la cola de trabajos; la sesión solo guarda el id
+        documentos = st.session_state.privilegio == "Completo"
+        entradas = {
+            "unidades_data": [tuple(unidad) for unidad in st.session_state.unidades_data],
+            "fecha_inicio": fecha_inicio,
+            "fecha_fin": fecha_fin,
+            "dia_clase": dia_clase,
+            "fecha_examen_final": fecha_examen_final,
+            "feriados": feriados,
+            "nombres_feriados": {f: calendario_feriados.nombre(f) for f in feriados},
+            "prueba1": prueba1,
+            "prueba2": prueba2,
+            "opciones_calendario": opciones_calendario,
+            "semilla": semilla,
+            "documentos": documentos,
+            "plantilla_planeamiento": plantilla_planeamiento,
+            "plantilla_cronograma": plantilla_cronograma
+        }
+        etapas = etapas_generacion(documentos, plantilla_planeamiento, plantilla_cronograma)
+        if secciones:
+            # Con secciones siempre se entrega el paquete ZIP (una carpeta por sección)
+            entradas["secciones"] = secciones
+            etapas = etapas if "zip" in etapas else [*etapas, "zip"]
+        id_trabajo = obtener_cola().enviar(
+            ejecutar_generacion_secciones if secciones else ejecutar_generacion, entradas, etapas=etapas
+        )
+        st.session_state.trabajo_planificacion = {"id": id_trabajo, "huella": huella}
+    
+    # Mostrar el último trabajo mientras las entradas no cambien: sigue en
+    # curso tras un rerun y sus archivos se pueden descargar hasta que expire
+    trabajo_sesion = st.session_state.get("trabajo_planificacion")
+    if trabajo_sesion is not None and trabajo_sesion["huella"] != huella:
+        del st.session_state.trabajo_planificacion
+        trabajo_sesion = None
+    trabajo = obtener_cola().consultar(trabajo_sesion["id"]) if trabajo_sesion else None
+    
+    if st.session_state.privilegio == "Completo":
+        terminado = trabajo is not None and trabajo["estado"] == TERMINADO
+        mostrar_panel_metricas(
+            trabajo["resultado"]["tiempos"] if terminado else None,
+            trabajo["resultado"].get("etapas") if terminado else None
+        )
+    
+    if trabajo_sesion is None:
+        return
+    if trabajo is None:
+        del st.session_state.trabajo_planificacion
+        st.info("Los archivos de la última planificación expiraron. Vuelva a generarla para descargarlos.")
+    elif trabajo["estado"] == ERROR:
+        del st.session_state.trabajo_planificacion
+        st.error(trabajo["error"])
+    elif trabajo["estado"] == TERMINADO and "secciones" in trabajo["resultado"]:
+        mostrar_resultados_secciones(trabajo["resultado"])
+    elif trabajo["estado"] == TERMINADO:
+        mostrar_resultados(trabajo["resultado"])
+    else:
+        mostrar_progreso(trabajo)
+        time.sleep(INTERVALO_SONDEO)
+        st.rerun()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Los tests importan los módulos del proyecto y los de benchmarks/
+for ruta in (RAIZ, os.path.join(RAIZ, "benchmarks")):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
@@ -0,0 +1,12 @@
+"""El núcleo se importa sin la interfaz y dentro del presupuesto de tiempo"""
+import bench_importacion
+
+
+def test_nucleo_sin_dependencias_pesadas():
+    _, cargados = bench_importacion.importar("planificacion")
+    assert cargados == []
+
+
+def test_importacion_dentro_del_presupuesto():
+    mejor = min(bench_importacion.importar("planificacion")[0] for _ in range(5))
+    assert mejor <= bench_importacion.PRESUPUESTO_MS
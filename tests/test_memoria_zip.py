@@ -0,0 +1,33 @@
+"""El paquete ZIP se arma y se conserva con memoria acotada (tracemalloc)"""
+import pytest
+
+import bench_memoria_zip
+import paquete_zip
+
+
+@pytest.fixture(scope="module")
+def plantilla_y_contexto():
+    return bench_memoria_zip.cargar_plantilla()
+
+
+def test_cota_de_memoria(plantilla_y_contexto):
+    assert bench_memoria_zip.comprobar_cota(*plantilla_y_contexto) == []
+
+
+def test_reduccion_frente_al_armado_anterior(plantilla_y_contexto):
+    # Paquete de al menos el doble del umbral, armado de las dos formas
+    tamano_curso, _, _ = bench_memoria_zip.cota_memoria(*plantilla_y_contexto, 1)
+    cantidad = int(2 * paquete_zip.MAX_PAQUETE_EN_MEMORIA / tamano_curso) + 1
+    _, pico_anterior = bench_memoria_zip.pico(bench_memoria_zip.paquete_anterior, *plantilla_y_contexto, cantidad)
+    _, pico_nuevo = bench_memoria_zip.pico(bench_memoria_zip.paquete_streaming, *plantilla_y_contexto, cantidad)
+    assert pico_nuevo < pico_anterior / 1.5
+
+
+def test_paquete_se_lee_completo(plantilla_y_contexto):
+    paquete = bench_memoria_zip.paquete_terminado(*plantilla_y_contexto, 3)
+    try:
+        datos = paquete.leer()
+        assert len(datos) == paquete.tamano
+        assert paquete.leer() == datos
+    finally:
+        paquete.cerrar()
@@ -0,0 +1,36 @@
+"""
+Etapas del pipeline frente a la línea de base (benchmarks/linea_base.json).
+
+La base depende de la máquina donde se guardó: en otra máquina, actualizarla
+con python benchmarks/suite.py --guardar-base. PLANEAMIENTO_TOLERANCIA_BENCH
+cambia la tolerancia (0.3 = 30 %).
+"""
+import json
+import os
+
+import pytest
+
+import suite
+
+TOLERANCIA = float(os.environ.get("PLANEAMIENTO_TOLERANCIA_BENCH", suite.TOLERANCIA))
+
+
+@pytest.fixture(scope="module")
+def base():
+    if not os.path.exists(suite.LINEA_BASE):
+        pytest.skip("No hay línea de base; use python benchmarks/suite.py --guardar-base")
+    with open(suite.LINEA_BASE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("escenario", list(suite.ESCENARIOS))
+def test_sin_regresiones(base, escenario):
+    actual = suite.ejecutar([escenario])
+    _, regresiones = suite.comparar(actual, base, TOLERANCIA)
+    assert regresiones == []
+
+
+def test_cubre_todas_las_etapas(base):
+    curso = suite.curso_sintetico(*suite.ESCENARIOS["chico"])
+    etapas = {f"chico/{etapa}" for etapa in suite.etapas(curso)}
+    assert etapas <= base["resultados"].keys()
@@ -0,0 +1,160 @@
+"""
+Cola local de trabajos de generación.
+
+Generar un plan (unidades, calendario, documentos Word y ZIP) corre en hilos
+trabajadores del proceso, fuera del hilo del script de Streamlit: un rerun
+ya no cancela el trabajo y un render lento no bloquea la interfaz. Al
+enviar un trabajo se obtiene su id; la interfaz consulta su estado y las
+etapas completadas para mostrar el progreso.
+
+Los trabajos terminados (con sus archivos) se conservan hasta que expiran,
+de modo que siguen disponibles para descargar tras cualquier rerun. Si los
+terminados superan el tope de cantidad o de bytes retenidos (paquetes ZIP y
+textos del resultado), se descartan los más viejos.
+
+Configuración: PLANEAMIENTO_TRABAJADORES (hilos trabajadores),
+PLANEAMIENTO_TRABAJOS_TTL (segundos que se conserva un trabajo terminado) y
+PLANEAMIENTO_TRABAJOS_MB (bytes retenidos por los trabajos terminados).
+"""
+import atexit
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+TRABAJADORES = int(os.environ.get("PLANEAMIENTO_TRABAJADORES", 4))
+TTL_TRABAJOS = float(os.environ.get("PLANEAMIENTO_TRABAJOS_TTL", 3600))
+
+# Topes de trabajos terminados y de lo que retienen sus resultados
+MAX_TRABAJOS_TERMINADOS = 64
+MAX_MB_TRABAJOS = float(os.environ.get("PLANEAMIENTO_TRABAJOS_MB", 512))
+
+PENDIENTE = "pendiente"
+EN_CURSO = "en curso"
+TERMINADO = "terminado"
+ERROR = "error"
+
+
+class ColaTrabajos:
+    """Trabajos en hilos trabajadores, con progreso por etapa y expiración"""
+
+    def __init__(self, trabajadores=TRABAJADORES, ttl=TTL_TRABAJOS, max_bytes=int(MAX_MB_TRABAJOS * 1024 * 1024)):
+        self.trabajadores = trabajadores
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._trabajos = {}
+        self._executor = None
+
+    def _obtener_executor(self):
+        # Se llama con el lock tomado
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.trabajadores, thread_name_prefix="generacion"
+            )
+            atexit.register(self._executor.shutdown, wait=False, cancel_futures=True)
+        return self._executor
+
+    def enviar(self, funcion, *args, etapas=()):
+        """
+        Encola funcion(*args, avance=...) y devuelve el id del trabajo.
+        La función llama a avance(etapa) al completar cada etapa de etapas.
+        """
+        trabajo = {
+            "id": secrets.token_hex(8),
+            "estado": PENDIENTE,
+            "etapas": list(etapas),
+            "completadas": [],
+            "resultado": None,
+            "error": None,
+            "creado": time.time(),
+            "terminado": None,
+            "bytes": 0,
+        }
+        with self._lock:
+            self._purgar()
+            self._trabajos[trabajo["id"]] = trabajo
+            self._obtener_executor().submit(self._ejecutar, trabajo, funcion, args)
+        return trabajo["id"]
+
+    def _ejecutar(self, trabajo, funcion, args):
+        def avance(etapa):
+            with self._lock:
+                if etapa not in trabajo["completadas"]:
+                    trabajo["completadas"].append(etapa)
+
+        with self._lock:
+            trabajo["estado"] = EN_CURSO
+        try:
+            resultado = funcion(*args, avance=avance)
+        except Exception as e:
+            with self._lock:
+                trabajo["estado"] = ERROR
+                trabajo["error"] = str(e) or type(e).__name__
+                trabajo["terminado"] = time.time()
+            return
+        retenidos = _bytes_resultado(resultado)
+        with self._lock:
+            trabajo["estado"] = TERMINADO
+            trabajo["resultado"] = resultado
+            trabajo["terminado"] = time.time()
+            trabajo["bytes"] = retenidos
+            self._purgar()
+
+    def consultar(self, id_trabajo):
+        """Copia del estado del trabajo, o None si no existe o ya expiró"""
+        with self._lock:
+            self._purgar()
+            trabajo = self._trabajos.get(id_trabajo)
+            if trabajo is None:
+                return None
+            return {**trabajo, "completadas": list(trabajo["completadas"])}
+
+    def _purgar(self):
+        """
+        Descarta los trabajos terminados que expiraron y, de los más viejos a
+        los más nuevos, los que exceden los topes (con el lock tomado). El
+        último terminado se conserva aunque supere solo el tope de bytes.
+        """
+        ahora = time.time()
+        terminados = [
+            trabajo for trabajo in self._trabajos.values() if trabajo["terminado"] is not None
+        ]
+        # Por orden de llegada: los más viejos primero
+        sobrantes = len(terminados) - MAX_TRABAJOS_TERMINADOS
+        exceso = sum(trabajo["bytes"] for trabajo in terminados) - self.max_bytes
+        for trabajo in terminados:
+            excede = sobrantes > 0 or (exceso > 0 and trabajo is not terminados[-1])
+            if excede or ahora - trabajo["terminado"] > self.ttl:
+                del self._trabajos[trabajo["id"]]
+                sobrantes -= 1
+                exceso -= trabajo["bytes"]
+
+
+def _bytes_resultado(resultado):
+    """Bytes que retiene un resultado: paquetes (con tamano) y textos del primer nivel"""
+    if not isinstance(resultado, dict):
+        return 0
+    total = 0
+    for valor in resultado.values():
+        if hasattr(valor, "tamano"):
+            total += valor.tamano
+        elif isinstance(valor, (bytes, bytearray)):
+            total += len(valor)
+        elif isinstance(valor, str):
+            total += len(valor.encode('utf-8'))
+    return total
+
+
+_cola = None
+_cola_lock = threading.Lock()
+
+
+def obtener_cola():
+    """Cola única por proceso, compartida por todas las sesiones"""
+    global _cola
+    with _cola_lock:
+        if _cola is None:
+            _cola = ColaTrabajos()
+        return _cola
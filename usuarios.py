@@ -0,0 +1,340 @@
+"""
+Almacén de usuarios en SQLite.
+
+Las credenciales viven en una base SQLite en modo WAL (lecturas concurrentes
+sin bloquear a la escritura) con el nombre de usuario como clave primaria.
+Las contraseñas se guardan con sal y PBKDF2-SHA256 y se comparan en tiempo
+constante.
+
+Los usuarios leídos se mantienen en una caché del proceso; antes de usarla
+se consulta PRAGMA data_version, que cambia cuando otra conexión modifica la
+base, así que un cambio hecho desde otro proceso invalida la caché.
+
+Un inicio de sesión correcto se recuerda por un tiempo (LOGIN_TTL) con un
+HMAC de usuario y contraseña bajo una clave aleatoria del proceso, atado al
+hash guardado: volver a entrar (otra pestaña, una recarga) no paga PBKDF2, y
+cambiar la contraseña invalida el recuerdo. Nunca se guarda la contraseña.
+
+La primera vez, si la base está vacía, se migran los usuarios de
+usuarios.json (contraseñas en texto plano; el archivo no se versiona y se
+puede borrar una vez migrado) y, si tampoco existe, se crea el usuario
+administrador con la contraseña de PLANEAMIENTO_ADMIN_PASSWORD (y el nombre
+de PLANEAMIENTO_ADMIN_USUARIO, "admin" por defecto). Sin ninguno de los dos
+la base queda vacía y los usuarios se crean con "agregar".
+
+Los archivos se buscan junto a este módulo, sin importar el directorio de
+trabajo (PLANEAMIENTO_USUARIOS_DB y PLANEAMIENTO_USUARIOS_JSON los cambian).
+
+Uso:
+    python usuarios.py listar
+    python usuarios.py agregar USUARIO {Completo,Estándar}   (pide la contraseña)
+    python usuarios.py eliminar USUARIO
+    python usuarios.py migrar [usuarios.json]
+"""
+import argparse
+import getpass
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+_DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+RUTA_BASE = os.environ.get("PLANEAMIENTO_USUARIOS_DB", os.path.join(_DIRECTORIO, "usuarios.db"))
+ARCHIVO_JSON = os.environ.get("PLANEAMIENTO_USUARIOS_JSON", os.path.join(_DIRECTORIO, "usuarios.json"))
+
+# Costo de PBKDF2 (recomendación OWASP para SHA-256); se guarda con cada hash
+# y los hashes con otro costo se rehacen en el siguiente inicio de sesión
+# correcto. Son ~180 ms por hash y núcleo: el volumen de una ráfaga se
+# sostiene limitando los hashes simultáneos y recordando los logins correctos
+ITERACIONES = int(os.environ.get("PLANEAMIENTO_PBKDF2_ITERACIONES", 600_000))
+ALGORITMO = "pbkdf2_sha256"
+
+# Segundos que se recuerda un inicio de sesión correcto (0 lo desactiva)
+LOGIN_TTL = float(os.environ.get("PLANEAMIENTO_LOGIN_TTL", 900))
+MAX_LOGINS_RECORDADOS = 4096
+
+# PBKDF2 libera el GIL pero ocupa un núcleo entero: en una ráfaga de logins
+# se calculan a lo sumo tantos hashes a la vez como núcleos, y el resto espera
+# su turno en lugar de repartirse la CPU y terminar todos tarde
+HASHES_SIMULTANEOS = int(os.environ.get("PLANEAMIENTO_HASHES_SIMULTANEOS", os.cpu_count() or 1))
+_hashes_simultaneos = threading.BoundedSemaphore(HASHES_SIMULTANEOS)
+
+PRIVILEGIOS = ("Completo", "Estándar")
+
+
+def usuarios_iniciales():
+    """Administrador inicial desde el entorno; nunca hay contraseñas en el código"""
+    password = os.environ.get("PLANEAMIENTO_ADMIN_PASSWORD")
+    if not password:
+        return {}
+    usuario = os.environ.get("PLANEAMIENTO_ADMIN_USUARIO", "admin")
+    return {usuario: {"password": password, "privilegio": "Completo"}}
+
+
+# === Contraseñas ===
+def generar_hash(password, iteraciones=None):
+    """Hash con sal en formato algoritmo$iteraciones$sal$hash"""
+    iteraciones = iteraciones or ITERACIONES
+    sal = secrets.token_bytes(16)
+    derivado = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), sal, iteraciones)
+    return f"{ALGORITMO}${iteraciones}${sal.hex()}${derivado.hex()}"
+
+
+def comprobar_hash(password, hash_guardado):
+    """Compara la contraseña con el hash guardado en tiempo constante"""
+    try:
+        algoritmo, iteraciones, sal, esperado = hash_guardado.split("$")
+        if algoritmo != ALGORITMO:
+            return False
+        with _hashes_simultaneos:
+            derivado = hashlib.pbkdf2_hmac(
+                'sha256', password.encode('utf-8'), bytes.fromhex(sal), int(iteraciones)
+            )
+    except ValueError:
+        return False
+    return hmac.compare_digest(derivado, bytes.fromhex(esperado))
+
+
+def requiere_rehash(hash_guardado):
+    """True si el hash no usa el algoritmo o las iteraciones actuales"""
+    partes = hash_guardado.split("$")
+    return len(partes) != 4 or partes[0] != ALGORITMO or partes[1] != str(ITERACIONES)
+
+
+# Hash de referencia para usuarios inexistentes: el tiempo de respuesta no
+# revela si el usuario existe. Se calcula al primer intento con un usuario
+# inexistente, no al importar (cada proceso trabajador pagaría un hash)
+_hash_ficticio = None
+_hash_ficticio_lock = threading.Lock()
+
+
+def _obtener_hash_ficticio():
+    global _hash_ficticio
+    with _hash_ficticio_lock:
+        if _hash_ficticio is None:
+            _hash_ficticio = generar_hash(secrets.token_hex(8))
+        return _hash_ficticio
+
+
+# === Logins recordados ===
+class LoginsRecordados:
+    """HMAC(usuario, contraseña) -> (hash guardado, vence), LRU acotado"""
+
+    def __init__(self, ttl=LOGIN_TTL, maximo=MAX_LOGINS_RECORDADOS):
+        self.ttl = ttl
+        self.maximo = maximo
+        self._clave = secrets.token_bytes(32)
+        self._lock = threading.Lock()
+        self._recordados = OrderedDict()
+
+    def _firma(self, usuario, password):
+        mensaje = f"{usuario}\0{password}".encode('utf-8')
+        return hmac.new(self._clave, mensaje, hashlib.sha256).digest()
+
+    def vigente(self, usuario, password, hash_guardado):
+        """True si este login se verificó hace menos de ttl contra el mismo hash"""
+        if self.ttl <= 0:
+            return False
+        firma = self._firma(usuario, password)
+        with self._lock:
+            recordado = self._recordados.get(firma)
+            if recordado is None:
+                return False
+            hash_recordado, vence = recordado
+            if vence < time.monotonic() or not hmac.compare_digest(hash_recordado, hash_guardado):
+                del self._recordados[firma]
+                return False
+            self._recordados.move_to_end(firma)
+            return True
+
+    def recordar(self, usuario, password, hash_guardado):
+        if self.ttl <= 0:
+            return
+        firma = self._firma(usuario, password)
+        with self._lock:
+            self._recordados[firma] = (hash_guardado, time.monotonic() + self.ttl)
+            self._recordados.move_to_end(firma)
+            while len(self._recordados) > self.maximo:
+                self._recordados.popitem(last=False)
+
+    def olvidar(self):
+        with self._lock:
+            self._recordados.clear()
+
+
+# === Almacén ===
+class AlmacenUsuarios:
+    """Usuarios en SQLite (WAL) con caché de lectura por proceso"""
+
+    def __init__(self, ruta=RUTA_BASE, archivo_json=ARCHIVO_JSON):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._version = None
+        self._logins = LoginsRecordados()
+
+        self._conexion = self._conectar()
+        self._conexion.execute(
+            "CREATE TABLE IF NOT EXISTS usuarios ("
+            " usuario TEXT PRIMARY KEY,"
+            " hash TEXT NOT NULL,"
+            " privilegio TEXT NOT NULL)"
+        )
+        vacia = self._conexion.execute("SELECT 1 FROM usuarios LIMIT 1").fetchone() is None
+        if vacia:
+            if os.path.exists(archivo_json):
+                self.migrar_desde_json(archivo_json)
+            else:
+                self._guardar_varios(usuarios_iniciales().items())
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None, check_same_thread=False)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=NORMAL")
+        conexion.execute("PRAGMA busy_timeout=30000")
+        return conexion
+
+    def _vigente(self):
+        """Vacía la caché si la base cambió desde otra conexión (se llama con el lock tomado)"""
+        version = self._conexion.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version:
+            self._cache.clear()
+            self._version = version
+
+    def obtener(self, usuario):
+        """(hash, privilegio) del usuario o None si no existe"""
+        with self._lock:
+            self._vigente()
+            if usuario in self._cache:
+                return self._cache[usuario]
+            fila = self._conexion.execute(
+                "SELECT hash, privilegio FROM usuarios WHERE usuario = ?", (usuario,)
+            ).fetchone()
+            if fila is not None:
+                # Solo usuarios existentes: nombres inventados no llenan la caché
+                self._cache[usuario] = fila
+            return fila
+
+    def verificar(self, usuario, password):
+        """Devuelve (es_valido, privilegio)"""
+        fila = self.obtener(usuario)
+        if fila is None:
+            comprobar_hash(password, _obtener_hash_ficticio())
+            return False, None
+        hash_guardado, privilegio = fila
+        # Con otro costo configurado se verifica de nuevo, para rehacer el hash
+        if not requiere_rehash(hash_guardado) and self._logins.vigente(usuario, password, hash_guardado):
+            return True, privilegio
+        if not comprobar_hash(password, hash_guardado):
+            return False, privilegio
+        if requiere_rehash(hash_guardado):
+            # Cambió el costo configurado: se guarda con el actual (un hash más, una sola vez)
+            self.guardar(usuario, password, privilegio)
+            hash_guardado, privilegio = self.obtener(usuario)
+        self._logins.recordar(usuario, password, hash_guardado)
+        return True, privilegio
+
+    def _guardar_varios(self, usuarios):
+        if not usuarios:
+            return 0
+        filas = [
+            (
+                nombre,
+                datos["password"] if datos["password"].startswith(ALGORITMO + "$") else generar_hash(datos["password"]),
+                datos.get("privilegio", "Estándar"),
+            )
+            for nombre, datos in usuarios
+        ]
+        with self._lock:
+            with self._conexion:
+                self._conexion.execute("BEGIN IMMEDIATE")
+                self._conexion.executemany(
+                    "INSERT INTO usuarios (usuario, hash, privilegio) VALUES (?, ?, ?) "
+                    "ON CONFLICT(usuario) DO UPDATE SET hash = excluded.hash, privilegio = excluded.privilegio",
+                    filas
+                )
+            # Los cambios propios no alteran data_version de esta conexión
+            self._cache.clear()
+            self._logins.olvidar()
+        return len(filas)
+
+    def guardar(self, usuario, password, privilegio):
+        """Crea el usuario o cambia su contraseña y privilegio"""
+        if privilegio not in PRIVILEGIOS:
+            raise ValueError(f"Privilegio desconocido: {privilegio}")
+        self._guardar_varios([(usuario, {"password": password, "privilegio": privilegio})])
+
+    def eliminar(self, usuario):
+        with self._lock:
+            with self._conexion:
+                borrados = self._conexion.execute(
+                    "DELETE FROM usuarios WHERE usuario = ?", (usuario,)
+                ).rowcount
+            self._cache.clear()
+            self._logins.olvidar()
+        return borrados > 0
+
+    def listar(self):
+        with self._lock:
+            return self._conexion.execute(
+                "SELECT usuario, privilegio FROM usuarios ORDER BY usuario"
+            ).fetchall()
+
+    def migrar_desde_json(self, archivo_json=ARCHIVO_JSON):
+        """Importa (o actualiza) los usuarios de un archivo JSON con contraseñas en texto plano"""
+        with open(archivo_json, 'r', encoding='utf-8') as f:
+            usuarios = json.load(f)
+        return self._guardar_varios(usuarios.items())
+
+
+_almacen = None
+_almacen_lock = threading.Lock()
+
+
+def obtener_almacen():
+    """Almacén único por proceso, compartido por todas las sesiones"""
+    global _almacen
+    with _almacen_lock:
+        if _almacen is None:
+            _almacen = AlmacenUsuarios()
+        return _almacen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Administra los usuarios del planificador")
+    acciones = parser.add_subparsers(dest="accion", required=True)
+    acciones.add_parser("listar", help="muestra los usuarios y su privilegio")
+    agregar = acciones.add_parser("agregar", help="crea un usuario o cambia su contraseña")
+    agregar.add_argument("usuario")
+    agregar.add_argument("privilegio", choices=PRIVILEGIOS)
+    eliminar = acciones.add_parser("eliminar", help="elimina un usuario")
+    eliminar.add_argument("usuario")
+    migrar = acciones.add_parser("migrar", help="importa los usuarios de un archivo JSON")
+    migrar.add_argument("archivo", nargs="?", default=ARCHIVO_JSON)
+    args = parser.parse_args(argv)
+
+    almacen = obtener_almacen()
+    if args.accion == "listar":
+        for usuario, privilegio in almacen.listar():
+            print(f"{usuario}\t{privilegio}")
+    elif args.accion == "agregar":
+        almacen.guardar(args.usuario, getpass.getpass("Contraseña: "), args.privilegio)
+        print(f"Usuario {args.usuario} guardado")
+    elif args.accion == "eliminar":
+        if not almacen.eliminar(args.usuario):
+            print(f"No existe el usuario {args.usuario}", file=sys.stderr)
+            return 1
+        print(f"Usuario {args.usuario} eliminado")
+    elif args.accion == "migrar":
+        print(f"{almacen.migrar_desde_json(args.archivo)} usuarios importados de {args.archivo}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())